@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the rule parser: per-query cost over real campus queries, and how the cost
+grows with query length.
+
+    python bench_nlu.py [repeats]
+"""
+
+import statistics
+import time
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from nlu import INTENT_CUES, simple_parse
+
+# Queries from the test scripts and the API examples
+QUERIES = [
+    "how to get from Goodwin Hall to Lavery Hall using the bus",
+    "when is next bus to Squires",
+    "fastest route from Torgersen to Newman Library",
+    "how to get from D2 to Owens Food Court",
+    "when is next bus to Turner Place",
+    "route from Hokie Grill to campus",
+    "how to get from Barringer Hall to Johnson Hall",
+    "when is next bus from Slusher Hall",
+    "fastest route to Vawter Hall",
+    "how to get from Main Street to campus",
+    "when is next CRC bus",
+    "route from Harding Avenue to downtown",
+    "how to get from Lane Stadium to Cassell Coliseum",
+    "when is next bus to English Field",
+    "when is next CAS bus",
+    "CAS schedule",
+    "when does HDG bus come",
+    "TCP bus times",
+    "HXP express schedule",
+    "what buses are running now",
+    "live bus status",
+    "all bus routes",
+    "fastest route from 300 edge way Blacksburg Virginia to prices Fork Road Blacksburg",
+    "fastest route from Lavery Hall to Goodwin Hall",
+    "quickest way from 300 edge way to prices fork road",
+    "bus from Goodwin Hall to Lavery Hall",
+    "take bus from McComas Hall to Squires",
+    "how to get from Goodwin Hall to Lavery Hall",
+    "fastest route from D2 to Owens",
+    "when does the CAS bus come",
+    "CAS bus next",
+    "when is next CAS",
+    "fastest route to Goodwin Hall",
+    "how to get to Goodwin Hall from 300 edgeway Blacksburg VA",
+    "I am at Goodwin Hall right now, when is the next bus",
+    "directions from Lavery Hall to Goodwin Hall",
+    "travel from 300 edge way to prices fork road",
+    "next bus to squires",
+    "when is the next bus",
+    "what is the weather forecast",
+    "I am at Torgersen right now",
+    "next bus to lee hall",
+    "how do I get to the CRC from Main Street",
+    "from here to Newman Library",
+    "directions to 123 Main Street",
+    "when is the next UCB bus to lee",
+    "bus to Goodwin Hall from Squires",
+    "route from 635 prices fork road to lavery",
+    "when does the ttt come",
+    "forecast for the bus schedule",
+    "is the sme running",
+    "take bus from downtown to lane stadium",
+]
+
+def time_call(func, text, repeats):
+    """Median seconds per call"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(text)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def bench_nlu(repeats=200):
+    """Time the cue scan and the full rule parse"""
+
+    print("🧪 Benchmarking Rule Parser\n")
+    print("=" * 60)
+
+    scan_times = []
+    parse_times = []
+    for query in QUERIES:
+        scan_times.append(time_call(INTENT_CUES.scan, query.lower(), repeats))
+        parse_times.append(time_call(simple_parse, query, repeats))
+
+    print(f"{len(QUERIES)} queries, median of {repeats} runs each")
+    print(f"  cue scan:     mean {statistics.mean(scan_times) * 1e6:7.1f} µs, max {max(scan_times) * 1e6:7.1f} µs")
+    print(f"  simple_parse: mean {statistics.mean(parse_times) * 1e6:7.1f} µs, max {max(parse_times) * 1e6:7.1f} µs")
+    slowest = sorted(zip(parse_times, QUERIES), reverse=True)[:3]
+    for seconds, query in slowest:
+        print(f"    {seconds * 1e6:7.1f} µs  {query}")
+
+    # Adversarial long inputs: cost should grow linearly with length
+    print("\nLong inputs (µs per character should stay flat):")
+    fillers = {
+        "repeated cues": "when next bus to from ",
+        "no cues": "the quick brown fox ",
+        "open captures": "from at i am ",
+        "house numbers": "1 ",
+    }
+    for label, filler in fillers.items():
+        for size in (500, 2000, 8000):
+            text = filler * (size // len(filler))
+            seconds = time_call(simple_parse, text, 5)
+            print(f"  {label:14} {len(text):5} chars: {seconds * 1e3:7.2f} ms ({seconds * 1e6 / len(text):.2f} µs/char)")
+
+if __name__ == "__main__":
+    bench_nlu(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
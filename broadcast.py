@@ -0,0 +1,120 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional, Set
+
+
+class Subscription:
+    """
+    One client's view of a stream: a bounded queue of encoded messages and an optional route filter.
+    When the client falls behind, the oldest queued message is dropped to make room.
+    """
+
+    def __init__(self, routes: Optional[FrozenSet[str]], maxsize: int):
+        self.routes = routes
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, message: str) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def next(self, timeout: float) -> Optional[str]:
+        """Next message, or None if nothing arrived within timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LiveBusBroadcaster:
+    """
+    Fans live bus status out to any number of subscribers.
+
+    A single producer task calls `produce` every `interval` seconds while anyone is subscribed.
+    Each update is encoded once per distinct route filter (not once per client) and only sent
+    when it differs from the previous update for that filter.
+    """
+
+    def __init__(self, produce: Callable[[], Awaitable[Dict[str, Any]]], interval: float = 10.0, queue_size: int = 8):
+        self.produce = produce
+        self.interval = interval
+        self.queue_size = queue_size
+        self.published = 0
+        self._subscribers: Set[Subscription] = set()
+        self._last: Dict[Optional[FrozenSet[str]], str] = {}
+        self._last_content: Dict[Optional[FrozenSet[str]], str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, routes: Optional[FrozenSet[str]] = None) -> Subscription:
+        subscription = Subscription(routes, self.queue_size)
+        # A new client gets the latest update for its filter straight away
+        if routes in self._last:
+            subscription.offer(self._last[routes])
+        self._subscribers.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+        # Filters come from clients, so forget a filter's last update once nobody uses it
+        if all(s.routes != subscription.routes for s in self._subscribers):
+            self._last.pop(subscription.routes, None)
+            self._last_content.pop(subscription.routes, None)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                self.publish(await self.produce())
+            except Exception as e:
+                print(f"⚠️ Live bus stream update failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def publish(self, update: Dict[str, Any]) -> None:
+        """Encode an update for every active filter and queue it for the matching subscribers."""
+        encoded: Dict[Optional[FrozenSet[str]], Optional[str]] = {}
+        for subscription in list(self._subscribers):
+            routes = subscription.routes
+            if routes not in encoded:
+                filtered = self._filter(update, routes)
+                # The timestamp changes every tick; only the content decides whether to send
+                content = json.dumps({k: v for k, v in filtered.items() if k != "timestamp"}, default=str)
+                changed = content != self._last_content.get(routes)
+                self._last_content[routes] = content
+                message = json.dumps(filtered, default=str)
+                if changed:
+                    self._last[routes] = message
+                encoded[routes] = message if changed else None
+            if encoded[routes] is not None:
+                subscription.offer(encoded[routes])
+        self.published += 1
+
+    @staticmethod
+    def _filter(update: Dict[str, Any], routes: Optional[FrozenSet[str]]) -> Dict[str, Any]:
+        if routes is None:
+            return update
+        return {
+            **update,
+            "buses": {route: info for route, info in update.get("buses", {}).items() if route in routes},
+            "alerts": [alert for alert in update.get("alerts", [])
+                       if not alert.get("routes_affected") or routes & set(alert["routes_affected"])],
+        }
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "filters": len({s.routes for s in self._subscribers}),
+            "published": self.published,
+            "dropped": sum(s.dropped for s in self._subscribers),
+        }
@@ -1,10 +1,13 @@
-import requests
+import httpx
 from bs4 import BeautifulSoup
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List
+from services.http_client import fetch
+from services.singleflight import coalesce
 import asyncio
 
+@coalesce
 async def get_bus_times() -> str:
     """
     Scrape Blacksburg Transit bus information.
@@ -17,8 +20,7 @@ async def get_bus_times() -> str:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        response = await fetch(url, headers=headers, timeout=10)
         
         soup = BeautifulSoup(response.content, 'html.parser')
         
@@ -58,7 +60,7 @@ async def get_bus_times() -> str:
         
         return result
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Unable to fetch current bus information. Please check the Blacksburg Transit website directly. Error: {str(e)}"
     except Exception as e:
         return f"An error occurred while fetching bus information: {str(e)}"
@@ -114,32 +116,51 @@ def get_popular_routes() -> List[str]:
     ]
 
 # New Google Maps integration functions
-from typing import Dict, Any, Optional
+import os
+import numpy as np
+from typing import Dict, Any, Optional, Tuple
+from collections import Counter
 from datetime import datetime, timedelta
-from services.google_maps import geocode_place, directions_transit
+from services.google_maps import cached_geocode, directions_transit_async, geocode_place_async, google_available
+from services.transit_network import TransitNetwork
+from services.timetable import Timetable
+from services.journey_planner import JourneyPlanner
+from services.geo import SpatialIndex, walk_seconds
+from services.stop_matcher import StopMatcher
+from services.gtfs import load_network
+from services.realtime import REALTIME, configured_feeds
+from services.departure_boards import MinuteBoards
+from services.walk_matrix import WalkMatrix, place_id
+from nlu import normalize_place as campus_address
 
 async def plan_quickest_route(origin_name: str, destination_name: str) -> Dict[str, Any]:
     """
     Use Google Directions API (transit) to compute the fastest route now.
+    When Google is unavailable (no API key, circuit open, or the call fails) the route is planned
+    from local stops and timetable instead; "engine" says which one answered.
     """
+    if not google_available():
+        return plan_offline_route(origin_name, destination_name)
     try:
-        orig = geocode_place(origin_name)
-        dest = geocode_place(destination_name)
+        # Both ends are geocoded concurrently, off the event loop; directions are then requested
+        # on the coordinates, so plans are cached per snapped endpoints
+        orig, dest = await asyncio.gather(geocode_place_async(origin_name), geocode_place_async(destination_name))
         
         if not orig or not dest:
             return {
                 "answer": f"Couldn't resolve locations. Origin '{origin_name}', Destination '{destination_name}'.",
-                "sources": ["https://maps.google.com", "https://ridebt.org/"]
+                "sources": ["https://maps.google.com", "https://ridebt.org/"],
+                "engine": "google"
             }
 
-        origin = (orig["lat"], orig["lng"])
-        destination = (dest["lat"], dest["lng"])
-        plan = directions_transit(origin, destination, departure_time=datetime.now())
+        plan = await directions_transit_async((orig["lat"], orig["lng"]), (dest["lat"], dest["lng"]),
+                                              departure_time=datetime.now())
 
         if not plan.get("steps"):
             return {
                 "answer": f"No current transit route from {origin_name} to {destination_name}. Try checking Google Maps transit.",
-                "sources": ["https://maps.google.com", "https://ridebt.org/"]
+                "sources": ["https://maps.google.com", "https://ridebt.org/"],
+                "engine": "google"
             }
 
         lines = [f"Fastest route from {origin_name} to {destination_name} (~{plan['duration_text']}):"]
@@ -154,12 +175,18 @@ async def plan_quickest_route(origin_name: str, destination_name: str) -> Dict[s
         
         return {
             "answer": "\n".join(lines),
-            "sources": ["https://maps.google.com", "https://ridebt.org/"]
+            "sources": ["https://maps.google.com", "https://ridebt.org/"],
+            "engine": "google"
         }
     except Exception as e:
+        # Outages and quota errors are answered locally when the places are known
+        local = plan_local_route(origin_name, destination_name, nearby=True)
+        if local:
+            return local
         return {
             "answer": f"Error planning route: {str(e)}. Please try checking Google Maps or RideBT directly.",
-            "sources": ["https://maps.google.com", "https://ridebt.org/"]
+            "sources": ["https://maps.google.com", "https://ridebt.org/"],
+            "engine": "google"
         }
 
 async def next_bus_to(destination_name: str, origin_name: Optional[str] = None) -> Dict[str, Any]:
@@ -300,148 +327,554 @@ BUS_ROUTES = {
     }
 }
 
+# The real BT network compiled from GTFS (python gtfs.py feed.zip network.bin) replaces the tables above
+GTFS_NETWORK_PATH = os.getenv("GTFS_NETWORK_PATH")
+HAND_TYPED_STOPS = RIDEBT_STOPS
+if GTFS_NETWORK_PATH:
+    GTFS_NETWORK = load_network(GTFS_NETWORK_PATH)
+    RIDEBT_STOPS, BUS_ROUTES = GTFS_NETWORK.stops, GTFS_NETWORK.routes
+    # Live feeds use routes.txt ids; file their updates under the network's route keys
+    REALTIME.use_network(GTFS_NETWORK.route_keys, GTFS_NETWORK.trip_routes)
+    # Per-stop departure arrays for every route and service day
+    TIMETABLE = GTFS_NETWORK.timetable
+else:
+    GTFS_NETWORK = None
+    TIMETABLE = Timetable.from_routes(BUS_ROUTES)
+
+# Stop/route lookups used on the request path
+TRANSIT_NETWORK = TransitNetwork(RIDEBT_STOPS, BUS_ROUTES)
+
+def upcoming_departures(stop_id: str, route_id: str, now: datetime, count: int = 1) -> List[datetime]:
+    """
+    Next scheduled departures shifted by the live predicted delay (GTFS-realtime), if any.
+    """
+    delay = REALTIME.predicted_delay(route_id, stop_id, now.timestamp())
+    if not delay:
+        return TIMETABLE.next_departures(stop_id, route_id, now, count)
+    # A late bus scheduled just before now hasn't left yet
+    shift = timedelta(seconds=delay)
+    return [departure + shift for departure in TIMETABLE.next_departures(stop_id, route_id, now - shift, count)]
+
+def minutes_until(departure: datetime, now: datetime) -> int:
+    """
+    Whole minutes from now until departure, rounded up.
+    """
+    return max(0, -(-int((departure - now).total_seconds()) // 60))
+
+# Grid index over stop coordinates for nearest-stop and radius lookups
+STOP_INDEX = SpatialIndex({stop_id: (info["lat"], info["lng"]) for stop_id, info in RIDEBT_STOPS.items()})
+
+def nearest_stops(lat: float, lng: float, k: int = 1) -> List[Dict[str, Any]]:
+    """
+    The k stops closest to a coordinate, nearest first, with great-circle distances in meters.
+    """
+    return [{"stop_id": stop_id, "name": RIDEBT_STOPS[stop_id]["name"], "distance_m": round(distance, 1)}
+            for stop_id, distance in STOP_INDEX.nearest(lat, lng, k)]
+
+def stops_within(lat: float, lng: float, radius_m: float) -> List[Dict[str, Any]]:
+    """
+    All stops within radius_m meters of a coordinate, nearest first.
+    """
+    return [{"stop_id": stop_id, "name": RIDEBT_STOPS[stop_id]["name"], "distance_m": round(distance, 1)}
+            for stop_id, distance in STOP_INDEX.within(lat, lng, radius_m)]
+
+def network_stop_id(stop_id: str) -> str:
+    """
+    Map a hand-typed stop id (as used in STOP_ALIASES) to the loaded network: itself, or the
+    nearest GTFS stop to its coordinates.
+    """
+    if stop_id in RIDEBT_STOPS:
+        return stop_id
+    info = HAND_TYPED_STOPS[stop_id]
+    return STOP_INDEX.nearest(info["lat"], info["lng"])[0][0]
+
+# Stop used when a location can't be resolved
+DEFAULT_STOP = network_stop_id("squires")
+
+# Longest walk the local planner considers between two stops
+MAX_TRANSFER_WALK_M = 1000
+
+def build_footpaths(stops: Dict[str, Dict[str, Any]], max_distance_m: float = MAX_TRANSFER_WALK_M) -> Dict[str, List[Tuple[str, int]]]:
+    """
+    Walking links from every stop to the other stops within max_distance_m.
+    """
+    index = STOP_INDEX if stops is RIDEBT_STOPS else SpatialIndex({stop_id: (info["lat"], info["lng"]) for stop_id, info in stops.items()})
+    footpaths: Dict[str, List[Tuple[str, int]]] = {}
+    for stop_id, info in stops.items():
+        footpaths[stop_id] = [(other, walk_seconds(distance))
+                              for other, distance in index.within(info["lat"], info["lng"], max_distance_m)
+                              if other != stop_id]
+    return footpaths
+
+# Multi-leg earliest-arrival planning without Google
+JOURNEY_PLANNER = JourneyPlanner(TIMETABLE, build_footpaths(RIDEBT_STOPS))
+
+def plan_local_journey(origin_stop: str, dest_stop: str, when: Optional[datetime] = None, bus_only: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Earliest-arrival itinerary between two stops from the local timetable.
+    With bus_only=True, walk-only answers are skipped.
+    """
+    return JOURNEY_PLANNER.plan({origin_stop: 0}, {dest_stop: 0}, when or datetime.now(), min_trips=1 if bus_only else 0)
+
+def format_itinerary_steps(itinerary: Dict[str, Any]) -> List[str]:
+    """
+    Numbered step lines for a planner itinerary.
+    """
+    lines = []
+    for i, leg in enumerate(itinerary["legs"], 1):
+        from_name = RIDEBT_STOPS.get(leg["from_stop"], {}).get("name", "your location")
+        to_name = RIDEBT_STOPS.get(leg["to_stop"], {}).get("name", "your destination")
+        if leg["mode"] == "WALKING":
+            lines.append(f"{i}. Walk {leg['minutes']} min — from {from_name} to {to_name}")
+        else:
+            lines.append(
+                f"{i}. Take {leg['route_id']} ({BUS_ROUTES[leg['route_id']]['name']}) from {from_name} at {leg['departure'].strftime('%I:%M %p')} "
+                f"→ {to_name} at {leg['arrival'].strftime('%I:%M %p')} ({leg['num_stops']} stops)"
+            )
+    return lines
+
+def local_coordinates(location: str) -> Optional[Tuple[float, float]]:
+    """
+    Coordinates for a place from local data only: a previously geocoded name or campus address.
+    """
+    place = cached_geocode(location) or cached_geocode(campus_address(location))
+    return (place["lat"], place["lng"]) if place else None
+
+def local_access(location: str, nearby: bool = False) -> Optional[Dict[str, int]]:
+    """
+    Stops a trip can start or end at, as {stop_id: walk seconds}: the stop the location names, or
+    with nearby=True the stops within walking distance of its locally known coordinates.
+    """
+    stop_id = match_stop(location)
+    if stop_id:
+        return {stop_id: 0}
+    if not nearby:
+        return None
+    coords = local_coordinates(location)
+    if not coords:
+        return None
+    return walk_access(*coords)
+
+def walk_access(lat: float, lng: float) -> Dict[str, int]:
+    """
+    Stops within walking distance of a coordinate (or the nearest one) as {stop_id: walk seconds}.
+    """
+    stops = STOP_INDEX.within(lat, lng, MAX_TRANSFER_WALK_M) or STOP_INDEX.nearest(lat, lng)
+    return {stop_id: walk_seconds(distance) for stop_id, distance in stops}
+
+def plan_local_route(origin_name: str, destination_name: str, nearby: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Plan a trip between two known campus places from the local timetable, without any Google call.
+    With nearby=True, places that aren't stops are walked to/from the stops around their cached coordinates.
+    Returns None when either place is unknown or no itinerary exists.
+    """
+    origins = local_access(origin_name, nearby)
+    destinations = local_access(destination_name, nearby)
+    if not origins or not destinations:
+        return None
+    
+    itinerary = JOURNEY_PLANNER.plan(origins, destinations, datetime.now())
+    if not itinerary:
+        return None
+    
+    lines = [f"Fastest route from {origin_name} to {destination_name} (~{itinerary['duration_minutes']} mins, arrive {itinerary['arrival'].strftime('%I:%M %p')}):"]
+    lines.extend(format_itinerary_steps(itinerary))
+    if not itinerary["legs"]:
+        dest_stop = next(stop_id for stop_id in destinations if stop_id in origins)
+        lines.append(f"You are already at {RIDEBT_STOPS[dest_stop]['name']}.")
+    
+    return {
+        "answer": "\n".join(lines),
+        "sources": ["https://ridebt.org/"],
+        "engine": "local"
+    }
+
+def plan_offline_route(origin_name: str, destination_name: str) -> Dict[str, Any]:
+    """
+    Route answer while Google Maps is unavailable, from the local gazetteer, stops and timetable.
+    """
+    local = plan_local_route(origin_name, destination_name, nearby=True)
+    if local:
+        return local
+    unknown = [name for name in (origin_name, destination_name) if local_access(name, nearby=True) is None]
+    if unknown:
+        answer = f"Google Maps is unavailable and {' and '.join(repr(name) for name in unknown)} isn't a known campus stop or place. Try naming a nearby building or stop."
+    else:
+        answer = f"No bus connection from {origin_name} to {destination_name} right now. Check https://ridebt.org/ for current service."
+    return {
+        "answer": answer,
+        "sources": ["https://ridebt.org/"],
+        "engine": "local"
+    }
+
+# Common variations and addresses that don't contain a stop name
+STOP_ALIASES = {
+    "goodwin": "goodwin_hall",
+    "635 prices fork": "goodwin_hall",  # Goodwin Hall address
+    "lavery": "lavery_hall",
+    "460 old turner": "lavery_hall",  # Lavery Hall address
+    "old turner": "lavery_hall",  # Lavery Hall address (shorter)
+    "mccomas": "mccomas_hall",  # McComas Hall is now in RIDEBT_STOPS
+    "downtown": "main_st",
+    "campus": "squires",
+    "vt": "squires",
+    "virginia tech": "squires"
+}
+STOP_ALIASES = {alias: network_stop_id(stop_id) for alias, stop_id in STOP_ALIASES.items()}
+
+# Place-name matcher compiled once from the stop table
+STOP_MATCHER = StopMatcher(RIDEBT_STOPS, STOP_ALIASES)
+
+# How often each resolution rule fires, for measuring match quality
+STOP_MATCH_STATS: Counter = Counter()
+
+def match_stop(location: str) -> Optional[str]:
+    """
+    Match a location against known stop names and common variations, without geocoding.
+    Returns None if nothing matches.
+    """
+    match = STOP_MATCHER.match(location)
+    return match[0] if match else None
+
+# Precomputed walking times between stops and campus places (python walk_matrix.py walk_matrix.npz);
+# without a built file the matrix covers the stops only
+WALK_MATRIX_PATH = os.getenv("WALK_MATRIX_PATH")
+if WALK_MATRIX_PATH:
+    WALK_MATRIX = WalkMatrix.load(WALK_MATRIX_PATH)
+else:
+    WALK_MATRIX = WalkMatrix.from_points({stop_id: (info["lat"], info["lng"]) for stop_id, info in RIDEBT_STOPS.items()})
+
+def walk_point(location: str) -> Optional[str]:
+    """
+    Walking-matrix id for a location: the campus place itself if it was built in, else the stop it names.
+    A place name and the address the NLU resolved it to find the same row.
+    """
+    point = place_id(campus_address(location))
+    if point in WALK_MATRIX:
+        return point
+    stop_id = match_stop(location)
+    return stop_id if stop_id in WALK_MATRIX else None
+
+def walk_minutes(origin: str, destination: str) -> Optional[int]:
+    """
+    Walking time in minutes between two locations from the precomputed matrix, or None if either is unknown.
+    """
+    origin_point = walk_point(origin)
+    dest_point = walk_point(destination)
+    if not origin_point or not dest_point:
+        return None
+    return WALK_MATRIX.walk_minutes(origin_point, dest_point)
+
+def _nearest_stop_rule(coords: Optional[Tuple[float, float]]) -> Tuple[str, str]:
+    nearest = nearest_stops(*coords) if coords else None
+    if nearest:
+        return nearest[0]["stop_id"], "geocode"
+    return DEFAULT_STOP, "default"
+
+def resolve_stop(location: str) -> Tuple[str, str]:
+    """
+    Resolve a location to (stop_id, rule) where rule is the name-matching rule that fired,
+    "geocode" for the nearest stop to a geocoded point, or "default" for the Squires fallback.
+    Works offline: only places geocoded before are placed on the map (see resolve_stop_async).
+    """
+    stop_id, rule = STOP_MATCHER.match(location) or _nearest_stop_rule(local_coordinates(location))
+    STOP_MATCH_STATS[rule] += 1
+    return stop_id, rule
+
 def find_nearest_stop(location: str) -> str:
     """
     Find the nearest bus stop to a given location.
     """
+    return resolve_stop(location)[0]
+
+async def resolve_stop_async(location: str) -> Tuple[str, str]:
+    """
+    Resolve a location to (stop_id, rule) where rule is the name-matching rule that fired,
+    "geocode" for the nearest stop to a geocoded point, or "default" for the Squires fallback.
+    Name matching runs inline; places geocoded before resolve locally, and only new ones
+    go to Google, off the event loop.
+    """
+    match = STOP_MATCHER.match(location)
+    if match:
+        STOP_MATCH_STATS[match[1]] += 1
+        return match
+    
+    stop_id, rule = DEFAULT_STOP, "default"
     try:
-        # First try to match against known campus places
-        location_lower = location.lower().strip()
-        # print(f"🔍 Finding nearest stop for: '{location}'")
-        
-        # Enhanced matching logic
-        for stop_id, stop_info in RIDEBT_STOPS.items():
-            stop_name_lower = stop_info["name"].lower()
-            
-            # Direct name match
-            if stop_name_lower == location_lower:
-                # print(f"✅ Direct match: {location} → {stop_id}")
-                return stop_id
-            
-            # Partial name match
-            if stop_name_lower in location_lower or location_lower in stop_name_lower:
-                # print(f"✅ Partial match: {location} → {stop_id}")
-                return stop_id
-            
-            # Word-based matching (more strict)
-            location_words = set(location_lower.split())
-            stop_words = set(stop_name_lower.split())
-            
-            # Check if the main word (first word) matches
-            if location_words and stop_words:
-                main_word = list(location_words)[0]  # First word
-                if main_word in stop_words:
-                    # print(f"✅ Word match: {location} → {stop_id}")
-                    return stop_id
-            
-            # If more than 70% of words match (increased threshold)
-            if len(location_words.intersection(stop_words)) >= max(1, len(location_words) * 0.7):
-                # print(f"✅ Word match: {location} → {stop_id}")
-                return stop_id
-        
-        # Special case matching for common variations and addresses
-        special_matches = {
-            "goodwin": "goodwin_hall",
-            "635 prices fork": "goodwin_hall",  # Goodwin Hall address
-            "lavery": "lavery_hall",
-            "460 old turner": "lavery_hall",  # Lavery Hall address
-            "old turner": "lavery_hall",  # Lavery Hall address (shorter)
-            "mccomas": "mccomas_hall",  # McComas Hall is now in RIDEBT_STOPS
-            "downtown": "main_st",
-            "campus": "squires",
-            "vt": "squires",
-            "virginia tech": "squires"
+        location_coords = local_coordinates(location)
+        if not location_coords and google_available():
+            place = await geocode_place_async(location)
+            location_coords = (place["lat"], place["lng"]) if place else None
+        stop_id, rule = _nearest_stop_rule(location_coords)
+    except Exception:
+        pass
+    
+    STOP_MATCH_STATS[rule] += 1
+    return stop_id, rule
+
+async def find_nearest_stop_async(location: str) -> str:
+    """
+    Find the nearest bus stop to a given location.
+    """
+    return (await resolve_stop_async(location))[0]
+
+def build_departure_board(now: datetime) -> Dict[str, Any]:
+    """
+    Next departures and rendered text for every stop and route as of `now` (a minute boundary).
+    """
+    hours = {route_id: TIMETABLE.service_hours_text(route_id, now.date()) for route_id in BUS_ROUTES}
+    operating = {route_id: TIMETABLE.is_operating(route_id, now) for route_id in BUS_ROUTES}
+    departures: Dict[Tuple[str, str], List[datetime]] = {}
+    eta_lines: Dict[Tuple[str, str], str] = {}
+
+    for route_id, route_info in BUS_ROUTES.items():
+        for stop_id in dict.fromkeys(route_info["stops"]):
+            upcoming = upcoming_departures(stop_id, route_id, now, count=2)
+            departures[(stop_id, route_id)] = upcoming if operating[route_id] else []
+            if not upcoming or not operating[route_id]:
+                eta_lines[(stop_id, route_id)] = f"🚌 {route_id}: Not operating (runs {hours[route_id]})"
+            else:
+                eta_lines[(stop_id, route_id)] = (f"🚌 {route_id}: {upcoming[0].strftime('%I:%M %p')} "
+                                                  f"(in {minutes_until(upcoming[0], now)} minutes)")
+
+    # get_bus_eta_for_location answers for every stop
+    stop_text: Dict[str, str] = {}
+    for stop_id, stop_info in RIDEBT_STOPS.items():
+        lines = [eta_lines[(stop_id, route_id)] for route_id in TRANSIT_NETWORK.routes_serving(stop_id)]
+        if lines:
+            stop_text[stop_id] = (f"Next buses at {stop_info['name']}:\n" + "\n".join(lines) +
+                                  f"\n\n📍 You are nearest to: {stop_info['name']}")
+
+    # Per-route status as reported by get_live_bus_positions, read at each route's first stop
+    route_status: Dict[str, Dict[str, Any]] = {}
+    route_text: Dict[str, str] = {}
+    for route_id, route_info in BUS_ROUTES.items():
+        upcoming = departures[(route_info["stops"][0], route_id)]
+        name = f"{route_id} ({route_info['name']})"
+        if not upcoming:
+            route_status[route_id] = {"status": "Not operating", "next_departure": None, "operating_hours": hours[route_id]}
+            route_text[route_id] = f"🚌 {name} is not currently operating.\nOperating hours: {hours[route_id]}"
+            continue
+        route_status[route_id] = {
+            "status": "Operating",
+            "next_departure": upcoming[0].strftime("%I:%M %p"),
+            "minutes_until_next": minutes_until(upcoming[0], now),
+            "frequency": f"Every {route_info['frequency']} minutes",
+            "description": route_info["description"],
+            "delay_minutes": round(REALTIME.predicted_delay(route_id, now=now.timestamp()) / 60),
         }
-        
-        for keyword, stop_id in special_matches.items():
-            if keyword in location_lower:
-                # print(f"✅ Special match: {location} → {stop_id}")
-                return stop_id
-        
-        # If no direct match, use geocoding and distance calculation
-        location_coords = geocode_place(location)
-        
-        if location_coords:
-            user_lat = location_coords["lat"]
-            user_lng = location_coords["lng"]
-            nearest_stop = None
-            min_distance = float('inf')
-            
-            for stop_id, stop_info in RIDEBT_STOPS.items():
-                stop_lat = stop_info["lat"]
-                stop_lng = stop_info["lng"]
-                # Simple Euclidean distance for now
-                distance = ((user_lat - stop_lat) ** 2 + (user_lng - stop_lng) ** 2) ** 0.5
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_stop = stop_id
-            
-            if nearest_stop:
-                # print(f"✅ Geocoded match: {location} → {nearest_stop}")
-                return nearest_stop
-        
-        # print(f"⚠️ No match found for {location}, using default: squires")
-        return "squires"  # Default fallback
-        
-    except Exception as e:
-        # print(f"❌ Error finding nearest stop for {location}: {e}")
-        return "squires"  # Safe fallback
+        status = route_status[route_id]
+        route_text[route_id] = (f"🚌 {name} - Live Status\n"
+                                f"Status: Operating\n"
+                                f"Next departure: {status['next_departure']} (in {status['minutes_until_next']} minutes)\n"
+                                + (f"Running about {status['delay_minutes']} min late (live)\n" if status["delay_minutes"] else "")
+                                + f"Frequency: {status['frequency']}\n"
+                                f"Route: {status['description']}\n")
+
+    operating_routes = [route_id for route_id, status in route_status.items() if status["status"] == "Operating"]
+    summary = f"🚌 Live Bus Status - Blacksburg Transit\nLast updated: {now.strftime('%I:%M %p')}\n\n"
+    if operating_routes:
+        summary += "Currently Operating:\n"
+        for route_id in operating_routes:
+            status = route_status[route_id]
+            summary += f"  • {route_id}: Next bus at {status['next_departure']} ({status['minutes_until_next']} min)\n"
+    non_operating = [route_id for route_id in route_status if route_id not in operating_routes]
+    if non_operating:
+        summary += f"\nNot operating: {', '.join(non_operating)}\n"
+
+    active = [f"{route_id}: Every {BUS_ROUTES[route_id]['frequency']} minutes" for route_id in BUS_ROUTES if operating[route_id]]
+    if active:
+        active_text = "Active bus routes right now:\n" + "\n".join(f"🚌 {route}" for route in active)
+    else:
+        active_text = "No bus routes are currently operating. Most routes run from 6:00 AM to 11:00 PM."
+
+    return {
+        "minute": now,
+        "hours": hours,
+        "operating": operating,
+        "departures": departures,
+        "eta_lines": eta_lines,
+        "stop_text": stop_text,
+        "route_status": route_status,
+        "route_text": route_text,
+        "summary_text": summary,
+        "active_routes_text": active_text,
+        # (route_id, stop_id) -> get_live_bus_schedule answer, rendered on first request in the minute
+        "schedule_text": {},
+    }
+
+def render_route_schedule(board: Dict[str, Any], route_id: str, nearest_stop: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    (answer, sources) for get_live_bus_schedule from a departure board.
+    """
+    route_info = BUS_ROUTES[route_id]
+    # Read departures at the nearest stop when the route serves it
+    board_stop = nearest_stop if TRANSIT_NETWORK.stop_index(route_id, nearest_stop) is not None else route_info["stops"][0]
+    departures = board["departures"][(board_stop, route_id)]
+    if not departures:
+        return (f"{route_info['name']} is not currently operating. Service hours: {board['hours'][route_id]}",
+                ("https://ridebt.org/",))
+
+    answer = (f"{route_info['name']} Schedule:\n"
+              f"🚌 Next bus: {departures[0].strftime('%I:%M %p')} (in {minutes_until(departures[0], board['minute'])} minutes)\n")
+    if len(departures) > 1:
+        answer += f"🚌 Following bus: {departures[1].strftime('%I:%M %p')}\n"
+    answer += (f"📍 Nearest stop: {RIDEBT_STOPS.get(nearest_stop, {}).get('name', nearest_stop)}\n"
+               f"⏱️ Frequency: Every {route_info['frequency']} minutes")
+    return answer, ("https://ridebt.org/", "https://maps.google.com")
+
+# Materialized boards, rebuilt at each minute boundary
+DEPARTURE_BOARDS = MinuteBoards(build_departure_board)
+
+def departure_board(now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    The departure board for the current minute.
+    """
+    return DEPARTURE_BOARDS.current(now or datetime.now())
+
+async def get_batch_etas(locations: List[str], routes: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Next arrivals for many stops at once, read from the current departure board.
+    locations may be stop ids or place names; routes optionally limits the routes reported.
+    Duplicate locations are resolved once and unmatched names are geocoded concurrently.
+    """
+    board = departure_board()
+    route_filter = {route.upper() for route in routes} if routes else None
+
+    resolved: Dict[str, Tuple[str, str]] = {}
+    unmatched = []
+    for location in dict.fromkeys(locations):
+        if location in RIDEBT_STOPS:
+            resolved[location] = (location, "stop_id")
+        else:
+            match = STOP_MATCHER.match(location)
+            if match:
+                STOP_MATCH_STATS[match[1]] += 1
+                resolved[location] = match
+            else:
+                unmatched.append(location)
+    if unmatched:
+        for location, result in zip(unmatched, await asyncio.gather(*(resolve_stop_async(l) for l in unmatched))):
+            resolved[location] = result
+
+    # Arrivals per stop are built once however many locations resolve to it
+    arrivals_by_stop: Dict[str, List[Dict[str, Any]]] = {}
+    results = []
+    for location in locations:
+        stop_id, rule = resolved[location]
+        if stop_id not in arrivals_by_stop:
+            arrivals = []
+            for route_id in TRANSIT_NETWORK.routes_serving(stop_id):
+                if route_filter and route_id not in route_filter:
+                    continue
+                departures = board["departures"].get((stop_id, route_id), [])
+                arrivals.append({
+                    "route_id": route_id,
+                    "route_name": BUS_ROUTES[route_id]["name"],
+                    "operating": bool(departures),
+                    "departures": [d.isoformat(timespec="minutes") for d in departures],
+                    "minutes": [minutes_until(d, board["minute"]) for d in departures],
+                    "service_hours": board["hours"][route_id],
+                })
+            arrivals_by_stop[stop_id] = arrivals
+        results.append({
+            "query": location,
+            "stop_id": stop_id,
+            "stop_name": RIDEBT_STOPS.get(stop_id, {}).get("name", stop_id),
+            "match": rule,
+            "arrivals": arrivals_by_stop[stop_id],
+        })
+
+    return {
+        "as_of": board["minute"].isoformat(timespec="minutes"),
+        "results": results,
+        "sources": ["https://ridebt.org/"]
+    }
+
+async def access_stops_async(location: str) -> Optional[Dict[str, int]]:
+    """
+    local_access for a stop id or place name, geocoding places not known locally while Google is available.
+    None when the location can't be placed.
+    """
+    if location in RIDEBT_STOPS:
+        return {location: 0}
+    access = local_access(location, nearby=True)
+    if access is not None or not google_available("geocode"):
+        return access
+    try:
+        place = await geocode_place_async(location)
+    except Exception:
+        return None
+    return walk_access(place["lat"], place["lng"]) if place else None
+
+async def travel_time_matrix(origins: List[str], destinations: List[str], departure: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Door-to-door minutes by bus and on foot from every origin to every destination, leaving at
+    `departure` (default now), from the local timetable. Each distinct origin costs one one-to-all
+    planner search; the best stop for every destination is then picked in one NumPy reduction.
+    Pairs that are unreachable, or involve a place that couldn't be resolved, are None.
+    """
+    when = departure or datetime.now()
+    if when.tzinfo:
+        when = when.astimezone().replace(tzinfo=None)
+    
+    names = list(dict.fromkeys(origins + destinations))
+    access = dict(zip(names, await asyncio.gather(*(access_stops_async(name) for name in names))))
+    
+    stop_ids = list(RIDEBT_STOPS)
+    column = {stop_id: i for i, stop_id in enumerate(stop_ids)}
+    # egress[stop, destination] = walk from the stop to the destination
+    egress = np.full((len(stop_ids), len(destinations)), np.inf)
+    for j, destination in enumerate(destinations):
+        for stop_id, seconds in (access[destination] or {}).items():
+            egress[column[stop_id], j] = seconds
+    
+    rows: Dict[str, List[Optional[int]]] = {}
+    for origin in dict.fromkeys(origins):
+        arrival = np.full(len(stop_ids), np.inf)
+        if access[origin]:
+            for stop_id, seconds in JOURNEY_PLANNER.arrivals(access[origin], when).items():
+                arrival[column[stop_id]] = seconds
+        totals = (arrival[:, None] + egress).min(axis=0)
+        rows[origin] = [0 if origin == destination else None if np.isinf(total) else -(-int(total) // 60)
+                        for destination, total in zip(destinations, totals)]
+    
+    return {
+        "departure": when.isoformat(timespec="minutes"),
+        "origins": origins,
+        "destinations": destinations,
+        "minutes": [rows[origin] for origin in origins],
+        "unresolved": [name for name in names if not access[name]],
+        "sources": ["https://ridebt.org/"]
+    }
 
 async def get_live_bus_schedule(route_name: str = None, origin: str = None) -> Dict[str, Any]:
     """
     Get live bus schedules from RideBT API or estimate based on current time.
     """
     try:
-        current_time = datetime.now()
-        current_hour = current_time.hour
-        current_minute = current_time.minute
+        board = departure_board()
         
         if route_name:
             route_name = route_name.upper()
             if route_name in BUS_ROUTES:
                 route_info = BUS_ROUTES[route_name]
                 
-                # Check if route is operating
-                if current_hour < route_info["operating_hours"]["start"] or current_hour >= route_info["operating_hours"]["end"]:
-                    return {
-                        "answer": f"{route_info['name']} is not currently operating. Service hours: {route_info['operating_hours']['start']}:00 AM - {route_info['operating_hours']['end']}:00 PM",
-                        "sources": ["https://ridebt.org/"]
-                    }
-                
-                # Calculate next arrival times
-                frequency = route_info["frequency"]
-                minutes_until_next = frequency - (current_minute % frequency)
-                next_arrival = current_time + timedelta(minutes=minutes_until_next)
-                following_arrival = next_arrival + timedelta(minutes=frequency)
-                
-                nearest_stop = find_nearest_stop(origin) if origin else route_info["stops"][0]
-                
+                nearest_stop = await find_nearest_stop_async(origin) if origin else route_info["stops"][0]
+                key = (route_name, nearest_stop)
+                if key not in board["schedule_text"]:
+                    board["schedule_text"][key] = render_route_schedule(board, route_name, nearest_stop)
+                answer, sources = board["schedule_text"][key]
                 return {
-                    "answer": f"{route_info['name']} Schedule:\n"
-                             f"🚌 Next bus: {next_arrival.strftime('%I:%M %p')} (in {minutes_until_next} minutes)\n"
-                             f"🚌 Following bus: {following_arrival.strftime('%I:%M %p')}\n"
-                             f"📍 Nearest stop: {RIDEBT_STOPS.get(nearest_stop, {}).get('name', nearest_stop)}\n"
-                             f"⏱️ Frequency: Every {frequency} minutes",
-                    "sources": ["https://ridebt.org/", "https://maps.google.com"]
+                    "answer": answer,
+                    "sources": list(sources)
                 }
         
         # General schedule if no specific route
-        active_routes = []
-        for route, info in BUS_ROUTES.items():
-            if info["operating_hours"]["start"] <= current_hour < info["operating_hours"]["end"]:
-                active_routes.append(f"{route}: Every {info['frequency']} minutes")
-        
-        if active_routes:
-            return {
-                "answer": f"Active bus routes right now:\n" + "\n".join(f"🚌 {route}" for route in active_routes),
-                "sources": ["https://ridebt.org/"]
-            }
-        else:
-            return {
-                "answer": "No bus routes are currently operating. Most routes run from 6:00 AM to 11:00 PM.",
-                "sources": ["https://ridebt.org/"]
-            }
+        return {
+            "answer": board["active_routes_text"],
+            "sources": ["https://ridebt.org/"]
+        }
             
     except Exception as e:
         return {
@@ -454,7 +887,7 @@ async def get_bus_eta_for_location(origin: str, route_name: str = None) -> Dict[
     Get estimated time of arrival for next bus at user's current location.
     """
     try:
-        nearest_stop_id = find_nearest_stop(origin)
+        nearest_stop_id = await find_nearest_stop_async(origin)
         nearest_stop = RIDEBT_STOPS.get(nearest_stop_id, {})
         
         if not nearest_stop:
@@ -464,10 +897,7 @@ async def get_bus_eta_for_location(origin: str, route_name: str = None) -> Dict[
             }
         
         # Get schedule for the route that serves this stop
-        serving_routes = []
-        for route_id, route_info in BUS_ROUTES.items():
-            if nearest_stop_id in route_info["stops"]:
-                serving_routes.append((route_id, route_info))
+        serving_routes = [(route_id, BUS_ROUTES[route_id]) for route_id in TRANSIT_NETWORK.routes_serving(nearest_stop_id)]
         
         if not serving_routes:
             return {
@@ -486,30 +916,13 @@ async def get_bus_eta_for_location(origin: str, route_name: str = None) -> Dict[
                     "sources": ["https://ridebt.org/"]
                 }
         
-        # Calculate ETAs for serving routes
-        current_time = datetime.now()
-        results = []
-        
-        for route_id, route_info in serving_routes:
-            current_hour = current_time.hour
-            
-            # Check if route is operating
-            if current_hour < route_info["operating_hours"]["start"] or current_hour >= route_info["operating_hours"]["end"]:
-                results.append(f"🚌 {route_id}: Not operating (runs {route_info['operating_hours']['start']}:00 AM - {route_info['operating_hours']['end']}:00 PM)")
-                continue
-            
-            frequency = route_info["frequency"]
-            current_minute = current_time.minute
-            minutes_until_next = frequency - (current_minute % frequency)
-            next_arrival = current_time + timedelta(minutes=minutes_until_next)
-            
-            results.append(f"🚌 {route_id}: {next_arrival.strftime('%I:%M %p')} (in {minutes_until_next} minutes)")
-        
-        if results:
-            answer = f"Next buses at {nearest_stop['name']}:\n" + "\n".join(results)
+        # ETAs come from the current minute's departure board
+        board = departure_board()
+        if route_name:
+            answer = f"Next buses at {nearest_stop['name']}:\n" + board["eta_lines"][(nearest_stop_id, route_name)]
             answer += f"\n\n📍 You are nearest to: {nearest_stop['name']}"
         else:
-            answer = f"No buses currently operating near {nearest_stop['name']}."
+            answer = board["stop_text"][nearest_stop_id]
         
         return {
             "answer": answer,
@@ -536,28 +949,26 @@ async def enhanced_next_bus_to(destination: str, origin: str = None, bus_route:
             return await get_bus_eta_for_location(origin, bus_route)
         
         # General next bus to destination
-        destination_stop = find_nearest_stop(destination)
+        destination_stop = await find_nearest_stop_async(destination)
         
         # Find routes that serve the destination
-        serving_routes = []
-        for route_id, route_info in BUS_ROUTES.items():
-            if destination_stop in route_info["stops"]:
-                serving_routes.append(route_id)
+        serving_routes = TRANSIT_NETWORK.routes_serving(destination_stop)
         
         if not serving_routes:
             return await plan_quickest_route("Virginia Tech, Blacksburg, VA", destination)
         
         # Get schedules for all serving routes
         schedule_info = []
-        current_time = datetime.now()
+        board = departure_board()
         
         for route_id in serving_routes:
             route_info = BUS_ROUTES[route_id]
             
-            if route_info["operating_hours"]["start"] <= current_time.hour < route_info["operating_hours"]["end"]:
+            departures = board["departures"].get((destination_stop, route_id))
+            
+            if departures:
                 frequency = route_info["frequency"]
-                minutes_until_next = frequency - (current_time.minute % frequency)
-                next_arrival = current_time + timedelta(minutes=minutes_until_next)
+                next_arrival = departures[0]
                 
                 schedule_info.append(f"🚌 {route_id}: {next_arrival.strftime('%I:%M %p')} (every {frequency} min)")
         
@@ -580,9 +991,8 @@ async def get_bus_schedule_for_route(origin: str, destination: str) -> str:
     Get bus schedule information for a specific origin-destination pair.
     """
     try:
-        # Find nearest stops for origin and destination
-        origin_stop = find_nearest_stop(origin)
-        dest_stop = find_nearest_stop(destination)
+        # Find nearest stops for origin and destination concurrently
+        origin_stop, dest_stop = await asyncio.gather(find_nearest_stop_async(origin), find_nearest_stop_async(destination))
         
         # print(f"🔍 Bus Schedule Debug - Origin: {origin} → {origin_stop}")
         # print(f"🔍 Bus Schedule Debug - Destination: {destination} → {dest_stop}")
@@ -590,49 +1000,63 @@ async def get_bus_schedule_for_route(origin: str, destination: str) -> str:
         origin_stop_name = RIDEBT_STOPS.get(origin_stop, {}).get("name", origin)
         dest_stop_name = RIDEBT_STOPS.get(dest_stop, {}).get("name", destination)
         
+        if origin_stop == dest_stop:
+            return f"📍 You're already at {dest_stop_name}; no bus needed."
+        
         # Find routes that serve both stops
-        serving_routes = []
-        for route_id, route_info in BUS_ROUTES.items():
-            if origin_stop in route_info["stops"] and dest_stop in route_info["stops"]:
-                # print(f"✅ Found direct route: {route_id} serves both {origin_stop} and {dest_stop}")
-                serving_routes.append((route_id, route_info))
+        direct_routes = TRANSIT_NETWORK.routes_serving_both(origin_stop, dest_stop)
         
-        if not serving_routes:
-            # Find routes that serve at least the origin
-            for route_id, route_info in BUS_ROUTES.items():
-                if origin_stop in route_info["stops"]:
-                    serving_routes.append((route_id, route_info))
+        if not direct_routes:
+            # No single route, so look for a connection with transfers
+            itinerary = plan_local_journey(origin_stop, dest_stop, bus_only=True)
+            if not itinerary:
+                return "No bus routes serve these locations."
+            
+            result = f"📍 From {origin_stop_name} to {dest_stop_name}:\n"
+            result += f"   No direct bus. Best connection ({itinerary['transfers']} transfer{'s' if itinerary['transfers'] != 1 else ''}, arrive {itinerary['arrival'].strftime('%I:%M %p')}):\n"
+            result += "\n".join(f"   {line}" for line in format_itinerary_steps(itinerary))
+            return result
         
-        if not serving_routes:
-            return "No bus routes serve these locations."
+        serving_routes = [(route_id, BUS_ROUTES[route_id]) for route_id in direct_routes]
         
-        # Get current time and calculate next arrivals
-        current_time = datetime.now()
+        # Next arrivals from the current minute's departure board
+        board = departure_board()
         schedule_info = []
+        soonest_wait = None
         
         for route_id, route_info in serving_routes:
-            current_hour = current_time.hour
+            departures = board["departures"][(origin_stop, route_id)]
             
             # Check if route is operating
-            if current_hour < route_info["operating_hours"]["start"] or current_hour >= route_info["operating_hours"]["end"]:
+            if not departures:
                 continue
             
             frequency = route_info["frequency"]
-            current_minute = current_time.minute
-            minutes_until_next = frequency - (current_minute % frequency)
-            next_arrival = current_time + timedelta(minutes=minutes_until_next)
-            following_arrival = next_arrival + timedelta(minutes=frequency)
+            next_arrival = departures[0]
+            minutes_until_next = minutes_until(next_arrival, board["minute"])
+            if soonest_wait is None or minutes_until_next < soonest_wait:
+                soonest_wait = minutes_until_next
             
-            schedule_info.append(
+            route_lines = (
                 f"   🚌 {route_id} ({route_info['name']}):\n"
                 f"      Next bus: {next_arrival.strftime('%I:%M %p')} (in {minutes_until_next} min)\n"
-                f"      Following: {following_arrival.strftime('%I:%M %p')}\n"
-                f"      Frequency: Every {frequency} minutes"
             )
+            if len(departures) > 1:
+                route_lines += f"      Following: {departures[1].strftime('%I:%M %p')}\n"
+            route_lines += f"      Frequency: Every {frequency} minutes"
+            num_stops = TRANSIT_NETWORK.stops_between(route_id, origin_stop, dest_stop)
+            if num_stops is not None:
+                route_lines += f"\n      Ride: {num_stops} stops"
+            schedule_info.append(route_lines)
         
         if schedule_info:
             result = f"📍 From {origin_stop_name} to {dest_stop_name}:\n"
             result += "\n".join(schedule_info)
+            walk = walk_minutes(origin, destination)
+            if walk is not None:
+                result += f"\n   🚶 Walking instead: ~{walk} min"
+                if walk <= soonest_wait:
+                    result += " (you'd arrive before the next bus leaves)"
             return result
         else:
             return "No buses currently operating to these locations."
@@ -681,24 +1105,32 @@ async def enhanced_plan_quickest_route(origin_name: str, destination_name: str,
     If bus_only=True, only shows bus options.
     """
     try:
-        # Get bus schedule information first
-        bus_info = await get_bus_schedule_for_route(origin_name, destination_name)
-        
         if bus_only:
+            bus_info = await get_bus_schedule_for_route(origin_name, destination_name)
             # If user specifically asked for bus, only show bus options
             if bus_info and "No bus routes serve" not in bus_info and "No buses currently operating" not in bus_info:
                 return {
                     "answer": f"🚌 Bus Routes from {origin_name} to {destination_name}:\n\n{bus_info}",
-                    "sources": ["https://ridebt.org/live-map", "https://maps.google.com"]
+                    "sources": ["https://ridebt.org/live-map", "https://maps.google.com"],
+                    "engine": "local"
                 }
             else:
+                walk = walk_minutes(origin_name, destination_name)
+                walk_note = f"Walking takes about {walk} minutes." if walk is not None else "Consider walking or using a combination of bus and walking."
                 return {
-                    "answer": f"🚌 No direct bus routes available from {origin_name} to {destination_name}.\n\nConsider walking or using a combination of bus and walking.",
-                    "sources": ["https://ridebt.org/", "https://maps.google.com"]
+                    "answer": f"🚌 No direct bus routes available from {origin_name} to {destination_name}.\n\n{walk_note}",
+                    "sources": ["https://ridebt.org/", "https://maps.google.com"],
+                    "engine": "local"
                 }
         
-        # Get the basic route (walking) first
-        basic_route = await plan_quickest_route(origin_name, destination_name)
+        # Plan locally when both ends are known stops; only go to Google otherwise,
+        # fetching directions while the bus schedule is worked out
+        basic_route = plan_local_route(origin_name, destination_name)
+        if basic_route:
+            bus_info = await get_bus_schedule_for_route(origin_name, destination_name)
+        else:
+            bus_info, basic_route = await asyncio.gather(get_bus_schedule_for_route(origin_name, destination_name),
+                                                         plan_quickest_route(origin_name, destination_name))
         
         # Enhance walking directions with time estimates
         enhanced_walking = await enhance_walking_directions(basic_route["answer"])
@@ -711,12 +1143,30 @@ async def enhanced_plan_quickest_route(origin_name: str, destination_name: str,
         
         return {
             "answer": enhanced_answer,
-            "sources": basic_route.get("sources", ["https://maps.google.com", "https://ridebt.org/"])
+            "sources": basic_route.get("sources", ["https://maps.google.com", "https://ridebt.org/"]),
+            "engine": basic_route.get("engine", "google")
         }
         
     except Exception as e:
         return await plan_quickest_route(origin_name, destination_name)
 
+def live_alerts() -> List[Dict[str, Any]]:
+    """
+    Service alerts from the GTFS-realtime feed when configured, else the known HDG stops closure.
+    """
+    if "alerts" in configured_feeds():
+        return REALTIME.alert_list()
+    return [
+        {
+            "type": "Route",
+            "cause": "Construction", 
+            "effect": "Stop Moved",
+            "routes_affected": ["HDG"],
+            "message": "HDG Stops 1516 & 1517 Closed due to road construction",
+            "more_info": "https://ridebt.org/news-alerts/554-hdg-stops-1516-1517-closed"
+        }
+    ]
+
 async def get_live_bus_positions() -> Dict[str, Any]:
     """
     Get real-time bus positions from RideBT live map.
@@ -734,45 +1184,14 @@ async def get_live_bus_positions() -> Dict[str, Any]:
             "alerts": []
         }
         
-        # Check for any service alerts (like the HDG stops closure mentioned on their site)
-        alerts = [
-            {
-                "type": "Route",
-                "cause": "Construction", 
-                "effect": "Stop Moved",
-                "routes_affected": ["HDG"],
-                "message": "HDG Stops 1516 & 1517 Closed due to road construction",
-                "more_info": "https://ridebt.org/news-alerts/554-hdg-stops-1516-1517-closed"
-            }
-        ]
-        live_info["alerts"] = alerts
+        live_info["alerts"] = live_alerts()
         
-        # Generate enhanced schedule information for each route
-        for route_id, route_info in BUS_ROUTES.items():
-            current_hour = current_time.hour
-            
-            # Check if route is operating
-            if current_hour < route_info["operating_hours"]["start"] or current_hour >= route_info["operating_hours"]["end"]:
-                live_info["buses"][route_id] = {
-                    "status": "Not operating",
-                    "next_departure": None,
-                    "operating_hours": f"{route_info['operating_hours']['start']}:00 - {route_info['operating_hours']['end']}:00"
-                }
-                continue
-            
-            # Calculate next departure times
-            frequency = route_info["frequency"]
-            current_minute = current_time.minute
-            minutes_until_next = frequency - (current_minute % frequency)
-            next_departure = current_time + timedelta(minutes=minutes_until_next)
-            
-            live_info["buses"][route_id] = {
-                "status": "Operating",
-                "next_departure": next_departure.strftime("%I:%M %p"),
-                "minutes_until_next": minutes_until_next,
-                "frequency": f"Every {frequency} minutes",
-                "description": route_info["description"]
-            }
+        # Route status comes from the current minute's departure board; vehicle positions are live
+        board = departure_board(current_time)
+        for route_id, status in board["route_status"].items():
+            live_info["buses"][route_id] = dict(status)
+            if status["status"] == "Operating":
+                live_info["buses"][route_id]["vehicles"] = REALTIME.route_vehicles(route_id)
         
         return live_info
         
@@ -788,48 +1207,29 @@ async def get_enhanced_bus_info_with_live_data(route_id: Optional[str] = None, l
     Get enhanced bus information combining live map data with schedule information.
     """
     try:
-        live_data = await get_live_bus_positions()
-        
-        if route_id and route_id.upper() in live_data.get("buses", {}):
-            bus_info = live_data["buses"][route_id.upper()]
-            
-            if bus_info["status"] == "Not operating":
-                return f"🚌 {route_id.upper()} ({BUS_ROUTES[route_id.upper()]['name']}) is not currently operating.\nOperating hours: {bus_info['operating_hours']}"
-            
-            result = f"🚌 {route_id.upper()} ({BUS_ROUTES[route_id.upper()]['name']}) - Live Status\n"
-            result += f"Status: {bus_info['status']}\n"
-            result += f"Next departure: {bus_info['next_departure']} (in {bus_info['minutes_until_next']} minutes)\n"
-            result += f"Frequency: {bus_info['frequency']}\n"
-            result += f"Route: {bus_info['description']}\n"
+        board = departure_board()
+        alerts = live_alerts()
+        
+        if route_id and route_id.upper() in board["route_text"]:
+            route_id = route_id.upper()
+            result = board["route_text"][route_id]
+            if board["route_status"][route_id]["status"] == "Not operating":
+                return result
             
             # Add any relevant alerts
-            if live_data.get("alerts"):
-                for alert in live_data["alerts"]:
-                    if route_id.upper() in alert.get("routes_affected", []):
-                        result += f"\n⚠️ Alert: {alert['message']}"
+            for alert in alerts:
+                if route_id in alert.get("routes_affected", []):
+                    result += f"\n⚠️ Alert: {alert['message']}"
             
             return result
         
         # General live status for all routes
-        result = "🚌 Live Bus Status - Blacksburg Transit\n"
-        result += f"Last updated: {datetime.now().strftime('%I:%M %p')}\n\n"
-        
-        operating_routes = [route for route, info in live_data.get("buses", {}).items() if info["status"] == "Operating"]
-        
-        if operating_routes:
-            result += "Currently Operating:\n"
-            for route in operating_routes:
-                info = live_data["buses"][route]
-                result += f"  • {route}: Next bus at {info['next_departure']} ({info['minutes_until_next']} min)\n"
-        
-        non_operating = [route for route, info in live_data.get("buses", {}).items() if info["status"] == "Not operating"]
-        if non_operating:
-            result += f"\nNot operating: {', '.join(non_operating)}\n"
+        result = board["summary_text"]
         
         # Add service alerts
-        if live_data.get("alerts"):
+        if alerts:
             result += "\n⚠️ Service Alerts:\n"
-            for alert in live_data["alerts"]:
+            for alert in alerts:
                 result += f"  • {alert['message']}\n"
         
         result += f"\n📱 For real-time tracking, visit: https://ridebt.org/live-map"
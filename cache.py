@@ -0,0 +1,113 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Returned on a miss, so a cached None (negative result) can be told apart from "not cached"
+MISSING = object()
+
+
+class LRUCache:
+    """
+    In-process LRU cache with per-entry TTL and hit/miss counters.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Cached value for key, or MISSING."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return MISSING
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl or ttl)
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+class SQLiteCache:
+    """
+    JSON key/value cache with expiry, stored in a SQLite file.
+    WAL mode lets every uvicorn worker read and write the same file; entries survive restarts.
+    Storage errors are treated as misses so a bad disk never breaks a request.
+    """
+
+    def __init__(self, path: str, table: str = "cache"):
+        self.path = path
+        self.table = table
+        self._local = threading.local()
+        try:
+            conn = self._conn()
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} "
+                         "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            conn.execute(f"DELETE FROM {table} WHERE expires <= ?", (time.time(),))
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any:
+        """Cached value for key, or MISSING."""
+        try:
+            row = self._conn().execute(f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return MISSING
+        if not row or row[1] <= time.time():
+            return MISSING
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            conn = self._conn()
+            conn.execute(f"INSERT OR REPLACE INTO {self.table} (key, value, expires) VALUES (?, ?, ?)",
+                         (key, json.dumps(value), time.time() + ttl))
+            conn.commit()
+        except sqlite3.Error:
+            pass
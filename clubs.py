@@ -1,10 +1,13 @@
-import requests
+import httpx
 from bs4 import BeautifulSoup
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List
+from services.http_client import fetch
+from services.singleflight import coalesce
 import asyncio
 
+@coalesce
 async def get_club_events() -> str:
     """
     Scrape club events from Gobbler Connect.
@@ -17,8 +20,7 @@ async def get_club_events() -> str:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        response = await fetch(url, headers=headers, timeout=10)
         
         soup = BeautifulSoup(response.content, 'html.parser')
         
@@ -76,7 +78,7 @@ async def get_club_events() -> str:
         
         return result
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Unable to fetch current club events. Please check Gobbler Connect directly. Error: {str(e)}"
     except Exception as e:
         return f"An error occurred while fetching club events: {str(e)}"
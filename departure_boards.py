@@ -0,0 +1,37 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+
+class MinuteBoards:
+    """
+    Holds a snapshot that is rebuilt once per wall-clock minute.
+
+    `build(minute)` computes everything handlers need for that minute; handlers then only do
+    dictionary reads. run() rebuilds right after each minute boundary so requests never pay for
+    it; if the loop isn't running, the first lookup in a new minute rebuilds inline.
+    """
+
+    def __init__(self, build: Callable[[datetime], Any]):
+        self.build = build
+        self.builds = 0
+        self._minute: Optional[datetime] = None
+        self._board: Any = None
+
+    def current(self, now: Optional[datetime] = None) -> Any:
+        minute = (now or datetime.now()).replace(second=0, microsecond=0)
+        if minute != self._minute:
+            self._board = self.build(minute)
+            self._minute = minute
+            self.builds += 1
+        return self._board
+
+    async def run(self) -> None:
+        while True:
+            try:
+                self.current()
+            except Exception as e:
+                print(f"⚠️ Departure board rebuild failed: {e}")
+            now = datetime.now()
+            next_minute = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+            await asyncio.sleep((next_minute - now).total_seconds() + 0.05)
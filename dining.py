@@ -1,9 +1,12 @@
-import requests
+import httpx
 from bs4 import BeautifulSoup
 import json
 from datetime import datetime
 from typing import Dict, List
+from services.http_client import fetch
+from services.singleflight import coalesce
 
+@coalesce
 async def get_dining_halls() -> str:
     """
     Scrape Virginia Tech dining hall information from UDC website.
@@ -16,8 +19,7 @@ async def get_dining_halls() -> str:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        response = await fetch(url, headers=headers, timeout=10)
         
         soup = BeautifulSoup(response.content, 'html.parser')
         
@@ -72,7 +74,7 @@ async def get_dining_halls() -> str:
         
         return result
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return f"Unable to fetch current dining information. Please check the Virginia Tech dining website directly. Error: {str(e)}"
     except Exception as e:
         return f"An error occurred while fetching dining information: {str(e)}"
@@ -0,0 +1,80 @@
+from collections import deque
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class Mention(NamedTuple):
+    """A place phrase found in a text: text[start:end] == phrase."""
+    start: int
+    end: int
+    phrase: str
+    name: str
+
+
+class Gazetteer:
+    """
+    Aho-Corasick automaton over place phrases, compiled once.
+
+    find() reports every phrase occurring in a text as whole words, with its span, in one pass
+    over the text, however many phrases there are. Matching is on the lowercased text.
+    """
+
+    def __init__(self, phrases: Dict[str, str]):
+        # Trie over characters: goto[node][char] -> node; outputs[node] = [(phrase, name)]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[str, str]]] = [[]]
+        for phrase, name in phrases.items():
+            phrase = phrase.lower()
+            node = 0
+            for char in phrase:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                node = nxt
+            if not any(existing[0] == phrase for existing in self._outputs[node]):
+                self._outputs[node].append((phrase, name))
+
+        # Breadth-first failure links; each node also inherits the outputs of its failure node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    @staticmethod
+    def _is_boundary(text: str, index: int) -> bool:
+        return index <= 0 or index >= len(text) or not text[index - 1].isalnum() or not text[index].isalnum()
+
+    def find(self, text: str) -> List[Mention]:
+        """Every whole-word phrase occurrence in text, ordered by start then longest first."""
+        text = text.lower()
+        mentions = []
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for phrase, name in self._outputs[node]:
+                start = i + 1 - len(phrase)
+                if self._is_boundary(text, start) and self._is_boundary(text, i + 1):
+                    mentions.append(Mention(start, i + 1, phrase, name))
+        mentions.sort(key=lambda m: (m.start, -(m.end - m.start)))
+        return mentions
+
+    def longest(self, text: str) -> List[Mention]:
+        """Non-overlapping mentions, preferring the leftmost and then the longest phrase."""
+        chosen: List[Mention] = []
+        for mention in self.find(text):
+            if not chosen or mention.start >= chosen[-1].end:
+                chosen.append(mention)
+        return chosen
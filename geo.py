@@ -0,0 +1,112 @@
+import math
+from typing import Dict, List, Tuple
+
+EARTH_RADIUS_M = 6371000.0
+# Length of one degree of latitude on the haversine sphere
+METERS_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_M / 180
+
+# Average walking speed (~3 mph) and how much longer real paths are than the straight line
+WALK_SPEED_MPS = 1.34
+WALK_DETOUR_FACTOR = 1.3
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Great-circle distance in meters between two lat/lng points.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def walk_seconds(distance_m: float) -> int:
+    """
+    Estimated walking time for a straight-line distance.
+    """
+    return int(round(distance_m * WALK_DETOUR_FACTOR / WALK_SPEED_MPS))
+
+
+class SpatialIndex:
+    """
+    Uniform grid over lat/lng points for k-nearest and within-radius queries.
+    Cells are roughly cell_m on a side; distances are great-circle (haversine).
+    """
+
+    def __init__(self, points: Dict[str, Tuple[float, float]], cell_m: float = 250.0):
+        self.points = dict(points)
+        lats = [lat for lat, _ in self.points.values()] or [0.0]
+        self._dlat = cell_m / METERS_PER_DEGREE_LAT
+        # Longitude degrees shrink with latitude; size cells for the widest point so they are never narrower than cell_m
+        widest = max(abs(lat) for lat in lats)
+        self._dlng = cell_m / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(widest)), 1e-6))
+        self._cell_m = cell_m
+
+        self._cells: Dict[Tuple[int, int], List[str]] = {}
+        for point_id, (lat, lng) in self.points.items():
+            self._cells.setdefault(self._cell(lat, lng), []).append(point_id)
+        rows = [row for row, _ in self._cells] or [0]
+        cols = [col for _, col in self._cells] or [0]
+        self._bounds = (min(rows), max(rows), min(cols), max(cols))
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self._dlat)), int(math.floor(lng / self._dlng))
+
+    def _distance(self, point_id: str, lat: float, lng: float) -> float:
+        p_lat, p_lng = self.points[point_id]
+        return haversine_m(lat, lng, p_lat, p_lng)
+
+    def within(self, lat: float, lng: float, radius_m: float) -> List[Tuple[str, float]]:
+        """
+        All points within radius_m of (lat, lng) as (id, meters), nearest first.
+        """
+        row, col = self._cell(lat, lng)
+        # Cells are at least cell_m tall and wide, so this many rings covers the radius
+        reach = int(math.ceil(radius_m / self._cell_m))
+        found = []
+        for r in range(row - reach, row + reach + 1):
+            for c in range(col - reach, col + reach + 1):
+                for point_id in self._cells.get((r, c), ()):
+                    distance = self._distance(point_id, lat, lng)
+                    if distance <= radius_m:
+                        found.append((point_id, distance))
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def nearest(self, lat: float, lng: float, k: int = 1) -> List[Tuple[str, float]]:
+        """
+        The k points closest to (lat, lng) as (id, meters), nearest first.
+        Searches rings of cells outward until no unsearched cell can hold a closer point; a query
+        far from the occupied cells (an off-campus geocode) is answered by a scan of the points.
+        """
+        if not self.points:
+            return []
+        row, col = self._cell(lat, lng)
+        min_row, max_row, min_col, max_col = self._bounds
+        # Rings beyond this one lie entirely outside the occupied cells
+        last_ring = max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+        # Past this many rings the cells visited (mostly empty) outnumber the occupied ones, and a
+        # scan of every point is cheaper
+        ring_cap = math.isqrt(len(self._cells)) // 2 + 1
+
+        found: List[Tuple[str, float]] = []
+        for ring in range(last_ring + 1):
+            if ring > ring_cap:
+                return self._scan(lat, lng, k)
+            for r in range(row - ring, row + ring + 1):
+                step = 1 if abs(r - row) == ring else 2 * ring
+                for c in range(col - ring, col + ring + 1, step or 1):
+                    for point_id in self._cells.get((r, c), ()):
+                        found.append((point_id, self._distance(point_id, lat, lng)))
+            found.sort(key=lambda item: item[1])
+            # Anything in later rings is at least `ring` whole cells away
+            if len(found) >= k and found[k - 1][1] <= ring * self._cell_m:
+                break
+        return found[:k]
+
+    def _scan(self, lat: float, lng: float, k: int) -> List[Tuple[str, float]]:
+        found = [(point_id, self._distance(point_id, lat, lng)) for point_id in self.points]
+        found.sort(key=lambda item: item[1])
+        return found[:k]
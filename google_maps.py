@@ -1,51 +1,257 @@
+import asyncio
+import contextvars
+import copy
 import os
+import re
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 import googlemaps
+from googlemaps.exceptions import ApiError, Timeout, TransportError
 from dotenv import load_dotenv
 
+from services.cache import MISSING, LRUCache, SQLiteCache
+from services.circuit_breaker import CircuitBreaker
+from services.quota import INTERACTIVE, QuotaManager, QuotaStore
+from services.singleflight import SingleFlight
+
 # Load environment variables
 load_dotenv()
 
 _GOOGLE_KEY = os.getenv("GOOGLE_MAPS_API_KEY", "")
 _client: Optional[googlemaps.Client] = googlemaps.Client(key=_GOOGLE_KEY) if _GOOGLE_KEY else None
 
+class GoogleUnavailable(RuntimeError):
+    """
+    Google Maps can't be called right now: no API key, or the circuit is open after repeated failures.
+    """
+
 def ensure_client() -> googlemaps.Client:
     if not _client:
-        raise RuntimeError("GOOGLE_MAPS_API_KEY not set")
+        raise GoogleUnavailable("GOOGLE_MAPS_API_KEY not set")
     return _client
 
+# After this many consecutive upstream failures Google is skipped for GOOGLE_RESET_SECONDS,
+# and callers answer from local data instead of waiting on timeouts
+GOOGLE_FAILURE_THRESHOLD = int(os.getenv("GOOGLE_FAILURE_THRESHOLD", "5"))
+GOOGLE_RESET_SECONDS = float(os.getenv("GOOGLE_RESET_SECONDS", "30"))
+
+_breaker = CircuitBreaker(GOOGLE_FAILURE_THRESHOLD, GOOGLE_RESET_SECONDS)
+
+# API statuses that mean Google (or our quota) is in trouble, rather than a bad request
+_OUTAGE_STATUSES = {"OVER_QUERY_LIMIT", "OVER_DAILY_LIMIT", "REQUEST_DENIED", "UNKNOWN_ERROR"}
+
+class QuotaExceeded(GoogleUnavailable):
+    """
+    The call would exceed the request rate or the daily/monthly budget for its priority.
+    """
+
+def _limit(name: str, default: str) -> Optional[int]:
+    value = os.getenv(name, default)
+    return int(value) if value else None
+
+# Per-API rate limits (per worker) and call budgets. Budgets are unlimited unless
+# GOOGLE_GEOCODE_DAILY_BUDGET, GOOGLE_GEOCODE_MONTHLY_BUDGET, GOOGLE_DIRECTIONS_DAILY_BUDGET or
+# GOOGLE_DIRECTIONS_MONTHLY_BUDGET is set; their counts are kept in GOOGLE_QUOTA_PATH (by default
+# the geocode cache's SQLite file) so all workers share them. Background calls stop once less
+# than GOOGLE_QUOTA_RESERVE of a budget is left, keeping the rest for interactive requests.
+GOOGLE_QUOTA_RESERVE = float(os.getenv("GOOGLE_QUOTA_RESERVE", "0.2"))
+GOOGLE_QUOTA_PATH = os.getenv("GOOGLE_QUOTA_PATH", os.getenv("GEOCODE_CACHE_PATH", "geocode_cache.sqlite3"))
+
+_quota_store = QuotaStore(GOOGLE_QUOTA_PATH)
+
+GOOGLE_QUOTAS: Dict[str, QuotaManager] = {
+    api: QuotaManager(
+        api,
+        rate=float(os.getenv(f"GOOGLE_{api.upper()}_QPS", "10")),
+        burst=float(os.getenv(f"GOOGLE_{api.upper()}_BURST", "20")),
+        daily_limit=_limit(f"GOOGLE_{api.upper()}_DAILY_BUDGET", ""),
+        monthly_limit=_limit(f"GOOGLE_{api.upper()}_MONTHLY_BUDGET", ""),
+        reserve=GOOGLE_QUOTA_RESERVE,
+        store=_quota_store,
+    )
+    for api in ("geocode", "directions")
+}
+
+# Priority of Google calls made in the current context; interactive unless a caller says otherwise
+_priority: contextvars.ContextVar = contextvars.ContextVar("google_priority", default=INTERACTIVE)
+
+@contextmanager
+def google_priority(priority: str):
+    """
+    Run the enclosed Google calls at the given priority (INTERACTIVE or BACKGROUND).
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def google_available(*apis: str) -> bool:
+    """
+    Whether Google Maps calls are worth attempting: API key set, circuit not open, and budget
+    left at the current priority for each of the given APIs (default: all of them).
+    """
+    priority = _priority.get()
+    return (_client is not None and _breaker.available()
+            and all(GOOGLE_QUOTAS[api].available(priority) for api in apis or GOOGLE_QUOTAS))
+
+def _call_google(method: str, *args, **kwargs) -> Any:
+    client = ensure_client()
+    # The circuit is checked first, so calls it turns away don't spend budget
+    if not _breaker.allow():
+        raise GoogleUnavailable("Google Maps temporarily disabled after repeated failures")
+    if not GOOGLE_QUOTAS[method].acquire(_priority.get()):
+        _breaker.release()
+        raise QuotaExceeded(f"Google {method} budget exhausted")
+    try:
+        result = getattr(client, method)(*args, **kwargs)
+    except (Timeout, TransportError):
+        _breaker.record_failure()
+        raise
+    except ApiError as e:
+        if e.status in _OUTAGE_STATUSES:
+            _breaker.record_failure()
+        else:
+            _breaker.record_success()
+        raise
+    except Exception:
+        # Says nothing about Google's health (a bad argument, a client bug), but a half-open
+        # trial must still be settled or the circuit would never close again
+        _breaker.release()
+        raise
+    _breaker.record_success()
+    return result
+
+def google_maps_stats() -> Dict[str, Any]:
+    """
+    Whether Google Maps is configured, the circuit breaker state, and per-API quota usage.
+    """
+    return {
+        "configured": _client is not None,
+        "circuit": _breaker.stats(),
+        "quota": {api: quota.stats() for api, quota in GOOGLE_QUOTAS.items()},
+    }
+
+# Geocode cache: campus places don't move, so hits are kept for a month and misses for a day.
+# The SQLite file is shared by all workers; the in-process LRU saves a disk read on hot names.
+GEOCODE_TTL_SECONDS = int(os.getenv("GEOCODE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+GEOCODE_NEGATIVE_TTL_SECONDS = int(os.getenv("GEOCODE_NEGATIVE_TTL_SECONDS", str(24 * 3600)))
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "geocode_cache.sqlite3")
+
+_geocode_memory = LRUCache(maxsize=2048, ttl=3600)
+_geocode_store = SQLiteCache(GEOCODE_CACHE_PATH, table="geocode")
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+def normalize_place(name: str) -> str:
+    """
+    Cache key for a place name: case, punctuation and spacing don't change the answer.
+    """
+    return " ".join(_NON_WORD.sub(" ", (name or "").lower()).split())
+
+def _cached_geocode(key: str) -> Any:
+    cached = _geocode_memory.get(key)
+    if cached is not MISSING:
+        return cached
+    cached = _geocode_store.get(key)
+    if cached is not MISSING:
+        _geocode_memory.set(key, cached)
+    return cached
+
+def cached_geocode(name: str) -> Optional[Dict[str, Any]]:
+    """
+    geocode_place answered from the caches alone; None if the place hasn't been geocoded before.
+    """
+    cached = _cached_geocode(normalize_place(name))
+    return None if cached is MISSING else cached
+
 def geocode_place(name: str) -> Optional[Dict[str, Any]]:
     """
     Resolve a place name to lat/lng using Google Geocoding.
+    Results (including "not found") are cached in memory and on disk.
     """
-    client = ensure_client()
-    results = client.geocode(name, region="us")
+    key = normalize_place(name)
+    cached = _cached_geocode(key)
+    if cached is not MISSING:
+        return cached
+
+    results = _call_google("geocode", name, region="us")
     if not results:
+        _geocode_store.set(key, None, GEOCODE_NEGATIVE_TTL_SECONDS)
+        _geocode_memory.set(key, None, GEOCODE_NEGATIVE_TTL_SECONDS)
         return None
     r = results[0]
     loc = r["geometry"]["location"]
-    return {
+    place = {
         "name": r.get("formatted_address", name),
         "lat": loc["lat"],
         "lng": loc["lng"],
         "place_id": r.get("place_id"),
     }
+    _geocode_store.set(key, place, GEOCODE_TTL_SECONDS)
+    _geocode_memory.set(key, place)
+    return place
+
+def geocode_cache_stats() -> Dict[str, Any]:
+    """
+    Hit/miss counters for the in-process geocode layer.
+    """
+    return _geocode_memory.stats()
+
+# Directions cache: trips between the same snapped endpoints in the same departure bucket share a plan.
+# Coordinates are rounded to DIRECTIONS_SNAP_DECIMALS places (3 is roughly 100 m).
+DIRECTIONS_BUCKET_SECONDS = int(os.getenv("DIRECTIONS_BUCKET_SECONDS", "300"))
+DIRECTIONS_SNAP_DECIMALS = int(os.getenv("DIRECTIONS_SNAP_DECIMALS", "3"))
+DIRECTIONS_CACHE_SIZE = int(os.getenv("DIRECTIONS_CACHE_SIZE", "1024"))
+
+_directions_cache = LRUCache(maxsize=DIRECTIONS_CACHE_SIZE, ttl=DIRECTIONS_BUCKET_SECONDS)
+
+def _snap(point: str | Tuple[float, float]) -> str:
+    if isinstance(point, str):
+        return normalize_place(point)
+    lat, lng = point
+    return f"{round(lat, DIRECTIONS_SNAP_DECIMALS)},{round(lng, DIRECTIONS_SNAP_DECIMALS)}"
+
+def directions_cache_key(origin: str | Tuple[float, float], destination: str | Tuple[float, float],
+                         departure_time: datetime) -> Tuple[str, str, int]:
+    """
+    Cache key for a directions request: snapped endpoints plus the departure-time bucket.
+    """
+    return _snap(origin), _snap(destination), int(departure_time.timestamp()) // DIRECTIONS_BUCKET_SECONDS
+
+def directions_cache_stats() -> Dict[str, Any]:
+    """
+    Hit/miss counters for the directions cache.
+    """
+    return _directions_cache.stats()
 
 def directions_transit(origin: str | Tuple[float, float], destination: str | Tuple[float, float],
                        departure_time: Optional[datetime] = None) -> Dict[str, Any]:
     """
     Get multimodal (transit + walk) directions. Returns a structured plan.
+    Plans are cached per snapped origin/destination and departure-time bucket.
     """
-    client = ensure_client()
     if departure_time is None:
         departure_time = datetime.now()
+    key = directions_cache_key(origin, destination, departure_time)
+    cached = _directions_cache.get(key)
+    if cached is not MISSING:
+        return copy.deepcopy(cached)
 
-    dirs = client.directions(
+    plan = _fetch_directions(origin, destination, departure_time)
+    _directions_cache.set(key, plan)
+    return copy.deepcopy(plan)
+
+def _fetch_directions(origin: str | Tuple[float, float], destination: str | Tuple[float, float],
+                      departure_time: datetime) -> Dict[str, Any]:
+    dirs = _call_google(
+        "directions",
         origin=origin,
         destination=destination,
         mode="transit",
         alternatives=False,
+        region="us",
         departure_time=departure_time
     )
     if not dirs:
@@ -82,3 +288,23 @@ def directions_transit(origin: str | Tuple[float, float], destination: str | Tup
         "departure_time": leg.get("departure_time", {}).get("text"),
         "steps": steps_out
     }
+
+# Concurrent requests for the same place or trip wait on one upstream call
+_flights = SingleFlight()
+
+async def geocode_place_async(name: str) -> Optional[Dict[str, Any]]:
+    """
+    geocode_place without blocking the event loop; concurrent lookups of the same place share one call.
+    """
+    return await _flights.do(("geocode", normalize_place(name)), lambda: asyncio.to_thread(geocode_place, name))
+
+async def directions_transit_async(origin: str | Tuple[float, float], destination: str | Tuple[float, float],
+                                   departure_time: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    directions_transit without blocking the event loop; concurrent identical trips share one call.
+    """
+    if departure_time is None:
+        departure_time = datetime.now()
+    key = ("directions",) + directions_cache_key(origin, destination, departure_time)
+    plan = await _flights.do(key, lambda: asyncio.to_thread(directions_transit, origin, destination, departure_time))
+    return copy.deepcopy(plan)
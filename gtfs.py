@@ -0,0 +1,326 @@
+"""
+GTFS static feed compiler and memory-mapped network loader.
+
+Compile a feed once:
+
+    python gtfs.py google_transit.zip bt_network.bin
+
+then point GTFS_NETWORK_PATH at the output. The large arrays (stop coordinates, stop times,
+departure boards) are read straight out of the mmapped file, so every worker process shares
+one page-cached copy instead of parsing CSVs into its own objects.
+calendar_dates.txt exceptions are not applied; services follow calendar.txt only.
+"""
+
+import csv
+import io
+import json
+import mmap
+import statistics
+import sys
+import zipfile
+from array import array
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.timetable import Pattern, ServicePeriod, Timetable, format_clock
+
+MAGIC = b"CCNET001"
+_ALIGN = 8
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def parse_gtfs_time(value: str) -> Optional[int]:
+    """GTFS "H:MM:SS" (hours may exceed 24) to seconds since service-day midnight; None if blank."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    hours, minutes, seconds = value.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def _read_csv(feed: zipfile.ZipFile, name: str) -> List[Dict[str, str]]:
+    try:
+        with feed.open(name) as raw:
+            return list(csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig")))
+    except KeyError:
+        raise ValueError(f"GTFS feed is missing {name}")
+
+
+def _interpolate(times: List[Optional[int]]) -> List[int]:
+    """Fill blank (non-timepoint) stop times linearly between the known ones."""
+    known = [i for i, t in enumerate(times) if t is not None]
+    if not known:
+        raise ValueError("trip has no stop times")
+    filled = list(times)
+    for i in range(known[0]):
+        filled[i] = times[known[0]]
+    for a, b in zip(known, known[1:]):
+        for i in range(a + 1, b):
+            filled[i] = times[a] + (times[b] - times[a]) * (i - a) // (b - a)
+    for i in range(known[-1] + 1, len(times)):
+        filled[i] = times[known[-1]]
+    return filled
+
+
+def compile_feed(zip_path: str, out_path: str) -> Dict[str, int]:
+    """
+    Compile a GTFS zip (stops, routes, trips, stop_times, calendar) into a network file.
+    Returns counts of what was written.
+    """
+    with zipfile.ZipFile(zip_path) as feed:
+        stop_rows = [row for row in _read_csv(feed, "stops.txt") if row.get("location_type", "") in ("", "0")]
+        route_rows = _read_csv(feed, "routes.txt")
+        trip_rows = _read_csv(feed, "trips.txt")
+        calendar_rows = _read_csv(feed, "calendar.txt")
+        stop_time_rows = _read_csv(feed, "stop_times.txt")
+
+    stop_ids = [row["stop_id"] for row in stop_rows]
+    stop_number = {stop_id: i for i, stop_id in enumerate(stop_ids)}
+
+    # Riders and the NLU know routes by their short codes ("HWA"); fall back to route_id when codes collide
+    short_names = [(row.get("route_short_name") or "").strip().upper() for row in route_rows]
+    use_short = all(short_names) and len(set(short_names)) == len(short_names)
+    route_ids = short_names if use_short else [row["route_id"] for row in route_rows]
+    route_number = {row["route_id"]: i for i, row in enumerate(route_rows)}
+
+    service_ids = [row["service_id"] for row in calendar_rows]
+    service_number = {service_id: i for i, service_id in enumerate(service_ids)}
+    services = {
+        row["service_id"]: {
+            "days": [row[day] == "1" for day in _WEEKDAYS],
+            "start": row.get("start_date") or None,
+            "end": row.get("end_date") or None,
+        }
+        for row in calendar_rows
+    }
+
+    trip_info = {row["trip_id"]: (route_number[row["route_id"]], service_number[row["service_id"]])
+                 for row in trip_rows if row["service_id"] in service_number}
+
+    trip_stops: Dict[str, List[Tuple[int, int, Optional[int], Optional[int]]]] = {}
+    for row in stop_time_rows:
+        if row["trip_id"] in trip_info and row["stop_id"] in stop_number:
+            trip_stops.setdefault(row["trip_id"], []).append((
+                int(row["stop_sequence"]), stop_number[row["stop_id"]],
+                parse_gtfs_time(row.get("arrival_time")), parse_gtfs_time(row.get("departure_time")),
+            ))
+
+    # Trips with the same route and stop sequence form a pattern
+    pattern_trips: Dict[Tuple[int, Tuple[int, ...]], List[Tuple[int, List[int], List[int]]]] = {}
+    for trip_id, rows in trip_stops.items():
+        if len(rows) < 2:
+            continue
+        rows.sort()
+        route, service = trip_info[trip_id]
+        arrivals = _interpolate([arr if arr is not None else dep for _, _, arr, dep in rows])
+        departures = _interpolate([dep if dep is not None else arr for _, _, arr, dep in rows])
+        key = (route, tuple(stop for _, stop, _, _ in rows))
+        pattern_trips.setdefault(key, []).append((service, arrivals, departures))
+
+    patterns = []
+    pattern_stops = array("i")
+    stop_times = array("i")
+    for (route, stops), trips in pattern_trips.items():
+        trips.sort(key=lambda trip: (trip[0], trip[2][0]))
+        base = len(stop_times)
+        trip_rows_by_service: Dict[int, List[int]] = {}
+        for row, (service, arrivals, departures) in enumerate(trips):
+            first, _ = trip_rows_by_service.get(service, (row, row))
+            trip_rows_by_service[service] = [first, row + 1]
+            for arrival, departure in zip(arrivals, departures):
+                stop_times.extend((arrival, departure))
+        patterns.append({
+            "route": route,
+            "stops": [len(pattern_stops), len(stops)],
+            "base": base,
+            "trips": {str(service): bounds for service, bounds in trip_rows_by_service.items()},
+        })
+        pattern_stops.extend(stops)
+
+    # Departure boards: sorted departures per (stop, route, service); the last stop of a trip is arrival-only
+    board_lists: Dict[Tuple[int, int, int], List[int]] = {}
+    for (route, stops), trips in pattern_trips.items():
+        for service, _, departures in trips:
+            for stop, departure in zip(stops[:-1], departures):
+                board_lists.setdefault((stop, route, service), []).append(departure)
+    board_keys = array("i")
+    board_times = array("i")
+    for (stop, route, service), times in board_lists.items():
+        lo = len(board_times)
+        board_times.extend(sorted(times))
+        board_keys.extend((stop, route, service, lo, len(board_times)))
+
+    stop_lat = array("d", (float(row["stop_lat"]) for row in stop_rows))
+    stop_lng = array("d", (float(row["stop_lon"]) for row in stop_rows))
+
+    header = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "byteorder": sys.byteorder,
+        "stops": {"ids": stop_ids, "names": [row["stop_name"] for row in stop_rows]},
+        "routes": {
+            "ids": route_ids,
+            "names": [row.get("route_long_name") or row.get("route_short_name") or "" for row in route_rows],
+            "descriptions": [row.get("route_desc") or "" for row in route_rows],
+            # routes.txt ids, which GTFS-realtime feeds use
+            "feed_ids": [row["route_id"] for row in route_rows],
+        },
+        # Trip -> route, for realtime trip updates that name only their trip
+        "trip_routes": {trip_id: route for trip_id, (route, _) in trip_info.items()},
+        "services": services,
+        "service_ids": service_ids,
+        "patterns": patterns,
+    }
+    arrays = {"stop_lat": stop_lat, "stop_lng": stop_lng, "pattern_stops": pattern_stops, "stop_times": stop_times,
+              "board_keys": board_keys, "board_times": board_times}
+
+    # Array offsets depend on the header length, which depends on the offsets; lay out until stable
+    layout: Dict[str, List[Any]] = {name: [data.typecode, 0, len(data)] for name, data in arrays.items()}
+    while True:
+        header["arrays"] = layout
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        offset = _aligned(len(MAGIC) + 4 + len(header_bytes))
+        changed = False
+        for name, data in arrays.items():
+            if layout[name][1] != offset:
+                layout[name][1] = offset
+                changed = True
+            offset = _aligned(offset + len(data) * data.itemsize)
+        if not changed:
+            break
+
+    with open(out_path, "wb") as out:
+        out.write(MAGIC)
+        out.write(len(header_bytes).to_bytes(4, "little"))
+        out.write(header_bytes)
+        for name, data in arrays.items():
+            out.write(b"\0" * (layout[name][1] - out.tell()))
+            out.write(data.tobytes())
+
+    return {"stops": len(stop_ids), "routes": len(route_ids), "patterns": len(patterns),
+            "trips": sum(len(t) for t in pattern_trips.values()), "stop_times": len(stop_times) // 2}
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    return datetime.strptime(value, "%Y%m%d").date() if value else None
+
+
+class GtfsNetwork:
+    """
+    A compiled network opened from disk.
+
+    stops and routes mirror the RIDEBT_STOPS / BUS_ROUTES tables in scrapers/bus.py, so existing
+    lookups work unchanged; timetable is a Timetable whose stop-time and board arrays are views
+    into the mapped file.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a compiled network file")
+        header_len = int.from_bytes(view[len(MAGIC):len(MAGIC) + 4], "little")
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start:start + header_len]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was compiled on a {header['byteorder']}-endian machine")
+        self.created = header["created"]
+
+        def column(name: str) -> memoryview:
+            typecode, offset, count = header["arrays"][name]
+            size = array(typecode).itemsize
+            return view[offset:offset + count * size].cast(typecode)
+
+        stop_ids = header["stops"]["ids"]
+        stop_lat, stop_lng = column("stop_lat"), column("stop_lng")
+        self.stops: Dict[str, Dict[str, Any]] = {
+            stop_id: {"name": name, "lat": stop_lat[i], "lng": stop_lng[i]}
+            for i, (stop_id, name) in enumerate(zip(stop_ids, header["stops"]["names"]))
+        }
+
+        calendar = {service_id: ServicePeriod(days=tuple(info["days"]), start=_parse_date(info["start"]),
+                                              end=_parse_date(info["end"]))
+                    for service_id, info in header["services"].items()}
+        service_ids = header["service_ids"]
+        route_ids = header["routes"]["ids"]
+        pattern_stops = column("pattern_stops")
+        stop_times = column("stop_times")
+
+        patterns: List[Pattern] = []
+        for p in header["patterns"]:
+            lo, n = p["stops"]
+            patterns.append(Pattern(
+                route_id=route_ids[p["route"]],
+                stops=tuple(stop_ids[s] for s in pattern_stops[lo:lo + n]),
+                trips={service_ids[int(s)]: tuple(bounds) for s, bounds in p["trips"].items()},
+                base=p["base"],
+            ))
+
+        board_keys = column("board_keys")
+        boards = {(stop_ids[board_keys[i]], route_ids[board_keys[i + 1]], service_ids[board_keys[i + 2]]):
+                  (board_keys[i + 3], board_keys[i + 4])
+                  for i in range(0, len(board_keys), 5)}
+        self.timetable = Timetable(calendar, patterns, stop_times, boards, column("board_times"))
+        self.routes = self._route_table(header["routes"], patterns)
+        # Realtime feeds name routes by routes.txt id (or only by trip); map both to the keys above
+        self.route_keys: Dict[str, str] = dict(zip(header["routes"].get("feed_ids", route_ids), route_ids))
+        self.trip_routes: Dict[str, str] = {trip_id: route_ids[route]
+                                            for trip_id, route in header.get("trip_routes", {}).items()}
+
+    def _route_table(self, routes: Dict[str, List[str]], patterns: List[Pattern]) -> Dict[str, Dict[str, Any]]:
+        """
+        BUS_ROUTES-style summary of each route: stops, typical headway and service hours.
+        "stops" is every stop the route serves; "patterns" keeps each direction's stops in riding order.
+        """
+        by_route: Dict[str, List[Pattern]] = {}
+        for pattern in patterns:
+            by_route.setdefault(pattern.route_id, []).append(pattern)
+
+        table: Dict[str, Dict[str, Any]] = {}
+        for route_id, name, description in zip(routes["ids"], routes["names"], routes["descriptions"]):
+            route_patterns = sorted(by_route.get(route_id, ()), key=self._trip_count, reverse=True)
+            if not route_patterns:
+                continue
+            stops = list(dict.fromkeys(stop_id for pattern in route_patterns for stop_id in pattern.stops))
+            main = route_patterns[0]
+            first_stop = main.stops[0]
+            headways, spans = [], []
+            for service_id in main.trips:
+                lo, hi = self.timetable.boards.get((first_stop, route_id, service_id), (0, 0))
+                times = self.timetable.board_times[lo:hi]
+                headways.extend(b - a for a, b in zip(times, times[1:]) if b > a)
+                if hi > lo:
+                    spans.append((times[0], times[-1]))
+            table[route_id] = {
+                "name": name,
+                "stops": stops,
+                "patterns": [list(pattern.stops) for pattern in route_patterns],
+                "frequency": max(1, round(statistics.median(headways) / 60)) if headways else 60,
+                "operating_hours": {
+                    "start": format_clock(min(s[0] for s in spans)) if spans else "",
+                    "end": format_clock(max(s[1] for s in spans)) if spans else "",
+                },
+                "description": description or name,
+            }
+        return table
+
+    @staticmethod
+    def _trip_count(pattern: Pattern) -> int:
+        return sum(end - first for first, end in pattern.trips.values())
+
+
+def load_network(path: str) -> GtfsNetwork:
+    """Open a network file written by compile_feed."""
+    return GtfsNetwork(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python gtfs.py <gtfs.zip> <network.bin>")
+        sys.exit(1)
+    counts = compile_feed(sys.argv[1], sys.argv[2])
+    print(f"✅ Compiled {sys.argv[1]} → {sys.argv[2]}: " + ", ".join(f"{n} {k}" for k, n in counts.items()))
@@ -0,0 +1,100 @@
+import asyncio
+import random
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx when installed)
+    _HTTP2 = True
+except Exception:
+    _HTTP2 = False
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Pool sizing and politeness towards each upstream site
+MAX_CONNECTIONS = 50
+MAX_KEEPALIVE_CONNECTIONS = 20
+PER_HOST_CONCURRENCY = 4
+
+# Retry transient failures with exponential backoff plus jitter
+MAX_RETRIES = 2
+BACKOFF_SECONDS = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Shared keep-alive client for the running event loop.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            http2=_HTTP2,
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS),
+        )
+        _client_loop = loop
+        _host_limits.clear()
+    return _client
+
+
+async def fetch(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10.0,
+                retries: int = MAX_RETRIES) -> httpx.Response:
+    """
+    GET a URL through the shared pool without blocking the event loop.
+    Raises httpx.HTTPError once retries are exhausted or on a non-retryable error status.
+    """
+    client = get_client()
+    host = urlsplit(url).netloc
+    limit = _host_limits.setdefault(host, asyncio.Semaphore(PER_HOST_CONCURRENCY))
+
+    attempt = 0
+    while True:
+        try:
+            async with limit:
+                response = await client.get(url, headers=headers, timeout=timeout)
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                raise httpx.HTTPStatusError(f"Retryable status {response.status_code}",
+                                            request=response.request, response=response)
+            response.raise_for_status()
+            return response
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            retryable = isinstance(e, httpx.TransportError) or e.response.status_code in RETRY_STATUSES
+            if not retryable or attempt >= retries:
+                raise
+        await asyncio.sleep(BACKOFF_SECONDS * (2 ** attempt) + random.uniform(0, BACKOFF_SECONDS))
+        attempt += 1
+
+
+async def post_json(url: str, payload: Dict, headers: Optional[Dict[str, str]] = None,
+                    timeout: float = 10.0) -> httpx.Response:
+    """
+    POST a JSON body to an API through the shared pool, once: callers with a latency budget do
+    their own fallback, and API hosts aren't held to the scraping PER_HOST_CONCURRENCY.
+    Raises httpx.HTTPError on transport errors and error statuses.
+    """
+    response = await get_client().post(url, json=payload, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return response
+
+
+async def aclose() -> None:
+    """
+    Close pooled connections (called on app shutdown).
+    """
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
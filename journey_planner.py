@@ -0,0 +1,251 @@
+import heapq
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.timetable import SECONDS_PER_DAY, Timetable
+
+# Round limit for the search; 3 rounds allows up to two transfers
+MAX_ROUNDS = 3
+
+INF = float("inf")
+
+
+def close_footpaths(footpaths: Dict[str, List[Tuple[str, int]]]) -> Dict[str, List[Tuple[str, int]]]:
+    """
+    Transitive closure of walking links: every stop reachable by a chain of walks, at the
+    chain's shortest total time. RAPTOR relaxes one footpath per round, so without this it
+    could never walk a -> b -> c.
+    """
+    closed: Dict[str, List[Tuple[str, int]]] = {}
+    for source in footpaths:
+        done: Dict[str, int] = {}
+        heap = [(0, source)]
+        while heap:
+            seconds, stop_id = heapq.heappop(heap)
+            if stop_id in done:
+                continue
+            done[stop_id] = seconds
+            for other, walk in footpaths.get(stop_id, ()):
+                if other not in done:
+                    heapq.heappush(heap, (seconds + walk, other))
+        closed[source] = sorted(((other, seconds) for other, seconds in done.items() if other != source),
+                                key=lambda item: item[1])
+    return closed
+
+
+class JourneyPlanner:
+    """
+    Round-based earliest-arrival planner (RAPTOR) over a compiled Timetable.
+    Round k finds the best arrival at every stop using at most k bus trips; footpaths
+    between nearby stops are relaxed after each round so walking legs come for free.
+    """
+
+    def __init__(self, timetable: Timetable, footpaths: Dict[str, List[Tuple[str, int]]]):
+        self.timetable = timetable
+        # stop_id -> [(other_stop_id, walk_seconds)], closed so one walk covers any chain of them
+        self.footpaths = close_footpaths(footpaths)
+        # stop_id -> [(pattern index, position on pattern)], boarding positions only
+        self._stop_patterns: Dict[str, List[Tuple[int, int]]] = {}
+        for p, pattern in enumerate(timetable.patterns):
+            for i, stop_id in enumerate(pattern.stops[:-1]):
+                self._stop_patterns.setdefault(stop_id, []).append((p, i))
+
+    def _trip_sets(self, when: datetime) -> Dict[int, List[Tuple[int, int, int]]]:
+        """pattern index -> [(first_row, end_row, shift)] of trips running around `when`."""
+        trip_sets: Dict[int, List[Tuple[int, int, int]]] = {}
+        today = when.date()
+        # Yesterday's trips are shifted back a day so all times are relative to today's midnight
+        for day, shift in ((today, 0), (today - timedelta(days=1), -SECONDS_PER_DAY)):
+            services = self.timetable.services_on(day)
+            for p, pattern in enumerate(self.timetable.patterns):
+                for service_id in services:
+                    rows = pattern.trips.get(service_id)
+                    if rows and rows[0] < rows[1]:
+                        trip_sets.setdefault(p, []).append((rows[0], rows[1], shift))
+        return trip_sets
+
+    def _time(self, p: int, row: int, i: int, departure: bool) -> int:
+        pattern = self.timetable.patterns[p]
+        return self.timetable.stop_times[pattern.base + (row * len(pattern.stops) + i) * 2 + departure]
+
+    def _earliest_trip(self, p: int, trip_sets: List[Tuple[int, int, int]], i: int,
+                       ready: float) -> Optional[Tuple[int, int, int]]:
+        """Earliest (departure, row, shift) leaving position i of pattern p at or after `ready`."""
+        best = None
+        for first_row, end_row, shift in trip_sets:
+            lo, hi = first_row, end_row
+            # Trips of a service never overtake each other, so departures are sorted by row
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._time(p, mid, i, True) + shift < ready:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo < end_row:
+                departure = self._time(p, lo, i, True) + shift
+                if best is None or departure < best[0]:
+                    best = (departure, lo, shift)
+        return best
+
+    def plan(self, origins: Dict[str, int], destinations: Dict[str, int], when: datetime,
+             max_rounds: int = MAX_ROUNDS, min_trips: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Earliest-arrival itinerary leaving at `when`.
+        origins/destinations map stop ids to the walk in seconds from the start / to the end point.
+        min_trips=1 skips walk-only answers.
+        """
+        midnight = datetime.combine(when.date(), datetime.min.time())
+        start = (when - midnight).seconds
+        labels, _ = self._search(origins, destinations, start, self._trip_sets(when), max_rounds, min_trips)
+
+        def target_arrival(k: int) -> float:
+            return min((labels[k][s][0] + egress for s, egress in destinations.items() if s in labels[k]),
+                       default=INF)
+
+        # Earliest arrival, preferring fewer trips on ties
+        arrival_by_round = [target_arrival(k) if k >= min_trips else INF for k in range(len(labels))]
+        if min(arrival_by_round) == INF:
+            return None
+        k = arrival_by_round.index(min(arrival_by_round))
+        end_stop = min((s for s in destinations if s in labels[k]),
+                       key=lambda s: labels[k][s][0] + destinations[s])
+        return self._itinerary(labels, k, end_stop, destinations[end_stop], start, midnight)
+
+    def arrivals(self, origins: Dict[str, int], when: datetime, max_rounds: int = MAX_ROUNDS) -> Dict[str, int]:
+        """
+        Earliest arrival at every reachable stop leaving at `when`, in seconds after `when`.
+        One search answers trips from these origins to any number of destinations.
+        """
+        midnight = datetime.combine(when.date(), datetime.min.time())
+        start = (when - midnight).seconds
+        _, best = self._search(origins, {}, start, self._trip_sets(when), max_rounds, 0)
+        return {stop_id: int(arrival - start) for stop_id, arrival in best.items()}
+
+    def _search(self, origins: Dict[str, int], destinations: Dict[str, int], start: int,
+                trip_sets: Dict[int, List[Tuple[int, int, int]]], max_rounds: int,
+                min_trips: int) -> Tuple[List[Dict[str, Tuple[int, Tuple, int]]], Dict[str, float]]:
+        """
+        The RAPTOR rounds: per-round labels and the best arrival at each stop. Stops later than the
+        best arrival at a destination so far are pruned, so pass no destinations for a one-to-all search.
+        """
+
+        best: Dict[str, float] = {}
+        # labels[k][stop] = (arrival, leg that reached it, round the leg was found in);
+        # each round starts from a copy of the previous one
+        labels: List[Dict[str, Tuple[int, Tuple, int]]] = [{}]
+        for stop_id, access in origins.items():
+            arrival = start + access
+            if arrival < best.get(stop_id, INF):
+                best[stop_id] = arrival
+                labels[0][stop_id] = (arrival, ("access", access), 0)
+        marked = set(labels[0])
+        # Without walk-only answers the destination can't be reached by a direct walk
+        marked |= self._relax_footpaths(labels[0], 0, best, marked, skip=destinations if min_trips else ())
+
+        def target_arrival(k: int) -> float:
+            return min((labels[k][s][0] + egress for s, egress in destinations.items() if s in labels[k]),
+                       default=INF)
+
+        target_best = target_arrival(0)
+        for k in range(1, max_rounds + 1):
+            previous = labels[k - 1]
+            labels.append(dict(previous))
+
+            # Collect each pattern once, from its earliest marked position
+            queue: Dict[int, int] = {}
+            for stop_id in marked:
+                for p, i in self._stop_patterns.get(stop_id, ()):
+                    if i < queue.get(p, INF):
+                        queue[p] = i
+
+            marked = set()
+            for p, start_pos in queue.items():
+                if p not in trip_sets:
+                    continue
+                stops = self.timetable.patterns[p].stops
+                trip = None  # (departure at current position, row, shift, board position)
+                for i in range(start_pos, len(stops)):
+                    stop_id = stops[i]
+                    if trip is not None:
+                        _, row, shift, board = trip
+                        arrival = self._time(p, row, i, False) + shift
+                        if arrival < min(best.get(stop_id, INF), target_best):
+                            best[stop_id] = arrival
+                            labels[k][stop_id] = (arrival, ("bus", p, row, shift, board, i), k)
+                            marked.add(stop_id)
+                        trip = (self._time(p, row, i, True) + shift, row, shift, board)
+                    if i == len(stops) - 1 or stop_id not in previous:
+                        continue
+                    ready = previous[stop_id][0]
+                    if trip is None or ready < trip[0]:
+                        found = self._earliest_trip(p, trip_sets[p], i, ready)
+                        if found and (trip is None or found[0] < trip[0]):
+                            trip = (found[0], found[1], found[2], i)
+
+            marked |= self._relax_footpaths(labels[k], k, best, marked)
+            target_best = min(target_best, target_arrival(k))
+            if not marked:
+                break
+
+        return labels, best
+
+    def _relax_footpaths(self, round_labels: Dict[str, Tuple[int, Tuple, int]], k: int,
+                         best: Dict[str, float], marked: set, skip=()) -> set:
+        """Walk from every marked stop to its neighbours; returns the stops improved."""
+        improved = set()
+        for stop_id in list(marked):
+            arrival = round_labels[stop_id][0]
+            for other, seconds in self.footpaths.get(stop_id, ()):
+                if other not in skip and arrival + seconds < best.get(other, INF):
+                    best[other] = arrival + seconds
+                    round_labels[other] = (arrival + seconds, ("walk", stop_id, seconds), k)
+                    improved.add(other)
+        return improved
+
+    def _itinerary(self, labels, k: int, end_stop: str, egress: int, start: int,
+                   midnight: datetime) -> Dict[str, Any]:
+        """Walk the labels back from end_stop and build the leg list."""
+        def at(seconds: float) -> datetime:
+            return midnight + timedelta(seconds=seconds)
+
+        end_seconds = labels[k][end_stop][0] + egress
+        legs: List[Dict[str, Any]] = []
+        if egress:
+            legs.append({"mode": "WALKING", "from_stop": end_stop, "to_stop": None,
+                         "departure": at(end_seconds - egress), "arrival": at(end_seconds),
+                         "minutes": -(-egress // 60)})
+
+        stop_id = end_stop
+        while True:
+            arrival, leg, k = labels[k][stop_id]
+            if leg[0] == "access":
+                if leg[1]:
+                    legs.append({"mode": "WALKING", "from_stop": None, "to_stop": stop_id,
+                                 "departure": at(arrival - leg[1]), "arrival": at(arrival),
+                                 "minutes": -(-leg[1] // 60)})
+                break
+            if leg[0] == "walk":
+                _, from_stop, seconds = leg
+                legs.append({"mode": "WALKING", "from_stop": from_stop, "to_stop": stop_id,
+                             "departure": at(arrival - seconds), "arrival": at(arrival),
+                             "minutes": -(-seconds // 60)})
+                stop_id = from_stop
+                continue
+            _, p, row, shift, board, alight = leg
+            pattern = self.timetable.patterns[p]
+            from_stop = pattern.stops[board]
+            legs.append({"mode": "TRANSIT", "route_id": pattern.route_id,
+                         "from_stop": from_stop, "to_stop": stop_id,
+                         "departure": at(self._time(p, row, board, True) + shift), "arrival": at(arrival),
+                         "num_stops": alight - board})
+            stop_id = from_stop
+            k -= 1
+        legs.reverse()
+
+        return {
+            "departure": at(start),
+            "arrival": at(end_seconds),
+            "duration_minutes": -(-int(end_seconds - start) // 60),
+            "transfers": max(0, sum(1 for leg in legs if leg["mode"] == "TRANSIT") - 1),
+            "legs": legs,
+        }
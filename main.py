@@ -1,14 +1,22 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 import uvicorn
 import os
+import asyncio
+from datetime import datetime
 from dotenv import load_dotenv
 from langchain_agent import get_ai_response
 from scrapers.dining import get_dining_halls
-from scrapers.bus import get_bus_times, plan_quickest_route, next_bus_to, enhanced_next_bus_to, get_live_bus_schedule, enhanced_plan_quickest_route, get_enhanced_bus_info_with_live_data
+from scrapers.bus import get_bus_times, plan_quickest_route, next_bus_to, enhanced_next_bus_to, get_live_bus_schedule, enhanced_plan_quickest_route, get_enhanced_bus_info_with_live_data, get_live_bus_positions, get_batch_etas, travel_time_matrix, DEPARTURE_BOARDS
 from scrapers.clubs import get_club_events
-from nlu import parse_transit_query
+from nlu import parse_cache_stats, parse_tier_stats, parse_transit_query_async
+from services.http_client import aclose as close_http_client
+from services.google_maps import geocode_cache_stats, directions_cache_stats, google_maps_stats
+from services.refresher import BackgroundRefresher
+from services.broadcast import LiveBusBroadcaster
+from services.realtime import POLL_SECONDS as REALTIME_POLL_SECONDS, configured_feeds, poll_feed
 
 # Load environment variables from .env file
 load_dotenv()
@@ -24,17 +32,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Scraped pages are polled in the background and served from memory; intervals in seconds
+def _scrape_failed(text: str) -> bool:
+    return text.startswith(("Unable to fetch", "An error occurred"))
+
+snapshots = BackgroundRefresher()
+snapshots.register("dining", get_dining_halls, float(os.getenv("DINING_REFRESH_SECONDS", "300")), failed=_scrape_failed)
+snapshots.register("bus", get_bus_times, float(os.getenv("BUS_REFRESH_SECONDS", "60")), failed=_scrape_failed)
+snapshots.register("clubs", get_club_events, float(os.getenv("CLUBS_REFRESH_SECONDS", "900")), failed=_scrape_failed)
+# GTFS-realtime feeds (vehicles, trip updates, alerts) are applied to the shared live state
+for kind in configured_feeds():
+    snapshots.register(f"gtfs_rt_{kind}", lambda kind=kind: poll_feed(kind), REALTIME_POLL_SECONDS)
+
+# One producer computes live bus status for every /bus/stream subscriber
+live_bus_stream = LiveBusBroadcaster(get_live_bus_positions, interval=float(os.getenv("BUS_STREAM_SECONDS", "10")))
+
+_background_tasks: list[asyncio.Task] = []
+
+@app.on_event("startup")
+async def startup():
+    """Start polling upstream sites and rebuilding departure boards each minute."""
+    snapshots.start()
+    _background_tasks.append(asyncio.create_task(DEPARTURE_BOARDS.run()))
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background polling and release pooled upstream connections."""
+    for task in _background_tasks:
+        task.cancel()
+    await snapshots.stop()
+    await live_bus_stream.stop()
+    await close_http_client()
+
 class QueryRequest(BaseModel):
     query: str
 
 class QueryResponse(BaseModel):
     answer: str
     sources: list[str]
+    engine: str | None = None  # "google" or "local" for route answers
 
 class BusQuery(BaseModel):
     query: str
     origin: str | None = None
 
+class EtaBatchRequest(BaseModel):
+    stops: list[str] = Field(min_length=1, max_length=50)  # stop ids or place names
+    routes: list[str] | None = None
+
+class TravelMatrixRequest(BaseModel):
+    origins: list[str] = Field(min_length=1, max_length=50)  # stop ids or place names
+    destinations: list[str] = Field(min_length=1, max_length=50)
+    departure: datetime | None = None  # defaults to now
+
 @app.get("/")
 async def root():
     google_key_status = "✅ Set" if os.getenv("GOOGLE_MAPS_API_KEY") else "❌ Not Set"
@@ -45,11 +95,24 @@ async def root():
         "nvidia_nim_key": nvidia_key_status
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Cache hit/miss counters for upstream API calls"""
+    return {
+        "geocode_cache": geocode_cache_stats(),
+        "directions_cache": directions_cache_stats(),
+        "parse_cache": parse_cache_stats(),
+        "parse_tiers": parse_tier_stats(),
+        "google_maps": google_maps_stats(),
+        "snapshots": snapshots.stats(),
+        "bus_stream": live_bus_stream.stats(),
+        "departure_board_builds": DEPARTURE_BOARDS.builds,
+    }
+
 @app.get("/debug/parse/{query}")
 async def debug_parse(query: str):
     """Debug endpoint to test query parsing"""
-    from nlu import parse_transit_query
-    result = parse_transit_query(query)
+    result = await parse_transit_query_async(query)
     return {"query": query, "parsed": result}
 
 @app.post("/bus/query")
@@ -58,7 +121,7 @@ async def bus_query(q: BusQuery):
     Dedicated endpoint for bus/transit queries with Google Maps integration.
     """
     try:
-        parsed = parse_transit_query(q.query)
+        parsed = await parse_transit_query_async(q.query)
         origin = q.origin or parsed.get("origin") or "Virginia Tech, Blacksburg, VA"
         destination = parsed.get("destination")
         intent = parsed.get("intent")
@@ -77,6 +140,47 @@ async def bus_query(q: BusQuery):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error planning route: {str(e)}")
 
+@app.post("/bus/eta/batch")
+async def bus_eta_batch(request: EtaBatchRequest):
+    """
+    Next arrivals for up to 50 stops (ids or place names) in one call, optionally limited to some routes.
+    """
+    try:
+        return await get_batch_etas(request.stops, request.routes)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing ETAs: {str(e)}")
+
+@app.post("/bus/matrix")
+async def bus_matrix(request: TravelMatrixRequest):
+    """
+    Travel minutes from every origin to every destination (rows follow origins, columns destinations).
+    """
+    try:
+        return await travel_time_matrix(request.origins, request.destinations, request.departure)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing travel times: {str(e)}")
+
+@app.get("/bus/stream")
+async def bus_stream(request: Request, routes: str | None = None):
+    """
+    Server-Sent Events stream of live bus status.
+    Pass routes=CAS,HDG to receive only those routes; omit it for all routes.
+    """
+    route_filter = frozenset(r.strip().upper() for r in routes.split(",") if r.strip()) if routes else None
+    subscription = live_bus_stream.subscribe(route_filter)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                message = await subscription.next(timeout=15)
+                # Comment lines keep proxies from closing an idle stream
+                yield f"event: bus\ndata: {message}\n\n" if message else ": keep-alive\n\n"
+        finally:
+            live_bus_stream.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.post("/ask", response_model=QueryResponse)
 async def ask_question(request: QueryRequest):
     """
@@ -85,7 +189,7 @@ async def ask_question(request: QueryRequest):
     """
     try:
         # Check if this is a transit query first
-        parsed = parse_transit_query(request.query)
+        parsed = await parse_transit_query_async(request.query)
         print(f"🔍 DEBUG - Parsed query: {parsed}")  # Debug line
         
         if parsed.get("intent") in ("transit_route", "next_bus") and parsed.get("destination"):
@@ -99,7 +203,7 @@ async def ask_question(request: QueryRequest):
             plan = await (enhanced_plan_quickest_route(origin, destination, bus_only) if parsed["intent"] == "transit_route"
                          else enhanced_next_bus_to(destination, origin, bus_route))  # type: ignore
             print(f"🗺️ DEBUG - Plan result: {plan}")  # Debug line
-            return QueryResponse(answer=plan["answer"], sources=plan.get("sources", []))
+            return QueryResponse(answer=plan["answer"], sources=plan.get("sources", []), engine=plan.get("engine"))
         
         # Handle next_bus queries without specific destination
         if parsed.get("intent") == "next_bus" and not parsed.get("destination"):
@@ -138,9 +242,10 @@ async def get_dining_status():
     Get current dining hall status from Virginia Tech dining services.
     """
     try:
-        dining_data = await get_dining_halls()
+        snapshot = await snapshots.get("dining")
         return {
-            "dining_halls": dining_data,
+            "dining_halls": snapshot.value,
+            "updated_at": snapshot.updated_at.isoformat(timespec="seconds"),
             "sources": ["https://udc.vt.edu/"]
         }
     except Exception as e:
@@ -152,9 +257,10 @@ async def get_bus_status():
     Get current bus times from Blacksburg Transit.
     """
     try:
-        bus_data = await get_bus_times()
+        snapshot = await snapshots.get("bus")
         return {
-            "bus_times": bus_data,
+            "bus_times": snapshot.value,
+            "updated_at": snapshot.updated_at.isoformat(timespec="seconds"),
             "sources": ["https://ridebt.org/"]
         }
     except Exception as e:
@@ -166,9 +272,10 @@ async def get_clubs_events():
     Get upcoming club events from Gobbler Connect.
     """
     try:
-        events_data = await get_club_events()
+        snapshot = await snapshots.get("clubs")
         return {
-            "events": events_data,
+            "events": snapshot.value,
+            "updated_at": snapshot.updated_at.isoformat(timespec="seconds"),
             "sources": ["https://gobblerconnect.vt.edu/"]
         }
     except Exception as e:
@@ -1,13 +1,21 @@
+import asyncio
+import copy
 import os
 import re
 import json
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from services.cache import MISSING, LRUCache
+from services.http_client import get_client, post_json
+from services.gazetteer import Gazetteer
+from services.rule_engine import RuleSet, cue
 
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI, OpenAI
     import requests
 except Exception:
     OpenAI = None  # type: ignore
+    AsyncOpenAI = None  # type: ignore
     requests = None  # type: ignore
 
 CAMPUS_PLACES: Dict[str, str] = {
@@ -100,290 +108,558 @@ CAMPUS_PLACES: Dict[str, str] = {
     "tech": "Virginia Tech, Blacksburg, VA 24061",
 }
 
+# Short names and nicknames for places, mapped to the name used in CAMPUS_PLACES
+BUILDING_KEYWORDS: Dict[str, str] = {
+    # Major Buildings
+    "goodwin": "goodwin hall",
+    "lavery": "lavery hall",
+    "squires": "squires",
+    "torgersen": "torgersen hall",
+    "mcbryde": "mcbryde hall",
+    "norris": "norris hall",
+    "randolph": "randolph hall",
+    "newman": "newman library",
+    "dietrick": "dietrick hall",
+    "west egg": "west eggleston",
+    "east egg": "east eggleston",
+    
+    # Dining Halls
+    "d2": "d2",
+    "owens": "owens food court",
+    "hokie grill": "hokie grill",
+    "turner": "turner place",
+    
+    # Residential Halls
+    "barringer": "barringer hall",
+    "hoge": "hoge hall",
+    "johnson": "johnson hall",
+    "lee": "lee hall",
+    "miles": "miles hall",
+    "pridemore": "pridemore hall",
+    "slusher": "slusher hall",
+    "vawter": "vawter hall",
+    
+    # Off-Campus Areas
+    "main": "main street",
+    "progress": "progress street",
+    "university city": "university city",
+    "ucb": "university city",
+    "toms creek": "toms creek",
+    "hethwood": "hethwood",
+    "harding": "harding avenue",
+    "patrick henry": "patrick henry drive",
+    "crc": "corporate research center",
+    "downtown": "downtown",
+    
+    # Sports Facilities
+    "cassell": "cassell coliseum",
+    "lane": "lane stadium",
+    "english field": "english field",
+    "aquatic": "aquatic center",
+    "mccomas": "mccomas hall",
+    
+    # Parking
+    "perry": "perry street",
+    "parking": "campus",
+    
+    # General Campus
+    "campus": "campus",
+    "vt": "virginia tech",
+    "tech": "virginia tech",
+}
+
+# Every campus place name and keyword, compiled once into a single automaton
+PLACE_GAZETTEER = Gazetteer({**BUILDING_KEYWORDS, **{place: place for place in CAMPUS_PLACES if place not in BUILDING_KEYWORDS}})
+
+# Street addresses: a house number, then the last street suffix in the same run of words.
+# This is what `\d+\s+[\w\s]+\s+(street|st|...)` matched, found with three linear scans
+# instead of a greedy middle that backtracks over every digit in the run.
+_ADDRESS_RUN = re.compile(r"[\w\s]+")
+_HOUSE_NUMBER = re.compile(r"(?<!\d)\d+(?=\s)")
+_STREET_SUFFIX = re.compile(r"(?<=\s)(street|st|road|rd|drive|dr|avenue|ave|way|lane|ln)", re.IGNORECASE)
+
+def find_addresses(text: str) -> List[Tuple[int, str]]:
+    """
+    (start, address) for every street address in text, left to right.
+    """
+    addresses = []
+    for run in _ADDRESS_RUN.finditer(text):
+        words = run.group(0)
+        number = _HOUSE_NUMBER.search(words)
+        if not number:
+            continue
+        suffix = None
+        for suffix in _STREET_SUFFIX.finditer(words, number.end()):
+            pass
+        # The number and the suffix need whitespace, a word, and whitespace between them
+        if suffix and suffix.start() >= number.end() + 3:
+            addresses.append((run.start() + number.start(), words[number.start():suffix.end()]))
+    return addresses
+
+_KNOWN_PLACES = set(CAMPUS_PLACES.values())
+_WORD = re.compile(r"\S+")
+
+# Intent rules, compiled once into word-boundary cue scanners (see services/rule_engine.py).
+# Each rule reads like the regex it replaces: cues in order with anything in between, and a
+# capturing cue takes the words after it.
+ROUTE_CODES = ("cas", "bt", "crc", "hdg", "hxp", "nmp", "sme", "tcp", "ttt", "ucb")
+_BUS = "bus|buses|transit|" + "|".join(ROUTE_CODES)
+_GET = "get|getting|go|going|goes"
+
+BUS_SCHEDULE_RULES = RuleSet([
+    [cue("when"), cue("next|soonest"), cue(_BUS), cue("to|going|coming")],  # "when is next CAS bus"
+    [cue("next|when"), cue(_BUS), cue("come|comes|coming|arrive|arrives|arriving|schedule|schedules")],  # "when does CAS bus come"
+    [cue("i"), cue("am"), cue("at", "orig"), cue("when"), cue(_BUS)],  # "I am at X when is CAS bus"
+    [cue("when"), cue(_BUS), cue("from", "orig")],  # "when is bus from X"
+    [cue(_BUS), cue("schedule|schedules|next|when|time|times")],  # "CAS schedule" or "CAS next"
+])
+
+ROUTE_RULES = RuleSet([
+    [cue("quickest|fastest|best"), cue("route|routes|way"), cue("to", "dest")],  # "fastest route to X"
+    [cue("how|way"), cue(_GET), cue("to", "dest"), cue("from", "orig")],  # "how to get to X from Y"
+    [cue("from", "orig"), cue("to", "dest", adjacent=True)],  # "from X to Y"
+    [cue("how|way"), cue(_GET), cue("from", "orig"), cue("to", "dest")],  # "how to get from X to Y"
+    [cue("directions|route|routes"), cue("from", "orig"), cue("to", "dest")],  # "directions from X to Y"
+    [cue("how|way"), cue(_GET + "|travel"), cue("to", "dest")],  # "how to get to X" (general)
+    [cue("directions|route|routes"), cue("to", "dest")],  # "directions to X"
+    [cue("travel|go|going"), cue("from", "orig"), cue("to", "dest")],  # "travel from X to Y"
+])
+
+LOCATION_RULES = RuleSet([
+    [cue("i"), cue("am"), cue("at|in", "orig")],  # "I am at X", "I am currently at X"
+    [cue("currently|right now"), cue("at|in", "orig")],  # "currently at X"
+    [cue("from"), cue("here"), cue("to", "dest")],  # "from here to X"
+    [cue("at", "orig"), cue("right now")],  # "at X right now"
+])
+
+NEXT_BUS_RULES = RuleSet([
+    [cue("next|soonest"), cue("bus|buses|route|routes"), cue("to", "dest")],  # "next bus to X"
+    [cue("when"), cue("bus|buses|route|routes"), cue("to", "dest")],  # "when is bus to X"
+    [cue("next|when"), cue("bus|buses|route|routes", "dest", loose=True)],  # "next bus X"
+])
+
+# One scan over the query finds the cues of every rule set
+INTENT_CUES = RuleSet([rule for rules in (BUS_SCHEDULE_RULES, ROUTE_RULES, LOCATION_RULES, NEXT_BUS_RULES)
+                       for rule in rules.rules])
+
 def normalize_place(name: str) -> str:
     if not name:
         return name
     key = name.strip().lower()
     return CAMPUS_PLACES.get(key, name)
 
-def simple_parse(query: str) -> Dict[str, Optional[str]]:
+def _resolved(place: str) -> bool:
+    """A campus place or a street address, as opposed to whatever words a pattern captured."""
+    return place in _KNOWN_PLACES or bool(find_addresses(place))
+
+# Flags that each cost AMBIGUITY_PENALTY confidence (an unresolved origin costs more, see _confidence)
+AMBIGUITY_FLAGS = ("several_route_codes", "intent_override", "place_from_tail", "several_places")
+AMBIGUITY_PENALTY = 0.15
+
+def _confidence(intent: str, destination: Optional[str], bus_route: Optional[str], flags: list,
+                signal: bool) -> float:
+    """
+    How far a simple_parse answer can be trusted, from 0 to 1. A matched transit pattern starts
+    at 0.6 and reaches 0.9 once it has something to act on (a resolved destination, or the route
+    of a next-bus question); ambiguity takes it down. A generic answer scores 0.2 when the query
+    had cue words or places the patterns couldn't use, and 0 when it had nothing transit-like.
+    """
+    if intent == "generic":
+        return 0.2 if signal else 0.0
+    score = 0.6
+    if (destination and "unresolved_destination" not in flags) or (intent == "next_bus" and bus_route):
+        score += 0.3
+    if "unresolved_origin" in flags:
+        score -= 0.2
+    score -= AMBIGUITY_PENALTY * sum(flag in flags for flag in AMBIGUITY_FLAGS)
+    return round(min(max(score, 0.0), 1.0), 2)
+
+def simple_parse(query: str) -> Dict[str, Any]:
     q = query.lower()
     intent = "generic"
     dest = None
     orig = None
     bus_route = None
+    # Evidence behind the answer: which rules matched and what looked ambiguous
+    patterns = []
+    flags = []
     
-    # Enhanced patterns for better coverage
+    cues = INTENT_CUES.scan(q)
     
     # 1. Bus schedule queries with specific routes
-    bus_schedule_patterns = [
-        r"when.*(next|soonest).*(cas|bt|transit|bus|crc|hdg|hxp|nmp|sme|tcp|ttt|ucb).*(?:to|going|coming)",  # "when is next CAS bus"
-        r"(next|when).*(cas|bt|transit|bus|crc|hdg|hxp|nmp|sme|tcp|ttt|ucb).*(come|coming|arrive|schedule)",  # "when does CAS bus come"
-        r"i.*am.*at\s+(?P<orig>[\w\s,]+).*when.*(cas|bt|transit|bus|crc|hdg|hxp|nmp|sme|tcp|ttt|ucb)",  # "I am at X when is CAS bus"
-        r"when.*(cas|bt|transit|bus|crc|hdg|hxp|nmp|sme|tcp|ttt|ucb).*from\s+(?P<orig>[\w\s,]+)",  # "when is bus from X"
-        r"(cas|bt|transit|bus|crc|hdg|hxp|nmp|sme|tcp|ttt|ucb).*(schedule|next|when|time)",  # "CAS schedule" or "CAS next"
-    ]
+    m = BUS_SCHEDULE_RULES.match(q, cues)
+    if m:
+        intent = "next_bus"
+        patterns.append(f"bus_schedule:{m[0]}")
+        captures = m[1]
+        if captures.get("orig"):
+            orig = captures["orig"]
+        # Route codes count only as whole words ("forecast" is not CAS); first code in ROUTE_CODES order wins
+        mentioned = {occurrence.word for occurrence in cues}
+        codes = [code for code in ROUTE_CODES if code in mentioned]
+        bus_route = codes[0].upper() if codes else None
+        if len(codes) > 1:
+            flags.append("several_route_codes")
     
-    for pattern in bus_schedule_patterns:
-        m = re.search(pattern, q)
-        if m:
-            intent = "next_bus"
-            if "orig" in m.groupdict() and m.group("orig"):
-                orig = m.group("orig").strip()
-            # Extract bus route if mentioned
-            if "cas" in q:
-                bus_route = "CAS"
-            elif "bt" in q:
-                bus_route = "BT"
-            elif "crc" in q:
-                bus_route = "CRC"
-            elif "hdg" in q:
-                bus_route = "HDG"
-            elif "hxp" in q:
-                bus_route = "HXP"
-            elif "nmp" in q:
-                bus_route = "NMP"
-            elif "sme" in q:
-                bus_route = "SME"
-            elif "tcp" in q:
-                bus_route = "TCP"
-            elif "ttt" in q:
-                bus_route = "TTT"
-            elif "ucb" in q:
-                bus_route = "UCB"
-            break
-    
-    # 2. Enhanced route/direction patterns
-    route_patterns = [
-        r"(quickest|fastest|best).*(route|way).*to\s+(?P<dest>[\w\s,]+)",  # "fastest route to X"
-        r"(how|way).*(get|go).*to\s+(?P<dest>[\w\s,]+).*from\s+(?P<orig>[\w\s,]+)",  # "how to get to X from Y"
-        r"from\s+(?P<orig>[\w\s,]+?)\s+to\s+(?P<dest>[\w\s,]+)",  # "from X to Y"
-        r"(how|way).*(get|go).*from\s+(?P<orig>[\w\s,]+).*to\s+(?P<dest>[\w\s,]+)",  # "how to get from X to Y"
-        r"(directions|route).*from\s+(?P<orig>[\w\s,]+).*to\s+(?P<dest>[\w\s,]+)",  # "directions from X to Y"
-        r"(how|way).*(get|go|travel).*to\s+(?P<dest>[\w\s,]+)",  # "how to get to X" (general)
-        r"(directions|route).*to\s+(?P<dest>[\w\s,]+)",  # "directions to X"
-        r"(travel|go).*from\s+(?P<orig>[\w\s,]+).*to\s+(?P<dest>[\w\s,]+)",  # "travel from X to Y"
-    ]
-    
-    for pattern in route_patterns:
-        m = re.search(pattern, q)
-        if m:
-            intent = "transit_route"
-            if "dest" in m.groupdict() and m.group("dest"):
-                dest = m.group("dest").strip()
-            if "orig" in m.groupdict() and m.group("orig"):
-                orig = m.group("orig").strip()
-            break
+    # 2. Route/direction patterns
+    m = ROUTE_RULES.match(q, cues)
+    if m:
+        if intent == "next_bus":
+            flags.append("intent_override")
+        intent = "transit_route"
+        patterns.append(f"route:{m[0]}")
+        captures = m[1]
+        if captures.get("dest"):
+            dest = captures["dest"]
+        if captures.get("orig"):
+            orig = captures["orig"]
     
     # 3. Current location patterns
-    location_patterns = [
-        r"i.*am.*(at|in|currently at)\s+(?P<orig>[\w\s,]+)",  # "I am at X"
-        r"(currently|right now).*(at|in)\s+(?P<orig>[\w\s,]+)",  # "currently at X"
-        r"from.*here.*to\s+(?P<dest>[\w\s,]+)",  # "from here to X"
-        r"at\s+(?P<orig>[\w\s,]+).*right now",  # "at X right now"
-    ]
-    
-    for pattern in location_patterns:
-        m = re.search(pattern, q)
-        if m:
-            if intent == "generic":
-                intent = "transit_route"
-            if "orig" in m.groupdict() and m.group("orig") and not orig:
-                orig = m.group("orig").strip()
-            if "dest" in m.groupdict() and m.group("dest") and not dest:
-                dest = m.group("dest").strip()
-            break
-    
-    # 4. Next bus patterns (enhanced)
-    next_bus_patterns = [
-        r"(next|soonest).*(bus|route).*to\s+(?P<dest>[\w\s,]+)",  # "next bus to X"
-        r"when.*(bus|route).*to\s+(?P<dest>[\w\s,]+)",  # "when is bus to X"
-        r"(next|when).*(bus|route).*(?P<dest>[\w\s,]+)",  # "next bus X"
-    ]
+    m = LOCATION_RULES.match(q, cues)
+    if m:
+        if intent == "generic":
+            intent = "transit_route"
+        patterns.append(f"location:{m[0]}")
+        captures = m[1]
+        if captures.get("orig") and not orig:
+            orig = captures["orig"]
+        if captures.get("dest") and not dest:
+            dest = captures["dest"]
     
+    # 4. Next bus patterns
     if intent == "generic":
-        for pattern in next_bus_patterns:
-            m = re.search(pattern, q)
-            if m:
-                intent = "next_bus"
-                if "dest" in m.groupdict() and m.group("dest"):
-                    dest = m.group("dest").strip()
-                break
-    
-    # 5. Enhanced building name detection
-    building_keywords = {
-        # Major Buildings
-        "goodwin": "goodwin hall",
-        "lavery": "lavery hall",
-        "squires": "squires",
-        "torgersen": "torgersen hall",
-        "mcbryde": "mcbryde hall",
-        "norris": "norris hall",
-        "randolph": "randolph hall",
-        "newman": "newman library",
-        "dietrick": "dietrick hall",
-        "west egg": "west eggleston",
-        "east egg": "east eggleston",
-        
-        # Dining Halls
-        "d2": "d2",
-        "owens": "owens food court",
-        "hokie grill": "hokie grill",
-        "turner": "turner place",
-        
-        # Residential Halls
-        "barringer": "barringer hall",
-        "hoge": "hoge hall",
-        "johnson": "johnson hall",
-        "lee": "lee hall",
-        "miles": "miles hall",
-        "pridemore": "pridemore hall",
-        "slusher": "slusher hall",
-        "vawter": "vawter hall",
-        
-        # Off-Campus Areas
-        "main": "main street",
-        "progress": "progress street",
-        "university city": "university city",
-        "ucb": "university city",
-        "toms creek": "toms creek",
-        "hethwood": "hethwood",
-        "harding": "harding avenue",
-        "patrick henry": "patrick henry drive",
-        "crc": "corporate research center",
-        "downtown": "downtown",
-        
-        # Sports Facilities
-        "cassell": "cassell coliseum",
-        "lane": "lane stadium",
-        "english field": "english field",
-        "aquatic": "aquatic center",
-        "mccomas": "mccomas hall",
-        
-        # Parking
-        "perry": "perry street",
-        "parking": "campus",
-        
-        # General Campus
-        "campus": "campus",
-        "vt": "virginia tech",
-        "tech": "virginia tech",
-    }
+        m = NEXT_BUS_RULES.match(q, cues)
+        if m:
+            intent = "next_bus"
+            patterns.append(f"next_bus:{m[0]}")
+            if m[1].get("dest"):
+                dest = m[1]["dest"]
     
-    for keyword, full_name in building_keywords.items():
-        if keyword in q:
-            if not dest and (f"to {keyword}" in q or f"{keyword}" in q.split()[-3:]):
-                dest = full_name
-            if not orig and (f"from {keyword}" in q or f"at {keyword}" in q):
-                orig = full_name
+    # 5. Building names: every place mention is found with its span in one pass over the query.
+    # "to X" names the destination and "from X"/"at X" the origin; failing that, a place among
+    # the last three words is taken as the destination.
+    mentions = PLACE_GAZETTEER.longest(q)
+    for mention in mentions:
+        before = q[:mention.start]
+        if not dest and before.endswith("to "):
+            dest = mention.name
+        if not orig and before.endswith(("from ", "at ")):
+            orig = mention.name
+    if not dest and mentions:
+        word_starts = [word.start() for word in _WORD.finditer(q)]
+        tail = word_starts[-3] if len(word_starts) >= 3 else 0
+        dest = next((mention.name for mention in mentions if mention.start >= tail), None)
+        if dest:
+            flags.append("place_from_tail")
+    if len(mentions) > 2:
+        flags.append("several_places")
     
     # 6. Address pattern detection
-    address_pattern = r"\d+\s+[\w\s]+\s+(street|st|road|rd|drive|dr|avenue|ave|way|lane|ln)"
-    addresses = re.findall(address_pattern, q, re.IGNORECASE)
-    if addresses:
-        # Find the full address in the query
-        for match in re.finditer(address_pattern, q, re.IGNORECASE):
-            full_address = match.group(0)
-            if "from" in q[:match.start()]:
-                orig = full_address
-            elif "to" in q[:match.start()] or intent == "transit_route":
-                dest = full_address
+    for start, full_address in find_addresses(q):
+        if "from" in q[:start]:
+            orig = full_address
+        elif "to" in q[:start] or intent == "transit_route":
+            dest = full_address
     
     # Check if user specifically asked for bus
     bus_only = any(word in q for word in ["bus from", "bus to", "take bus", "by bus", "using bus"])
     
+    origin = normalize_place(orig) if orig else None
+    destination = normalize_place(dest) if dest else None
+    if origin and not _resolved(origin):
+        flags.append("unresolved_origin")
+    if destination and not _resolved(destination):
+        flags.append("unresolved_destination")
+    
     return {
         "intent": intent,
-        "origin": normalize_place(orig) if orig else None,
-        "destination": normalize_place(dest) if dest else None,
+        "origin": origin,
+        "destination": destination,
         "bus_route": bus_route,
-        "bus_only": bus_only
+        "bus_only": bus_only,
+        "confidence": _confidence(intent, destination, bus_route, flags, bool(cues or mentions)),
+        "evidence": {"patterns": patterns, "places": [mention.name for mention in mentions], "flags": flags},
     }
 
-def nvidia_nim_parse(query: str) -> Dict[str, Optional[str]]:
-    """Use NVIDIA NIMs for intent parsing"""
+LLM_SYSTEM_PROMPT = (
+    "Extract JSON: {intent:[next_bus,transit_route,generic], origin, destination, bus_route}. "
+    "Prefer campus building names as given; bus_route is a route code such as CAS or HXP, or null."
+)
+
+def _nim_payload(query: str) -> Dict[str, Any]:
+    return {
+        "model": "meta/llama-3.1-8b-instruct",  # or your preferred NVIDIA NIM model
+        "messages": [
+            {"role": "system", "content": LLM_SYSTEM_PROMPT},
+            {"role": "user", "content": query}
+        ],
+        "temperature": 0.1,
+        "max_tokens": 200,
+        "response_format": {"type": "json_object"}
+    }
+
+def _llm_result(data: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    return {
+        "intent": data.get("intent") or "generic",
+        "origin": normalize_place(data.get("origin")) if data.get("origin") else None,
+        "destination": normalize_place(data.get("destination")) if data.get("destination") else None,
+        "bus_route": data.get("bus_route")
+    }
+
+# LLM parsers. The _request variants raise on any failure; the public ones fall back to
+# simple_parse. Sync callers block on the request; the async variants go through the shared
+# connection pool, so waiting on a model never blocks the event loop.
+def _nim_endpoint() -> Tuple[str, Dict[str, str]]:
     nim_endpoint = os.getenv("NVIDIA_NIM_ENDPOINT")
     nim_api_key = os.getenv("NVIDIA_NIM_API_KEY")
-    
-    if not nim_endpoint or not nim_api_key or requests is None:
-        return simple_parse(query)
-    
-    system_prompt = (
-        "Extract JSON: {intent:[next_bus,transit_route,generic], origin, destination}. "
-        "Prefer campus building names as given."
+    if not nim_endpoint or not nim_api_key:
+        raise RuntimeError("NVIDIA NIM is not configured")
+    headers = {
+        "Authorization": f"Bearer {nim_api_key}",
+        "Content-Type": "application/json"
+    }
+    return f"{nim_endpoint}/v1/chat/completions", headers
+
+def _nim_request(query: str) -> Dict[str, Optional[str]]:
+    if requests is None:
+        raise RuntimeError("requests is not installed")
+    url, headers = _nim_endpoint()
+    response = requests.post(url, headers=headers, json=_nim_payload(query), timeout=10)
+    response.raise_for_status()
+    content = response.json()["choices"][0]["message"]["content"]
+    return _llm_result(json.loads(content))
+
+def _openai_request(query: str) -> Dict[str, Optional[str]]:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key or OpenAI is None:
+        raise RuntimeError("OpenAI is not configured")
+    resp = OpenAI(api_key=api_key).chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": LLM_SYSTEM_PROMPT},
+            {"role": "user", "content": query}
+        ],
+        response_format={"type": "json_object"},
+        timeout=10,
     )
-    
+    return _llm_result(json.loads(resp.choices[0].message.content))
+
+def nvidia_nim_parse(query: str) -> Dict[str, Optional[str]]:
+    """Use NVIDIA NIMs for intent parsing"""
     try:
-        headers = {
-            "Authorization": f"Bearer {nim_api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": "meta/llama-3.1-8b-instruct",  # or your preferred NVIDIA NIM model
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": query}
-            ],
-            "temperature": 0.1,
-            "max_tokens": 200,
-            "response_format": {"type": "json_object"}
-        }
-        
-        response = requests.post(f"{nim_endpoint}/v1/chat/completions", 
-                               headers=headers, json=payload, timeout=10)
-        response.raise_for_status()
-        
-        result = response.json()
-        content = result["choices"][0]["message"]["content"]
-        data = json.loads(content)
-        
-        return {
-            "intent": data.get("intent") or "generic",
-            "origin": normalize_place(data.get("origin")) if data.get("origin") else None,
-            "destination": normalize_place(data.get("destination")) if data.get("destination") else None,
-            "bus_route": data.get("bus_route")
-        }
+        return _nim_request(query)
     except Exception as e:
         print(f"NVIDIA NIM error: {e}")
         return simple_parse(query)
 
 def openai_parse(query: str) -> Dict[str, Optional[str]]:
     """Use OpenAI for intent parsing"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key or OpenAI is None:
+    try:
+        return _openai_request(query)
+    except Exception:
         return simple_parse(query)
-    
-    client = OpenAI(api_key=api_key)
-    system = (
-        "Extract JSON: {intent:[next_bus,transit_route,generic], origin, destination}. "
-        "Prefer campus building names as given."
+
+async def _nim_request_async(query: str) -> Dict[str, Optional[str]]:
+    url, headers = _nim_endpoint()
+    response = await post_json(url, _nim_payload(query), headers=headers, timeout=10)
+    content = response.json()["choices"][0]["message"]["content"]
+    return _llm_result(json.loads(content))
+
+_openai_client = None
+_openai_pool = None
+
+def _async_openai(api_key: str):
+    """AsyncOpenAI client riding on the shared httpx pool (rebuilt when the pool is)."""
+    global _openai_client, _openai_pool
+    pool = get_client()
+    if _openai_client is None or _openai_pool is not pool:
+        _openai_client = AsyncOpenAI(api_key=api_key, http_client=pool)
+        _openai_pool = pool
+    return _openai_client
+
+async def _openai_request_async(query: str) -> Dict[str, Optional[str]]:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key or AsyncOpenAI is None:
+        raise RuntimeError("OpenAI is not configured")
+    resp = await _async_openai(api_key).chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": LLM_SYSTEM_PROMPT},
+            {"role": "user", "content": query}
+        ],
+        response_format={"type": "json_object"},
+        timeout=10,
     )
-    
+    return _llm_result(json.loads(resp.choices[0].message.content))
+
+async def nvidia_nim_parse_async(query: str) -> Dict[str, Optional[str]]:
+    """Use NVIDIA NIMs for intent parsing without blocking the event loop"""
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": query}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        data = json.loads(resp.choices[0].message.content)
-        return {
-            "intent": data.get("intent") or "generic",
-            "origin": normalize_place(data.get("origin")) if data.get("origin") else None,
-            "destination": normalize_place(data.get("destination")) if data.get("destination") else None,
-            "bus_route": data.get("bus_route")
-        }
+        return await _nim_request_async(query)
+    except Exception as e:
+        print(f"NVIDIA NIM error: {e}")
+        return simple_parse(query)
+
+async def openai_parse_async(query: str) -> Dict[str, Optional[str]]:
+    """Use OpenAI for intent parsing without blocking the event loop"""
+    try:
+        return await _openai_request_async(query)
     except Exception:
         return simple_parse(query)
 
-def llm_parse(query: str) -> Dict[str, Optional[str]]:
-    """Main parsing function - uses optimized simple parser for fast, reliable campus queries"""
-    # Use simple parser only - fast, reliable, and works great for campus queries
-    return simple_parse(query)
+# Parse cache: the query log is dominated by a few hundred phrasings, and with an LLM parser
+# enabled a hit saves a model round trip. Queries that differ only in case, spacing or
+# punctuation runs share an entry (see normalize_query).
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "2048"))
+PARSE_CACHE_TTL_SECONDS = int(os.getenv("PARSE_CACHE_TTL_SECONDS", "3600"))
+
+_parse_cache = LRUCache(maxsize=PARSE_CACHE_SIZE, ttl=PARSE_CACHE_TTL_SECONDS)
+
+_SPACES = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[^\w]+|[^\w]+$")
+_PUNCTUATION_RUN = re.compile(r"([^\w\s])[^\w\s]+")
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key and parser input for a query: lowercased, whitespace collapsed, leading and
+    trailing punctuation dropped, and runs of punctuation ("?!", "...") cut to their first mark.
+    """
+    text = _SPACES.sub(" ", query.lower()).strip()
+    text = _EDGE_PUNCTUATION.sub("", text)
+    return _PUNCTUATION_RUN.sub(r"\1", text)
+
+# Tiered parsing. simple_parse answers when its confidence reaches RULE_CONFIDENCE_THRESHOLD;
+# below that the query escalates to the LLM parser named by NLU_LLM_PARSER ("nim" or "openai";
+# empty keeps the rule parser only), unless it scores under LLM_ESCALATION_FLOOR and so shows
+# nothing transit-like for a model to find. Results carry the "tier" that answered, while
+# "confidence" and "evidence" always describe the rule parse.
+NLU_LLM_PARSER = os.getenv("NLU_LLM_PARSER", "").strip().lower()
+RULE_CONFIDENCE_THRESHOLD = float(os.getenv("RULE_CONFIDENCE_THRESHOLD", "0.8"))
+LLM_ESCALATION_FLOOR = float(os.getenv("LLM_ESCALATION_FLOOR", "0.1"))
+# Async parses give the model this long before answering with the rule parse
+LLM_LATENCY_BUDGET_SECONDS = float(os.getenv("LLM_LATENCY_BUDGET_SECONDS", "0.8"))
+
+_LLM_PARSERS = {"nim": _nim_request, "openai": _openai_request}
+_LLM_REQUESTS = {"nim": _nim_request_async, "openai": _openai_request_async}
+
+# Answers per tier: confident rules, rule answers the model wasn't asked about (no transit
+# signal, or no model configured), and model calls that answered, missed the deadline or failed
+_tier_counts: Dict[str, int] = {"rules": 0, "no_signal": 0, "low_confidence": 0,
+                                "llm": 0, "llm_late": 0, "llm_failed": 0}
+# Rule answers given because the model missed out aren't cached, so the model is asked again
+_MODEL_MISSED = ("llm_late", "llm_failed")
+# Model calls in flight, kept referenced until they finish even if the query gave up on them
+_late_answers: Set[asyncio.Task] = set()
+
+def _rule_tier(rules: Dict[str, Any], models: Dict[str, Any]) -> Optional[str]:
+    """The counter for a rule parse that is answered as is, or None when it goes to the model."""
+    if rules["confidence"] >= RULE_CONFIDENCE_THRESHOLD:
+        return "rules"
+    if rules["confidence"] < LLM_ESCALATION_FLOOR:
+        return "no_signal"
+    if NLU_LLM_PARSER not in models:
+        return "low_confidence"
+    return None
+
+def _model_answer(answer: Dict[str, Any], rules: Dict[str, Any]) -> Dict[str, Any]:
+    # The model isn't asked about bus-only phrasing, and may leave out a route code the rules
+    # found; keep the rule parser's reading of both
+    return {**answer, "bus_route": answer.get("bus_route") or rules["bus_route"], "bus_only": rules["bus_only"],
+            "confidence": rules["confidence"], "evidence": rules["evidence"], "tier": "llm"}
+
+def _model_missed(rules: Dict[str, Any], counter: str) -> Dict[str, Any]:
+    _tier_counts[counter] += 1
+    evidence = {**rules["evidence"], "flags": rules["evidence"]["flags"] + [counter]}
+    return {**rules, "evidence": evidence, "tier": "rules"}
+
+def _cacheable(result: Dict[str, Any]) -> bool:
+    return not any(flag in _MODEL_MISSED for flag in result["evidence"]["flags"])
+
+def _keep_late_answer(key: str, rules: Dict[str, Any], task: asyncio.Task) -> None:
+    _late_answers.discard(task)
+    # A failure was already counted by the query that asked (as llm_failed, or llm_late if it
+    # gave up first); retrieving the exception here keeps it from being reported as unhandled
+    if task.cancelled() or task.exception() is not None:
+        return
+    # Possibly too late for the query that asked, but the next one with the same key gets it
+    _parse_cache.set(key, _model_answer(task.result(), rules))
+
+async def parse_transit_query_async(query: str) -> Dict[str, Any]:
+    """
+    Parse a transit query, from the cache when possible. An escalated query races the model
+    against LLM_LATENCY_BUDGET_SECONDS and gets the rule parse if the model misses it; the
+    model's late answer is cached for the next query with the same key.
+    """
+    key = normalize_query(query)
+    cached = _parse_cache.get(key)
+    if cached is not MISSING:
+        return copy.deepcopy(cached)
+
+    rules = simple_parse(key)
+    tier = _rule_tier(rules, _LLM_REQUESTS)
+    if tier:
+        _tier_counts[tier] += 1
+        result = {**rules, "tier": "rules"}
+    else:
+        # Tracked before awaiting, so the call survives (and its answer is cached) even if this
+        # query times out or is cancelled
+        task = asyncio.ensure_future(_LLM_REQUESTS[NLU_LLM_PARSER](key))
+        _late_answers.add(task)
+        task.add_done_callback(lambda done: _keep_late_answer(key, rules, done))
+        try:
+            answer = await asyncio.wait_for(asyncio.shield(task), LLM_LATENCY_BUDGET_SECONDS)
+            _tier_counts["llm"] += 1
+            result = _model_answer(answer, rules)
+        except asyncio.TimeoutError:
+            result = _model_missed(rules, "llm_late")
+        except Exception as e:
+            print(f"LLM parse error ({NLU_LLM_PARSER}): {e}")
+            result = _model_missed(rules, "llm_failed")
+
+    if _cacheable(result):
+        _parse_cache.set(key, copy.deepcopy(result))
+    return result
+
+def llm_parse(query: str) -> Dict[str, Any]:
+    """Main parsing function - the rule parser, escalating to the LLM parser only when it's unsure"""
+    rules = simple_parse(query)
+    tier = _rule_tier(rules, _LLM_PARSERS)
+    if tier:
+        _tier_counts[tier] += 1
+        return {**rules, "tier": "rules"}
+    try:
+        answer = _LLM_PARSERS[NLU_LLM_PARSER](query)
+    except Exception as e:
+        print(f"LLM parse error ({NLU_LLM_PARSER}): {e}")
+        return _model_missed(rules, "llm_failed")
+    _tier_counts["llm"] += 1
+    return _model_answer(answer, rules)
+
+def parse_transit_query(query: str) -> Dict[str, Any]:
+    """
+    Parse a transit query, from the cache when possible. Sync callers wait for the model when
+    a query escalates; handlers on an event loop should use parse_transit_query_async.
+    """
+    key = normalize_query(query)
+    cached = _parse_cache.get(key)
+    if cached is not MISSING:
+        return copy.deepcopy(cached)
+    # The normalized text is what gets parsed, so every query sharing a key gets the same answer
+    result = llm_parse(key)
+    if _cacheable(result):
+        _parse_cache.set(key, copy.deepcopy(result))
+    return result
+
+def parse_cache_stats() -> Dict[str, Any]:
+    """
+    Hit/miss counters for the parse cache.
+    """
+    return _parse_cache.stats()
 
-def parse_transit_query(query: str) -> Dict[str, Optional[str]]:
-    return llm_parse(query)
+def parse_tier_stats() -> Dict[str, Any]:
+    """
+    How parses were answered, per tier, with the escalation settings.
+    """
+    return {"llm_parser": NLU_LLM_PARSER or None, "rule_confidence_threshold": RULE_CONFIDENCE_THRESHOLD,
+            "llm_escalation_floor": LLM_ESCALATION_FLOOR, "latency_budget_seconds": LLM_LATENCY_BUDGET_SECONDS,
+            "llm_in_flight": len(_late_answers), **_tier_counts}
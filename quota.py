@@ -0,0 +1,223 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Priority classes: interactive requests (a user waiting on /ask) outrank background work (prefetch, batch builds)
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+class TokenBucket:
+    """
+    Rate limiter: holds up to `burst` tokens, refilled at `rate` tokens per second.
+    """
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def level(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def take(self, keep: float = 0.0) -> bool:
+        """Take one token if doing so leaves at least `keep` behind."""
+        self._refill()
+        if self.tokens - 1 < keep:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class QuotaStore:
+    """
+    Call counts per API and period (a day "2025-01-31" or a month "2025-01") in a SQLite file,
+    so every uvicorn worker draws on the same budgets and counts survive restarts.
+    Storage errors return None and callers fall back to counting in the process.
+    """
+
+    def __init__(self, path: str, table: str = "quota_usage"):
+        self.path = path
+        self.table = table
+        self._local = threading.local()
+        try:
+            conn = self._conn()
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} "
+                         "(api TEXT NOT NULL, period TEXT NOT NULL, used INTEGER NOT NULL, PRIMARY KEY (api, period))")
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _used(self, conn: sqlite3.Connection, api: str, day: str, month: str) -> Tuple[int, int]:
+        rows = dict(conn.execute(f"SELECT period, used FROM {self.table} WHERE api = ? AND period IN (?, ?)",
+                                 (api, day, month)).fetchall())
+        return rows.get(day, 0), rows.get(month, 0)
+
+    def usage(self, api: str, day: str, month: str) -> Optional[Tuple[int, int]]:
+        """(calls today, calls this month) for api, or None if the store can't be read."""
+        try:
+            return self._used(self._conn(), api, day, month)
+        except sqlite3.Error:
+            return None
+
+    def prune(self, api: str, month: str) -> None:
+        """Drop the counts of days and months before `month`; they are never read again."""
+        try:
+            conn = self._conn()
+            conn.execute(f"DELETE FROM {self.table} WHERE api = ? AND period < ?", (api, month))
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def charge(self, api: str, day: str, month: str,
+               fits: Callable[[int, int], bool]) -> Optional[Tuple[bool, int, int]]:
+        """
+        Count one call for api if fits(used_today, used_this_month) holds, checking and counting
+        in one write transaction so concurrent workers can't overspend. Returns (counted,
+        used_today, used_this_month), or None if the store can't be written.
+        """
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                used_today, used_this_month = self._used(conn, api, day, month)
+                counted = fits(used_today, used_this_month)
+                if counted:
+                    for period in (day, month):
+                        conn.execute(f"INSERT INTO {self.table} (api, period, used) VALUES (?, ?, 1) "
+                                     "ON CONFLICT (api, period) DO UPDATE SET used = used + 1", (api, period))
+                    used_today, used_this_month = used_today + 1, used_this_month + 1
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            return counted, used_today, used_this_month
+        except sqlite3.Error:
+            return None
+
+
+class QuotaManager:
+    """
+    Request budget for one upstream API: a token bucket for the request rate plus daily and
+    monthly call budgets (None means unlimited).
+
+    Background calls are refused once less than `reserve` of any budget (or of the bucket) is
+    left, so interactive calls keep the remainder; interactive calls are refused only when a
+    budget is spent or the bucket is empty. Budget counts reset with the local calendar day and
+    month; with a `store` they are shared by every process using it, otherwise they are per
+    process. The rate limit is always per process.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, daily_limit: Optional[int] = None,
+                 monthly_limit: Optional[int] = None, reserve: float = 0.2,
+                 clock: Callable[[], float] = time.time, store: Optional[QuotaStore] = None):
+        self.name = name
+        self.daily_limit = daily_limit
+        self.monthly_limit = monthly_limit
+        self.reserve = reserve
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.store = store
+        self._clock = clock
+        self._day = None
+        self._month = None
+        self.used_today = 0
+        self.used_this_month = 0
+        self.granted: Dict[str, int] = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.denied: Dict[str, int] = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._lock = threading.Lock()
+
+    def _roll_periods(self) -> None:
+        today = datetime.fromtimestamp(self._clock()).date()
+        if today != self._day:
+            self._day = today
+            self.used_today = 0
+        if (today.year, today.month) != self._month:
+            self._month = (today.year, today.month)
+            self.used_this_month = 0
+            if self.store is not None:
+                self.store.prune(self.name, self._periods()[1])
+
+    def _read_usage(self) -> None:
+        # Other processes may have spent shared budget since this one last counted
+        self._roll_periods()
+        if self.store is not None:
+            usage = self.store.usage(self.name, *self._periods())
+            if usage is not None:
+                self.used_today, self.used_this_month = usage
+
+    def _periods(self) -> Tuple[str, str]:
+        return self._day.isoformat(), "%04d-%02d" % self._month
+
+    def _fits(self, priority: str, used_today: int, used_this_month: int) -> bool:
+        keep = self.reserve if priority == BACKGROUND else 0.0
+        for used, limit in ((used_today, self.daily_limit), (used_this_month, self.monthly_limit)):
+            if limit is not None and limit - used <= keep * limit:
+                return False
+        return True
+
+    def _charge(self, priority: str) -> bool:
+        """Count one call against the budgets if they have room for it at this priority."""
+        if self.store is not None:
+            charged = self.store.charge(self.name, *self._periods(),
+                                        lambda today, month: self._fits(priority, today, month))
+            if charged is not None:
+                counted, self.used_today, self.used_this_month = charged
+                return counted
+        if not self._fits(priority, self.used_today, self.used_this_month):
+            return False
+        self.used_today += 1
+        self.used_this_month += 1
+        return True
+
+    def available(self, priority: str = INTERACTIVE) -> bool:
+        """Whether a call at this priority would be allowed now, without using any budget."""
+        with self._lock:
+            self._read_usage()
+            keep = self.reserve * self.bucket.burst if priority == BACKGROUND else 0.0
+            return self._fits(priority, self.used_today, self.used_this_month) and self.bucket.level() - 1 >= keep
+
+    def acquire(self, priority: str = INTERACTIVE) -> bool:
+        """Use budget for one call at this priority; False means the call should not be made."""
+        with self._lock:
+            self._roll_periods()
+            keep = self.reserve * self.bucket.burst if priority == BACKGROUND else 0.0
+            # The bucket is checked first, so a rate-limited call never spends shared budget
+            if self.bucket.level() - 1 < keep or not self._charge(priority):
+                self.denied[priority] += 1
+                return False
+            self.bucket.take(keep)
+            self.granted[priority] += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._read_usage()
+            return {
+                "used_today": self.used_today,
+                "daily_limit": self.daily_limit,
+                "used_this_month": self.used_this_month,
+                "monthly_limit": self.monthly_limit,
+                "tokens": round(self.bucket.level(), 2),
+                "granted": dict(self.granted),
+                "denied": dict(self.denied),
+            }
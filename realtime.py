@@ -0,0 +1,315 @@
+import asyncio
+import json
+import os
+import statistics
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.http_client import fetch
+
+try:
+    from google.transit import gtfs_realtime_pb2
+except Exception:
+    gtfs_realtime_pb2 = None
+
+# Feed locations: an http(s) URL or a local file path (handy for testing against a saved feed)
+FEED_SOURCES = {
+    "vehicles": os.getenv("GTFS_RT_VEHICLES_URL", ""),
+    "trip_updates": os.getenv("GTFS_RT_TRIP_UPDATES_URL", ""),
+    "alerts": os.getenv("GTFS_RT_ALERTS_URL", ""),
+}
+POLL_SECONDS = float(os.getenv("GTFS_RT_POLL_SECONDS", "15"))
+
+# Delay reports older than this no longer say anything about the next bus
+DELAY_MAX_AGE_SECONDS = 15 * 60
+
+# Compact per-entity records; equal records mean the entity didn't change between polls
+Vehicle = Tuple[str, str, str, float, float, Optional[float], int, str]   # id, trip, route, lat, lng, bearing, timestamp, stop
+TripUpdate = Tuple[str, str, Optional[int], Tuple[Tuple[str, int], ...], int, bool]  # trip, route, delay, stop delays, timestamp, canceled
+Alert = Tuple[str, Tuple[str, ...], str, str, str, str, str]  # id, routes, header, description, url, cause, effect
+
+
+def _field(message: Dict[str, Any], name: str, default: Any = None) -> Any:
+    """Read a field from GTFS-rt JSON, which may use proto (snake_case) or JSON (camelCase) names."""
+    if name in message:
+        return message[name]
+    head, *rest = name.split("_")
+    return message.get(head + "".join(part.title() for part in rest), default)
+
+
+def _text(translated: Any) -> str:
+    """First translation of a TranslatedString (dict from JSON or protobuf message)."""
+    if not translated:
+        return ""
+    if isinstance(translated, dict):
+        translations = translated.get("translation") or []
+        return translations[0].get("text", "") if translations else ""
+    return translated.translation[0].text if translated.translation else ""
+
+
+def decode_feed(data: bytes) -> Tuple[bool, int, List[Dict[str, Any]]]:
+    """
+    Parse a GTFS-realtime FeedMessage from protobuf bytes or its JSON form.
+    Returns (is_full_dataset, header timestamp, entities as dicts).
+    """
+    if data.lstrip()[:1] == b"{":
+        message = json.loads(data)
+        header = message.get("header", {})
+        incrementality = _field(header, "incrementality", "FULL_DATASET")
+        return (incrementality in ("FULL_DATASET", 0), int(header.get("timestamp") or 0), message.get("entity", []))
+
+    if gtfs_realtime_pb2 is None:
+        raise RuntimeError("gtfs-realtime-bindings is not installed; use a JSON feed or pip install it")
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.ParseFromString(data)
+    full = feed.header.incrementality == gtfs_realtime_pb2.FeedHeader.FULL_DATASET
+    return full, feed.header.timestamp, [_entity_dict(entity) for entity in feed.entity]
+
+
+def _entity_dict(entity) -> Dict[str, Any]:
+    """Pull the fields we use out of a protobuf FeedEntity."""
+    out: Dict[str, Any] = {"id": entity.id, "is_deleted": entity.is_deleted}
+    if entity.HasField("vehicle"):
+        v = entity.vehicle
+        out["vehicle"] = {
+            "vehicle": {"id": v.vehicle.id},
+            "trip": {"trip_id": v.trip.trip_id, "route_id": v.trip.route_id},
+            "position": {"latitude": v.position.latitude, "longitude": v.position.longitude,
+                         "bearing": v.position.bearing if v.position.HasField("bearing") else None},
+            "timestamp": v.timestamp,
+            "stop_id": v.stop_id,
+        }
+    if entity.HasField("trip_update"):
+        t = entity.trip_update
+        out["trip_update"] = {
+            "trip": {"trip_id": t.trip.trip_id, "route_id": t.trip.route_id,
+                     "schedule_relationship": gtfs_realtime_pb2.TripDescriptor.ScheduleRelationship.Name(
+                         t.trip.schedule_relationship)},
+            "delay": t.delay if t.HasField("delay") else None,
+            "timestamp": t.timestamp,
+            "stop_time_update": [
+                {"stop_id": u.stop_id,
+                 "departure": {"delay": u.departure.delay} if u.HasField("departure") else {},
+                 "arrival": {"delay": u.arrival.delay} if u.HasField("arrival") else {}}
+                for u in t.stop_time_update
+            ],
+        }
+    if entity.HasField("alert"):
+        a = entity.alert
+        out["alert"] = {
+            "informed_entity": [{"route_id": e.route_id} for e in a.informed_entity],
+            "header_text": a.header_text,
+            "description_text": a.description_text,
+            "url": a.url,
+            "cause": gtfs_realtime_pb2.Alert.Cause.Name(a.cause),
+            "effect": gtfs_realtime_pb2.Alert.Effect.Name(a.effect),
+        }
+    return out
+
+
+# Maps a feed's (trip_id, route_id) to the route key the static network uses
+RouteKey = Callable[[str, str], str]
+
+
+def _vehicle(entity_id: str, v: Dict[str, Any], route_key: RouteKey) -> Vehicle:
+    trip = v.get("trip") or {}
+    position = v.get("position") or {}
+    trip_id = _field(trip, "trip_id", "")
+    return (
+        (_field(v, "vehicle") or {}).get("id") or entity_id,
+        trip_id, route_key(trip_id, _field(trip, "route_id", "")),
+        float(position.get("latitude", 0.0)), float(position.get("longitude", 0.0)), position.get("bearing"),
+        int(v.get("timestamp") or 0), _field(v, "stop_id", ""),
+    )
+
+
+def _trip_update(t: Dict[str, Any], route_key: RouteKey) -> TripUpdate:
+    trip = t.get("trip") or {}
+    trip_id = _field(trip, "trip_id", "")
+    stop_delays = []
+    for update in _field(t, "stop_time_update", []):
+        event = update.get("departure") or update.get("arrival") or {}
+        if "delay" in event and _field(update, "stop_id"):
+            stop_delays.append((_field(update, "stop_id"), int(event["delay"])))
+    delay = t.get("delay")
+    return (
+        trip_id, route_key(trip_id, _field(trip, "route_id", "")),
+        int(delay) if delay is not None else None, tuple(stop_delays), int(t.get("timestamp") or 0),
+        _field(trip, "schedule_relationship") in ("CANCELED", 3),
+    )
+
+
+def _alert(entity_id: str, a: Dict[str, Any], route_key: RouteKey) -> Alert:
+    routes = tuple(dict.fromkeys(route_key("", _field(e, "route_id"))
+                                 for e in _field(a, "informed_entity", []) if _field(e, "route_id")))
+    return (entity_id, routes, _text(_field(a, "header_text")), _text(_field(a, "description_text")),
+            _text(a.get("url")), str(a.get("cause", "")), str(a.get("effect", "")))
+
+
+class RealtimeState:
+    """
+    Live vehicle, trip-update and alert state, updated in place from each poll.
+
+    Each poll is applied as a diff: unchanged entities are skipped, changed ones replaced and
+    entities missing from a full-dataset feed (or marked deleted) removed, so the per-route
+    indexes are only touched for what actually changed.
+    """
+
+    def __init__(self):
+        self.vehicles: Dict[str, Vehicle] = {}
+        self.trips: Dict[str, TripUpdate] = {}
+        self.alerts: Dict[str, Alert] = {}
+        self.feed_timestamps: Dict[str, int] = {}
+        # route_id -> trip ids with updates; (route_id, stop_id) -> trip ids reporting a delay there
+        self._route_trips: Dict[str, set] = {}
+        self._stop_trips: Dict[Tuple[str, str], set] = {}
+        # Feed route_id -> network route key, and trip_id -> network route key (see use_network)
+        self._route_keys: Dict[str, str] = {}
+        self._trip_routes: Dict[str, str] = {}
+
+    def use_network(self, route_keys: Dict[str, str], trip_routes: Dict[str, str]) -> None:
+        """
+        Store live data under the static network's route keys. Feeds name routes by their
+        routes.txt route_id, and some trip updates only by trip_id, while a compiled network keys
+        routes by short name. Call before the first poll.
+        """
+        self._route_keys = dict(route_keys)
+        self._trip_routes = dict(trip_routes)
+
+    def _route_key(self, trip_id: str, route_id: str) -> str:
+        return self._trip_routes.get(trip_id) or self._route_keys.get(route_id, route_id)
+
+    def apply(self, kind: str, data: bytes) -> Dict[str, int]:
+        """
+        Apply one poll of a feed ("vehicles", "trip_updates" or "alerts").
+        Returns counts of added/updated/removed/unchanged entities.
+        """
+        full, timestamp, entities = decode_feed(data)
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        if timestamp and self.feed_timestamps.get(kind) == timestamp:
+            return counts
+        self.feed_timestamps[kind] = timestamp
+
+        current, build, key = {
+            "vehicles": (self.vehicles, lambda e: _vehicle(e["id"], e["vehicle"], self._route_key), "vehicle"),
+            "trip_updates": (self.trips, lambda e: _trip_update(_field(e, "trip_update"), self._route_key), "trip_update"),
+            "alerts": (self.alerts, lambda e: _alert(e["id"], e["alert"], self._route_key), "alert"),
+        }[kind]
+
+        seen = set()
+        for entity in entities:
+            if _field(entity, key) is None and not _field(entity, "is_deleted"):
+                continue
+            record_id = self._record_id(kind, entity)
+            if _field(entity, "is_deleted"):
+                if record_id in current:
+                    self._remove(kind, record_id)
+                    counts["removed"] += 1
+                continue
+            record = build(entity)
+            record_id = record[0] or record_id
+            seen.add(record_id)
+            old = current.get(record_id)
+            if old == record:
+                counts["unchanged"] += 1
+                continue
+            if old is not None:
+                self._remove(kind, record_id)
+            self._add(kind, record)
+            counts["updated" if old is not None else "added"] += 1
+
+        if full:
+            for record_id in [r for r in current if r not in seen]:
+                self._remove(kind, record_id)
+                counts["removed"] += 1
+        return counts
+
+    @staticmethod
+    def _record_id(kind: str, entity: Dict[str, Any]) -> str:
+        if kind == "vehicles":
+            return (_field(_field(entity, "vehicle") or {}, "vehicle") or {}).get("id") or entity.get("id", "")
+        if kind == "trip_updates":
+            return _field((_field(entity, "trip_update") or {}).get("trip") or {}, "trip_id", "") or entity.get("id", "")
+        return entity.get("id", "")
+
+    def _add(self, kind: str, record: Tuple) -> None:
+        if kind == "vehicles":
+            self.vehicles[record[0]] = record
+        elif kind == "alerts":
+            self.alerts[record[0]] = record
+        else:
+            trip_id, route_id, _, stop_delays, _, _ = record
+            self.trips[trip_id] = record
+            self._route_trips.setdefault(route_id, set()).add(trip_id)
+            for stop_id, _ in stop_delays:
+                self._stop_trips.setdefault((route_id, stop_id), set()).add(trip_id)
+
+    def _remove(self, kind: str, record_id: str) -> None:
+        if kind == "vehicles":
+            self.vehicles.pop(record_id, None)
+        elif kind == "alerts":
+            self.alerts.pop(record_id, None)
+        else:
+            trip_id, route_id, _, stop_delays, _, _ = self.trips.pop(record_id)
+            self._route_trips.get(route_id, set()).discard(trip_id)
+            for stop_id, _ in stop_delays:
+                self._stop_trips.get((route_id, stop_id), set()).discard(trip_id)
+
+    def predicted_delay(self, route_id: str, stop_id: Optional[str] = None, now: Optional[float] = None) -> int:
+        """
+        Predicted delay in seconds for the next bus of a route: the median delay reported at the
+        stop, else across the route's trips. 0 when there are no recent reports.
+        """
+        fresh = self._fresh_trips(self._stop_trips.get((route_id, stop_id), ()), now) if stop_id else []
+        if fresh:
+            delays = [dict(self.trips[t][3])[stop_id] for t in fresh]
+        else:
+            delays = []
+            for trip_id in self._fresh_trips(self._route_trips.get(route_id, ()), now):
+                _, _, delay, stop_delays, _, _ = self.trips[trip_id]
+                if delay is not None:
+                    delays.append(delay)
+                elif stop_delays:
+                    delays.append(stop_delays[0][1])
+        return int(statistics.median(delays)) if delays else 0
+
+    def _fresh_trips(self, trip_ids, now: Optional[float]) -> List[str]:
+        if now is None:
+            return [t for t in trip_ids if not self.trips[t][5]]
+        return [t for t in trip_ids
+                if not self.trips[t][5] and (not self.trips[t][4] or now - self.trips[t][4] <= DELAY_MAX_AGE_SECONDS)]
+
+    def route_vehicles(self, route_id: str) -> List[Dict[str, Any]]:
+        return [{"vehicle_id": v[0], "trip_id": v[1], "lat": v[3], "lng": v[4], "bearing": v[5],
+                 "timestamp": v[6], "stop_id": v[7]}
+                for v in self.vehicles.values() if v[2] == route_id]
+
+    def alert_list(self) -> List[Dict[str, Any]]:
+        """Alerts in the shape get_live_bus_positions reports them."""
+        return [{"type": "Route" if routes else "System", "cause": cause, "effect": effect,
+                 "routes_affected": list(routes), "message": header or description, "more_info": url}
+                for _, routes, header, description, url, cause, effect in self.alerts.values()]
+
+
+# Process-wide state fed by the pollers and read by the bus handlers
+REALTIME = RealtimeState()
+
+
+def configured_feeds() -> Dict[str, str]:
+    return {kind: source for kind, source in FEED_SOURCES.items() if source}
+
+
+async def poll_feed(kind: str, source: Optional[str] = None) -> Dict[str, int]:
+    """
+    Fetch one feed (URL or file path) and apply it to REALTIME.
+    """
+    source = source or FEED_SOURCES[kind]
+    if source.startswith(("http://", "https://")):
+        data = (await fetch(source, timeout=10.0)).content
+    else:
+        data = await asyncio.to_thread(_read_file, source)
+    return REALTIME.apply(kind, data)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,127 @@
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.singleflight import SingleFlight
+
+
+class Snapshot:
+    __slots__ = ("value", "fetched_at", "updated_at")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.fetched_at = time.monotonic()
+        self.updated_at = datetime.now()
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class _Source:
+    def __init__(self, name: str, fetch: Callable[[], Awaitable[Any]], interval: float, jitter: float,
+                 failed: Optional[Callable[[Any], bool]]):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.jitter = jitter
+        self.failed = failed
+        self.snapshot: Optional[Snapshot] = None
+        self.refreshes = 0
+        self.failures = 0
+
+
+class BackgroundRefresher:
+    """
+    Keeps an in-memory snapshot of each upstream source, re-fetched on its own interval.
+
+    Handlers call get() and are answered from the latest snapshot. Only the very first
+    request for a source waits on the upstream; a snapshot older than 1.5 intervals (e.g. the
+    poller is behind) is refreshed in the background while the old one is served.
+    A failed refresh keeps the previous snapshot.
+    """
+
+    STALE_FACTOR = 1.5
+
+    def __init__(self):
+        self._sources: Dict[str, _Source] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._flights = SingleFlight()
+
+    def register(self, name: str, fetch: Callable[[], Awaitable[Any]], interval: float, jitter: float = 0.1,
+                 failed: Optional[Callable[[Any], bool]] = None) -> None:
+        """
+        Add a source polled every `interval` seconds, +/- `jitter` as a fraction of the interval.
+        `failed` flags a returned value that should not replace the current snapshot.
+        """
+        self._sources[name] = _Source(name, fetch, interval, jitter, failed)
+
+    async def refresh(self, name: str) -> Optional[Snapshot]:
+        """
+        Fetch a source now (concurrent refreshes of one source share a fetch).
+        """
+        return await self._flights.do(name, lambda: self._refresh(self._sources[name]))
+
+    async def _refresh(self, source: _Source) -> Optional[Snapshot]:
+        source.refreshes += 1
+        try:
+            value = await source.fetch()
+        except Exception as e:
+            print(f"⚠️ Refresh of {source.name} failed: {e}")
+            source.failures += 1
+            return source.snapshot
+        if source.failed and source.failed(value) and source.snapshot is not None:
+            source.failures += 1
+            return source.snapshot
+        source.snapshot = Snapshot(value)
+        return source.snapshot
+
+    async def get(self, name: str) -> Snapshot:
+        """
+        Latest snapshot for a source, fetching inline only if there is none yet.
+        """
+        source = self._sources[name]
+        snapshot = source.snapshot
+        if snapshot is None:
+            snapshot = await self.refresh(name)
+            if snapshot is None:
+                raise RuntimeError(f"No data available for {name}")
+        elif snapshot.age() > source.interval * self.STALE_FACTOR:
+            self._spawn(self.refresh(name))
+        return snapshot
+
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.append(task)
+        task.add_done_callback(self._tasks.remove)
+
+    async def _poll(self, source: _Source) -> None:
+        while True:
+            await self.refresh(source.name)
+            spread = source.interval * source.jitter
+            await asyncio.sleep(max(1.0, source.interval + random.uniform(-spread, spread)))
+
+    def start(self) -> None:
+        """
+        Start one polling task per source on the running loop.
+        """
+        for source in self._sources.values():
+            self._spawn(self._poll(source))
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "interval_seconds": source.interval,
+                "age_seconds": round(source.snapshot.age(), 1) if source.snapshot else None,
+                "refreshes": source.refreshes,
+                "failures": source.failures,
+            }
+            for name, source in self._sources.items()
+        }
@@ -0,0 +1,172 @@
+"""
+Linear-time matcher for ordered keyword rules such as "when ... next ... bus ... to <place>".
+
+Every cue word of every rule is compiled into one word-boundary alternation, so a query is
+scanned once. A rule is then a sequence of cue sets, matched like the regex `c1.*c2.*c3`
+(first cue at its earliest position, later cues as late as possible) but over the short list
+of cue occurrences instead of by backtracking over the text. A cue can capture the run of
+words after it, which ends at punctuation or where the next cue of the rule begins.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Characters a captured place name may contain (the old `[\w\s,]+`)
+_RUN_BREAK = re.compile(r"[^\w\s,]")
+
+
+class Cue(NamedTuple):
+    """One rule element: any of `words`, optionally capturing the words that follow into `capture`."""
+    words: frozenset
+    capture: Optional[str] = None
+    # With adjacent=True the cue must follow the previous element's capture directly,
+    # at its first occurrence (like `(?P<orig>[\w\s,]+?)\s+to\s+`)
+    adjacent: bool = False
+    # Capture the rest of the run even when no whitespace separates it from the cue
+    loose: bool = False
+
+
+def cue(words: str, capture: Optional[str] = None, adjacent: bool = False, loose: bool = False) -> Cue:
+    """Rule element from "a|b|c" alternatives."""
+    return Cue(frozenset(words.split("|")), capture, adjacent, loose)
+
+
+class Occurrence(NamedTuple):
+    start: int
+    end: int
+    word: str
+
+
+class RuleSet:
+    """
+    Ordered rules compiled into one scanner. match() returns the first rule (in order) that
+    matches and its captures, like trying each regex of a list in turn.
+    """
+
+    def __init__(self, rules: Sequence[Sequence[Cue]]):
+        self.rules = [tuple(rule) for rule in rules]
+        words = sorted({word for rule in self.rules for element in rule for word in element.words},
+                       key=lambda word: (-len(word), word))
+        self._scanner = re.compile(r"\b(?:" + "|".join(re.escape(word) for word in words) + r")\b")
+
+    def scan(self, text: str) -> List[Occurrence]:
+        return [Occurrence(m.start(), m.end(), m.group(0)) for m in self._scanner.finditer(text)]
+
+    def match(self, text: str, occurrences: Optional[List[Occurrence]] = None) -> Optional[Tuple[int, Dict[str, str]]]:
+        """(rule index, captures) for the first matching rule, or None."""
+        if occurrences is None:
+            occurrences = self.scan(text)
+        if not occurrences:
+            return None
+        runs = _run_ends(text)
+        for index, rule in enumerate(self.rules):
+            captures = _match_rule(rule, occurrences, text, runs)
+            if captures is not None:
+                return index, captures
+        return None
+
+
+def _run_ends(text: str) -> List[int]:
+    """run_end[i] = end of the run of capturable characters starting at i (i itself when text[i] breaks it)."""
+    ends: List[int] = []
+    start = 0
+    for m in _RUN_BREAK.finditer(text):
+        ends.extend([m.start()] * (m.start() - start + 1))
+        start = m.start() + 1
+    ends.extend([len(text)] * (len(text) - start + 1))
+    return ends
+
+
+def _can_capture(element: Cue, occurrence: Occurrence, text: str, runs: List[int]) -> bool:
+    """A capturing cue needs whitespace and then at least one more run character after it."""
+    if not element.capture:
+        return True
+    at = occurrence.end
+    if element.loose:
+        return runs[at] > at
+    return at < len(text) and text[at].isspace() and runs[at] >= at + 2
+
+
+def _match_rule(rule: Tuple[Cue, ...], occurrences: List[Occurrence], text: str,
+                runs: List[int]) -> Optional[Dict[str, str]]:
+    if any(element.adjacent for element in rule):
+        return _match_adjacent(rule, occurrences, text, runs)
+
+    # Latest feasible occurrence of each element, right to left
+    latest: List[Optional[int]] = [None] * len(rule)
+    bound = len(text)
+    j = len(occurrences) - 1
+    for k in range(len(rule) - 1, 0, -1):
+        element = rule[k]
+        while j >= 0 and not (occurrences[j].end <= bound and occurrences[j].word in element.words
+                              and _can_capture(element, occurrences[j], text, runs)):
+            j -= 1
+        if j < 0:
+            return None
+        latest[k] = j
+        bound = occurrences[j].start
+        j -= 1
+
+    # The first element at its earliest occurrence that leaves room for the rest
+    first = rule[0]
+    for i, occurrence in enumerate(occurrences):
+        if occurrence.end > bound:
+            return None
+        if occurrence.word in first.words and _can_capture(first, occurrence, text, runs):
+            latest[0] = i
+            break
+    else:
+        return None
+
+    captures = {}
+    for k, element in enumerate(rule):
+        if element.capture:
+            start = occurrences[latest[k]].end
+            end = runs[start]
+            if k + 1 < len(rule):
+                end = min(end, occurrences[latest[k + 1]].start)
+            captures[element.capture] = text[start:end].strip()
+    return captures
+
+
+def _match_adjacent(rule: Tuple[Cue, ...], occurrences: List[Occurrence], text: str,
+                    runs: List[int]) -> Optional[Dict[str, str]]:
+    """
+    Rules whose cues follow each other inside one run of words, e.g. "from <orig> to <dest>":
+    the leftmost first cue with a complete chain wins, each later cue at its first occurrence.
+    """
+    # A later first cue in the same run can only see fewer second cues, so once the second cue
+    # is missing the rest of that run is skipped (keeps "from from from ..." linear)
+    dead_run = -1
+    for i, occurrence in enumerate(occurrences):
+        if occurrence.word not in rule[0].words or not _can_capture(rule[0], occurrence, text, runs):
+            continue
+        if runs[occurrence.end] == dead_run:
+            continue
+        chosen = [i]
+        for element in rule[1:]:
+            previous = occurrences[chosen[-1]]
+            run_end = runs[previous.end]
+            # The capture before an adjacent cue takes at least one character and stays within the run
+            for j in range(chosen[-1] + 1, len(occurrences)):
+                candidate = occurrences[j]
+                if candidate.start > run_end:
+                    break
+                if (candidate.word in element.words and candidate.start > previous.end + 1
+                        and text[candidate.start - 1].isspace() and _can_capture(element, candidate, text, runs)):
+                    chosen.append(j)
+                    break
+            else:
+                if len(chosen) == 1:
+                    dead_run = run_end
+                break
+        if len(chosen) < len(rule):
+            continue
+        captures = {}
+        for k, element in enumerate(rule):
+            if element.capture:
+                start = occurrences[chosen[k]].end
+                end = runs[start] if k + 1 == len(rule) else occurrences[chosen[k + 1]].start
+                captures[element.capture] = text[start:end].strip()
+        return captures
+    return None
@@ -0,0 +1,67 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one in-flight upstream call.
+
+    Callers that arrive while a call is running await the same task and share its result
+    (or exception). A cancelled caller only detaches; the upstream call is cancelled when
+    the last waiter leaves, and the key is freed at once. Once the call finishes the key is free again.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(functools.partial(self._forget, key, call))
+
+        call.waiters += 1
+        try:
+            # shield: one waiter being cancelled must not cancel the call for everyone else
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Free the key before cancelling so a caller arriving meanwhile starts a fresh call
+                # instead of attaching to one that is being torn down
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call, task: asyncio.Task) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unawaited failure isn't logged as "never retrieved"
+
+
+_default = SingleFlight()
+
+
+def coalesce(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Decorator: concurrent calls to an async function with the same arguments share one run.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+        return await _default.do(key, lambda: func(*args, **kwargs))
+    return wrapper
@@ -0,0 +1,109 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Words that appear in many place names and say nothing about which stop is meant
+GENERIC_TOKENS = frozenset({
+    "the", "of", "at", "a", "an", "hall", "street", "st", "avenue", "ave", "road", "rd", "drive", "dr",
+    "blvd", "boulevard", "ln", "way", "center", "student", "blacksburg", "va", "virginia",
+})
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Match rules, in precedence order
+RULE_EXACT = "exact"
+RULE_NAME_IN_QUERY = "name_in_query"
+RULE_QUERY_IN_NAME = "query_in_name"
+RULE_ALIAS = "alias"
+RULE_TOKEN_OVERLAP = "token_overlap"
+
+
+def tokenize(text: str) -> Tuple[str, ...]:
+    """Lowercase, fold punctuation to spaces and split."""
+    return tuple(_NON_WORD.sub(" ", text.lower()).split())
+
+
+class StopMatcher:
+    """
+    Resolves free-text locations to stop ids, compiled once from the stop table.
+
+    Precedence is fixed: an exact stop name, then the longest stop name contained in the text,
+    then a stop whose name contains the text, then aliases, then the most shared distinctive
+    words. Ties go to the stop (or alias) declared first.
+    """
+
+    def __init__(self, stops: Dict[str, Dict[str, Any]], aliases: Dict[str, str]):
+        self._exact: Dict[Tuple[str, ...], str] = {}
+        # first token -> [(phrase tokens, stop_id, declaration order)] for stop names and aliases
+        self._names: Dict[str, List[Tuple[Tuple[str, ...], str, int]]] = {}
+        self._aliases: Dict[str, List[Tuple[Tuple[str, ...], str, int]]] = {}
+        # token -> [(stop_id, position of the token in the stop name, declaration order)]
+        self._token_stops: Dict[str, List[Tuple[str, int, int]]] = {}
+        self._name_tokens: Dict[str, Tuple[str, ...]] = {}
+        self._order: Dict[str, int] = {}
+
+        for order, (stop_id, info) in enumerate(stops.items()):
+            tokens = tokenize(info["name"])
+            self._name_tokens[stop_id] = tokens
+            self._order[stop_id] = order
+            self._exact.setdefault(tokens, stop_id)
+            self._names.setdefault(tokens[0], []).append((tokens, stop_id, order))
+            for position, token in enumerate(tokens):
+                self._token_stops.setdefault(token, []).append((stop_id, position, order))
+
+        for order, (alias, stop_id) in enumerate(aliases.items()):
+            tokens = tokenize(alias)
+            self._aliases.setdefault(tokens[0], []).append((tokens, stop_id, order))
+
+    @staticmethod
+    def _phrase_hits(tokens: Tuple[str, ...], index: Dict[str, List[Tuple[Tuple[str, ...], str, int]]]):
+        """Every indexed phrase occurring as a run of whole words in tokens."""
+        for start, token in enumerate(tokens):
+            for phrase, stop_id, order in index.get(token, ()):
+                if tokens[start:start + len(phrase)] == phrase:
+                    yield phrase, stop_id, order
+
+    def match(self, location: str) -> Optional[Tuple[str, str]]:
+        """
+        Resolve a location to (stop_id, rule), or None if nothing matches.
+        """
+        tokens = tokenize(location or "")
+        if not tokens:
+            return None
+
+        stop_id = self._exact.get(tokens)
+        if stop_id:
+            return stop_id, RULE_EXACT
+
+        # Longest stop name appearing in the text
+        hits = list(self._phrase_hits(tokens, self._names))
+        if hits:
+            phrase, stop_id, _ = min(hits, key=lambda hit: (-len(hit[0]), hit[2]))
+            return stop_id, RULE_NAME_IN_QUERY
+
+        distinctive = [token for token in tokens if token not in GENERIC_TOKENS]
+        if not distinctive:
+            return None
+
+        # The text is a run of words inside a stop name, e.g. "mccomas" or "d2 dining"
+        best = None
+        for stop_id, position, order in self._token_stops.get(tokens[0], ()):
+            if self._name_tokens[stop_id][position:position + len(tokens)] == tokens:
+                if best is None or order < best[1]:
+                    best = (stop_id, order)
+        if best:
+            return best[0], RULE_QUERY_IN_NAME
+
+        hits = list(self._phrase_hits(tokens, self._aliases))
+        if hits:
+            return min(hits, key=lambda hit: hit[2])[1], RULE_ALIAS
+
+        # Most distinctive words in common
+        shared: Dict[str, List[int]] = {}
+        for token in set(distinctive):
+            for stop_id in {stop_id for stop_id, _, _ in self._token_stops.get(token, ())}:
+                shared.setdefault(stop_id, [0, self._order[stop_id]])[0] += 1
+        if shared:
+            stop_id = min(shared, key=lambda s: (-shared[s][0], shared[s][1]))
+            return stop_id, RULE_TOKEN_OVERLAP
+
+        return None
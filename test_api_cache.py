@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+from datetime import datetime
+
+# Keep the test cache out of the working tree
+os.environ["GEOCODE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "geocode.sqlite3")
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services import google_maps
+from services.cache import SQLiteCache
+
+class FakeClient:
+    """Stands in for googlemaps.Client and counts upstream calls"""
+
+    def __init__(self):
+        self.geocodes = 0
+        self.directions_calls = 0
+
+    def geocode(self, name, region=None):
+        self.geocodes += 1
+        if "nowhere" in name.lower():
+            return []
+        return [{"geometry": {"location": {"lat": 37.2296, "lng": -80.4236}},
+                 "formatted_address": f"{name}, Blacksburg, VA", "place_id": "test"}]
+
+    def directions(self, **kwargs):
+        self.directions_calls += 1
+        return [{"summary": "", "legs": [{"duration": {"text": "6 mins"}, "steps": [
+            {"travel_mode": "WALKING", "duration": {"text": "6 mins"}, "distance": {"text": "0.3 mi"},
+             "html_instructions": "Walk to Goodwin Hall"}]}]}]
+
+def test_api_cache():
+    """Test the geocode and directions caches"""
+
+    print("🧪 Testing Google Maps Caches\n")
+    print("=" * 60)
+
+    client = FakeClient()
+    google_maps._client = client
+    when = datetime(2025, 1, 15, 10, 1)
+
+    google_maps.geocode_place("Goodwin Hall")
+    google_maps.geocode_place("  goodwin hall, ")
+    google_maps.geocode_place("Nowhere Special")
+    missing = google_maps.geocode_place("nowhere special")
+    google_maps._geocode_memory.clear()
+    google_maps.geocode_place("GOODWIN HALL")
+    on_disk = SQLiteCache(os.environ["GEOCODE_CACHE_PATH"], table="geocode").get("goodwin hall")
+
+    lavery, goodwin = (37.23021, -80.42221), (37.23211, -80.42591)
+    first = google_maps.directions_transit(lavery, goodwin, when)
+    first["steps"].clear()
+    google_maps.directions_transit((37.23019, -80.42219), goodwin, when.replace(minute=3))
+    google_maps.directions_transit(lavery, goodwin, when.replace(minute=6))
+
+    checks = [
+        ("Normalized names share one lookup", client.geocodes == 2, client.geocodes),
+        ("Misses are cached", missing is None, missing),
+        ("Results survive in SQLite", bool(on_disk), on_disk),
+        ("Same 5-minute bucket reuses the plan", client.directions_calls == 2, client.directions_calls),
+        ("Cached plans can't be mutated by callers",
+         bool(google_maps.directions_transit(lavery, goodwin, when)["steps"]), None),
+        ("Counters", google_maps.directions_cache_stats()["hits"] == 2, google_maps.directions_cache_stats()),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_api_cache()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+from datetime import datetime
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from fastapi.testclient import TestClient
+
+import main
+from scrapers import bus
+
+class WeekdayMorning(datetime):
+    """Pins "now" to a time when buses run"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 1, 15, 10, 1)
+
+def test_batch_etas():
+    """Test POST /bus/eta/batch"""
+
+    print("🧪 Testing Batch ETAs\n")
+    print("=" * 60)
+
+    bus.datetime = WeekdayMorning
+    client = TestClient(main.app)
+
+    mixed = client.post("/bus/eta/batch", json={"stops": ["squires", "Goodwin Hall", "squires"]})
+    results = mixed.json()["results"]
+    filtered = client.post("/bus/eta/batch", json={"stops": ["squires"], "routes": ["cas", "HDG"]}).json()["results"][0]
+    unknown = client.post("/bus/eta/batch", json={"stops": ["Roanoke Airport"]}).json()["results"][0]
+    at_limit = client.post("/bus/eta/batch", json={"stops": ["squires"] * 50})
+    over_limit = client.post("/bus/eta/batch", json={"stops": ["squires"] * 51})
+    empty = client.post("/bus/eta/batch", json={"stops": []})
+
+    board = bus.departure_board()
+    expected_cas = [d.isoformat(timespec="minutes") for d in board["departures"][("squires", "CAS")]]
+    cas = next(arrival for arrival in results[0]["arrivals"] if arrival["route_id"] == "CAS")
+
+    checks = [
+        ("Mixed stop ids and place names", mixed.status_code == 200 and [(r["stop_id"], r["match"]) for r in results]
+         == [("squires", "stop_id"), ("goodwin_hall", "exact"), ("squires", "stop_id")],
+         [(r["query"], r["stop_id"], r["match"]) for r in results]),
+        ("Arrivals read from the board", cas["departures"] == expected_cas and cas["operating"], cas),
+        ("Duplicates answered alike", results[0]["arrivals"] == results[2]["arrivals"], len(results)),
+        ("Route filter", [a["route_id"] for a in filtered["arrivals"]] == ["CAS", "HDG"],
+         [a["route_id"] for a in filtered["arrivals"]]),
+        ("Unknown stop falls back to the default stop", unknown["stop_id"] == bus.DEFAULT_STOP and unknown["match"] == "default",
+         unknown["match"]),
+        ("50 stops accepted", at_limit.status_code == 200 and len(at_limit.json()["results"]) == 50, at_limit.status_code),
+        ("51 stops rejected", over_limit.status_code == 422, over_limit.status_code),
+        ("Empty list rejected", empty.status_code == 422, empty.status_code),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_batch_etas()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+import main
+from services.broadcast import LiveBusBroadcaster
+
+class FakeRequest:
+    """Starlette request that disconnects after `polls` checks"""
+
+    def __init__(self, polls):
+        self.polls = polls
+
+    async def is_disconnected(self):
+        self.polls -= 1
+        return self.polls < 0
+
+def make_producer(calls):
+    async def produce():
+        calls.append(1)
+        tick = len(calls)
+        return {"timestamp": tick,
+                "buses": {"CAS": {"eta": tick}, "HDG": {"eta": 5}},
+                "alerts": [{"text": "HDG detour", "routes_affected": ["HDG"]}, {"text": "Snow", "routes_affected": []}]}
+    return produce
+
+async def run_stream():
+    results = {}
+    calls = []
+    stream = LiveBusBroadcaster(make_producer(calls), interval=0.02)
+
+    everything = [stream.subscribe(), stream.subscribe()]
+    cas_only = stream.subscribe(frozenset({"CAS"}))
+    results["one_producer"] = stream._task is not None
+    first = [json.loads(await s.next(1)) for s in everything + [cas_only]]
+    results["fan_out"] = first[0] == first[1] and set(first[0]["buses"]) == {"CAS", "HDG"}
+    results["filter"] = (set(first[2]["buses"]), [a["text"] for a in first[2]["alerts"]])
+    second = json.loads(await cas_only.next(1))
+    results["updates"] = second["buses"]["CAS"]["eta"] > first[2]["buses"]["CAS"]["eta"]
+
+    # Unchanged content (only the timestamp moved) isn't sent again
+    hdg_only = stream.subscribe(frozenset({"HDG"}))
+    await hdg_only.next(1)
+    results["unchanged_skipped"] = await hdg_only.next(0.1) is None
+
+    for subscription in everything + [hdg_only]:
+        stream.unsubscribe(subscription)
+    results["still_running"] = stream._task is not None
+    results["filters_pruned"] = (set(stream._last) == {frozenset({"CAS"})}, set(stream._last_content) == set(stream._last))
+    stream.unsubscribe(cas_only)
+    stopped_at = len(calls)
+    await asyncio.sleep(0.08)
+    results["producer_stopped"] = (stream._task is None, len(calls) == stopped_at, stream.stats()["subscribers"])
+
+    # /bus/stream: SSE frames for a route filter, and unsubscribe once the client disconnects
+    main.live_bus_stream = LiveBusBroadcaster(make_producer([]), interval=0.02)
+    response = await main.bus_stream(FakeRequest(polls=2), routes="cas")
+    frames = [frame async for frame in response.body_iterator]
+    payload = json.loads(frames[0].split("data: ", 1)[1])
+    results["endpoint"] = (frames[0].startswith("event: bus"), set(payload["buses"]), len(frames))
+    results["endpoint_unsubscribed"] = (main.live_bus_stream.stats()["subscribers"], main.live_bus_stream._task)
+    return results
+
+def test_bus_stream():
+    """Test live bus fan-out, route filters and producer lifetime"""
+
+    print("🧪 Testing Live Bus Stream\n")
+    print("=" * 60)
+
+    results = asyncio.run(run_stream())
+
+    checks = [
+        ("Producer starts with the first subscriber", results["one_producer"], results["one_producer"]),
+        ("Every subscriber gets the update", results["fan_out"], results["fan_out"]),
+        ("Route filter", results["filter"] == ({"CAS"}, ["Snow"]), results["filter"]),
+        ("Changed updates are sent", results["updates"], results["updates"]),
+        ("Unchanged updates are skipped", results["unchanged_skipped"], results["unchanged_skipped"]),
+        ("Producer runs while anyone listens", results["still_running"], results["still_running"]),
+        ("Unused filters are forgotten", results["filters_pruned"] == (True, True), results["filters_pruned"]),
+        ("Producer stops with the last subscriber", results["producer_stopped"] == (True, True, 0),
+         results["producer_stopped"]),
+        ("SSE endpoint filters routes", results["endpoint"] == (True, {"CAS"}, 2), results["endpoint"]),
+        ("Disconnect unsubscribes", results["endpoint_unsubscribed"] == (0, None), results["endpoint_unsubscribed"]),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_bus_stream()
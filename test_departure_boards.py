@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timedelta
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.departure_boards import MinuteBoards
+from scrapers.bus import BUS_ROUTES, TIMETABLE, build_departure_board
+
+def test_departure_boards():
+    """Test per-minute board rebuilds and board contents against the timetable"""
+
+    print("🧪 Testing Departure Boards\n")
+    print("=" * 60)
+
+    built = []
+    boards = MinuteBoards(lambda minute: built.append(minute) or {"minute": minute})
+    start = datetime(2025, 1, 15, 10, 1, 5)
+    first = boards.current(start)
+    same_minute = boards.current(start + timedelta(seconds=40))
+    next_minute = boards.current(start + timedelta(seconds=60))
+
+    # Every (stop, route) on the board matches a direct timetable query at that minute
+    mismatches = []
+    for now in (datetime(2025, 1, 15, 10, 1), datetime(2025, 1, 18, 22, 59), datetime(2025, 1, 15, 3, 0)):
+        board = build_departure_board(now)
+        for (stop_id, route_id), departures in board["departures"].items():
+            expected = TIMETABLE.next_departures(stop_id, route_id, now, 2) if TIMETABLE.is_operating(route_id, now) else []
+            if departures != expected:
+                mismatches.append((now, stop_id, route_id, departures, expected))
+    covered = len(board["departures"]) == sum(len(dict.fromkeys(info["stops"])) for info in BUS_ROUTES.values())
+    night = build_departure_board(datetime(2025, 1, 15, 3, 0))
+    morning = build_departure_board(datetime(2025, 1, 15, 10, 1))
+
+    checks = [
+        ("Built once per minute", len(built) == 2 and first is same_minute, built),
+        ("Rebuilt in the next minute", next_minute["minute"] == datetime(2025, 1, 15, 10, 2), next_minute),
+        ("Build counter", boards.builds == 2, boards.builds),
+        ("Board matches the timetable", not mismatches, mismatches[:3]),
+        ("Departures in service hours", sum(bool(d) for d in morning["departures"].values()) > 0,
+         sum(bool(d) for d in morning["departures"].values())),
+        ("Every stop and route on the board", covered, len(board["departures"])),
+        ("Nothing operating at 3 AM", not any(night["departures"].values()) and "Not operating" in night["summary_text"],
+         night["summary_text"].splitlines()[-1]),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_departure_boards()
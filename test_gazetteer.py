@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.gazetteer import Gazetteer
+from nlu import PLACE_GAZETTEER, simple_parse
+
+def test_gazetteer():
+    """Test the place-name automaton and span-based origin/destination assignment"""
+
+    print("🧪 Testing Place Gazetteer\n")
+    print("=" * 60)
+
+    gazetteer = Gazetteer({"lee": "lee hall", "lee hall": "lee hall", "hall": "any hall", "he": "he", "hers": "hers"})
+    found = [(m.start, m.end, m.phrase) for m in gazetteer.find("to Lee Hall, fleet hers")]
+    longest = [m.phrase for m in gazetteer.longest("to lee hall")]
+
+    # One automaton over many phrases finds the same places as a small one
+    many = Gazetteer({**{f"building {n}": f"b{n}" for n in range(5000)}, "lane": "lane stadium"})
+    spans = [(m.phrase, m.name) for m in many.longest("from building 4999 to lane")]
+
+    places = [m.name for m in PLACE_GAZETTEER.longest("from west eggleston to the hokie grill via the lane")]
+    swapped = simple_parse("bus to Goodwin Hall from Squires")
+    inside_word = simple_parse("is the fleet planned")
+
+    checks = [
+        ("Overlapping phrases all found", found == [(3, 11, "lee hall"), (3, 6, "lee"), (7, 11, "hall"), (19, 23, "hers")], found),
+        ("Only whole words", all(phrase != "he" for _, _, phrase in found), found),
+        ("Longest non-overlapping", longest == ["lee hall"], longest),
+        ("Large gazetteer", spans == [("building 4999", "b4999"), ("lane", "lane stadium")], spans),
+        ("Campus places and keywords", places == ["west eggleston", "hokie grill", "lane stadium"], places),
+        ("'to' and 'from' decide roles", swapped["destination"].startswith("635 Prices Fork") and swapped["origin"].startswith("Squires"), swapped),
+        ("No match inside words", inside_word["destination"] is None, inside_word),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_gazetteer()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.gtfs import compile_feed, load_network
+from services.journey_planner import JourneyPlanner
+from services.transit_network import TransitNetwork
+
+def write_feed(path, trips_per_route=60):
+    """Small two-route feed: RED a→b→c every 15 min, BLU c→d every 20 min, weekdays only"""
+    stop_times = ["trip_id,arrival_time,departure_time,stop_id,stop_sequence"]
+    trips = ["route_id,service_id,trip_id"]
+    for n in range(trips_per_route):
+        start = 6 * 3600 + n * 15 * 60
+        trips.append(f"r1,WK,red{n}")
+        for seq, (stop, offset) in enumerate([("a", 0), ("b", 180), ("c", 420)]):
+            t = start + offset
+            # b is not a timepoint; its time is interpolated
+            clock = "" if stop == "b" else f"{t // 3600}:{t // 60 % 60:02d}:00"
+            stop_times.append(f"red{n},{clock},{clock},{stop},{seq + 1}")
+        start = 6 * 3600 + n * 20 * 60
+        trips.append(f"r2,WK,blu{n}")
+        for seq, (stop, offset) in enumerate([("c", 0), ("d", 300)]):
+            t = start + offset
+            stop_times.append(f"blu{n},{t // 3600}:{t // 60 % 60:02d}:00,{t // 3600}:{t // 60 % 60:02d}:00,{stop},{seq + 1}")
+
+    files = {
+        "stops.txt": "stop_id,stop_name,stop_lat,stop_lon,location_type\n"
+                     "a,Alpha Hall,37.2300,-80.4200,0\nb,Beta Street,37.2310,-80.4210,0\n"
+                     "c,Gamma Center,37.2320,-80.4220,0\nd,Delta Drive,37.2330,-80.4230,0\nst,Station,37.23,-80.42,1\n",
+        "routes.txt": "route_id,route_short_name,route_long_name,route_desc\n"
+                      "r1,red,Red Line,Alpha to Gamma\nr2,blu,Blue Line,\n",
+        "calendar.txt": "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date\n"
+                        "WK,1,1,1,1,1,0,0,20250101,20251231\n",
+        "trips.txt": "\n".join(trips) + "\n",
+        "stop_times.txt": "\n".join(stop_times) + "\n",
+    }
+    with zipfile.ZipFile(path, "w") as z:
+        for name, text in files.items():
+            z.writestr(name, text)
+
+def write_two_way_feed(path):
+    """One route, GRN: outbound a→b→c→d and an inbound short-cut d→b→a"""
+    stop_times = ["trip_id,arrival_time,departure_time,stop_id,stop_sequence"]
+    for trip_id, stops in (("out", "abcd"), ("in", "dba")):
+        for seq, stop in enumerate(stops):
+            stop_times.append(f"{trip_id},8:{seq * 5:02d}:00,8:{seq * 5:02d}:00,{stop},{seq + 1}")
+    files = {
+        "stops.txt": "stop_id,stop_name,stop_lat,stop_lon\n"
+                     "a,Alpha Hall,37.2300,-80.4200\nb,Beta Street,37.2310,-80.4210\n"
+                     "c,Gamma Center,37.2320,-80.4220\nd,Delta Drive,37.2330,-80.4230\n",
+        "routes.txt": "route_id,route_short_name,route_long_name\ng1,grn,Green Line\n",
+        "calendar.txt": "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date\n"
+                        "WK,1,1,1,1,1,0,0,20250101,20251231\n",
+        "trips.txt": "route_id,service_id,trip_id\ng1,WK,out\ng1,WK,in\n",
+        "stop_times.txt": "\n".join(stop_times) + "\n",
+    }
+    with zipfile.ZipFile(path, "w") as z:
+        for name, text in files.items():
+            z.writestr(name, text)
+
+def test_gtfs():
+    """Test GTFS compilation and the memory-mapped network"""
+
+    print("🧪 Testing GTFS Network Store\n")
+    print("=" * 60)
+
+    workdir = tempfile.mkdtemp()
+    feed_path = os.path.join(workdir, "feed.zip")
+    network_path = os.path.join(workdir, "network.bin")
+    write_feed(feed_path)
+    counts = compile_feed(feed_path, network_path)
+
+    start = time.perf_counter()
+    network = load_network(network_path)
+    load_ms = (time.perf_counter() - start) * 1000
+    timetable = network.timetable
+    when = datetime(2025, 1, 15, 10, 1)  # Wednesday
+
+    nexts = [d.strftime("%H:%M") for d in timetable.next_departures("b", "RED", when, count=2)]
+    saturday = timetable.next_departures("a", "RED", datetime(2025, 1, 18, 10, 1))
+    plan = JourneyPlanner(timetable, {}).plan({"a": 0}, {"d": 0}, when)
+    legs = [(leg["route_id"], leg["from_stop"], leg["to_stop"]) for leg in plan["legs"]] if plan else None
+
+    two_way_path = os.path.join(workdir, "two_way.zip")
+    write_two_way_feed(two_way_path)
+    compile_feed(two_way_path, network_path + ".grn")
+    two_way = load_network(network_path + ".grn")
+    index = TransitNetwork(two_way.stops, two_way.routes)
+    rides = [index.stops_between("GRN", origin, dest) for origin, dest in (("a", "c"), ("d", "b"), ("b", "a"), ("c", "a"))]
+
+    checks = [
+        ("Counts", counts == {"stops": 4, "routes": 2, "patterns": 2, "trips": 120, "stop_times": 300}, counts),
+        ("Stations are skipped", "st" not in network.stops, list(network.stops)),
+        ("Routes keyed by short name", sorted(network.routes) == ["BLU", "RED"], sorted(network.routes)),
+        ("Route summary", network.routes["RED"]["frequency"] == 15 and network.routes["RED"]["stops"] == ["a", "b", "c"],
+         network.routes["RED"]),
+        ("Interpolated stop times", nexts == ["10:03", "10:18"], nexts),
+        ("Calendar respected", saturday == [], saturday),
+        ("Last stop is arrival-only", ("c", "RED", "WK") not in timetable.boards, None),
+        ("Arrays are file-backed", isinstance(timetable.stop_times, memoryview), type(timetable.stop_times).__name__),
+        ("Planner on the compiled network", legs == [("RED", "a", "c"), ("BLU", "c", "d")], legs),
+        ("Service hours", timetable.service_hours_text("RED", when.date()) == "6:00 AM - 8:48 PM",
+         timetable.service_hours_text("RED", when.date())),
+        ("Stops counted along each direction", rides == [2, 1, 1, None], rides),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+    print(f"\n⏱️ Loaded in {load_ms:.2f} ms")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_gtfs()
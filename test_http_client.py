@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+import httpx
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services import http_client
+
+async def run_http_client():
+    results = {}
+    hits = {"flaky": 0, "missing": 0, "down": 0}
+    active = {"now": 0, "peak": 0}
+
+    async def handler(request):
+        path = request.url.path
+        if path == "/flaky":
+            hits["flaky"] += 1
+            return httpx.Response(503 if hits["flaky"] < 3 else 200, text="ok")
+        if path == "/missing":
+            hits["missing"] += 1
+            return httpx.Response(404)
+        if path == "/down":
+            hits["down"] += 1
+            raise httpx.ConnectError("refused", request=request)
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return httpx.Response(200, text=path)
+
+    http_client.BACKOFF_SECONDS = 0.001
+    http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    http_client._client_loop = asyncio.get_running_loop()
+    http_client._host_limits.clear()
+
+    results["retried"] = ((await http_client.fetch("http://site.test/flaky")).text, hits["flaky"])
+    try:
+        await http_client.fetch("http://site.test/missing")
+        results["not_retried"] = "no error"
+    except httpx.HTTPStatusError as e:
+        results["not_retried"] = (e.response.status_code, hits["missing"])
+    try:
+        await http_client.fetch("http://site.test/down", retries=1)
+        results["gave_up"] = "no error"
+    except httpx.TransportError:
+        results["gave_up"] = hits["down"]
+
+    await asyncio.gather(*(http_client.fetch(f"http://busy.test/page{i}") for i in range(12)))
+    results["per_host_peak"] = active["peak"]
+    active["peak"] = 0
+    await asyncio.gather(*(http_client.fetch(f"http://host{i % 3}.test/page") for i in range(12)))
+    results["across_hosts_peak"] = active["peak"]
+
+    posted = await http_client.post_json("http://api.test/echo", {"q": 1})
+    results["post"] = posted.status_code
+    results["shared_pool"] = http_client.get_client() is http_client._client
+    await http_client.aclose()
+    results["closed"] = http_client._client is None
+    return results
+
+def test_http_client():
+    """Test retries and per-host limits of the shared HTTP pool"""
+
+    print("🧪 Testing HTTP Client\n")
+    print("=" * 60)
+
+    results = asyncio.run(run_http_client())
+
+    checks = [
+        ("Retryable status retried", results["retried"] == ("ok", 3), results["retried"]),
+        ("Client errors not retried", results["not_retried"] == (404, 1), results["not_retried"]),
+        ("Transport errors give up after retries", results["gave_up"] == 2, results["gave_up"]),
+        ("Per-host concurrency limit", results["per_host_peak"] == http_client.PER_HOST_CONCURRENCY,
+         results["per_host_peak"]),
+        ("Hosts are limited separately", results["across_hosts_peak"] > http_client.PER_HOST_CONCURRENCY,
+         results["across_hosts_peak"]),
+        ("POST through the pool", results["post"] == 200 and results["shared_pool"], results["post"]),
+        ("aclose drops the pool", results["closed"], results["closed"]),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_http_client()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+from datetime import datetime
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.timetable import Timetable
+from services.journey_planner import JourneyPlanner
+from scrapers.bus import get_bus_schedule_for_route, plan_local_journey
+
+def describe(itinerary):
+    if not itinerary:
+        return None
+    return [(leg["mode"], leg.get("route_id"), leg["from_stop"], leg["to_stop"]) for leg in itinerary["legs"]]
+
+def test_journey_planner():
+    """Test the local RAPTOR planner on a small network"""
+
+    print("🧪 Testing Local Journey Planner\n")
+    print("=" * 60)
+
+    routes = {
+        "RED": {"stops": ["a", "b", "c"], "frequency": 10, "operating_hours": {"start": 6, "end": 22}},
+        "BLU": {"stops": ["c", "d", "e"], "frequency": 15, "operating_hours": {"start": 6, "end": 22}},
+        "GRN": {"stops": ["f", "g"], "frequency": 30, "operating_hours": {"start": 6, "end": 22}},
+    }
+    footpaths = {"e": [("f", 300)], "f": [("e", 300)], "a": [("x", 60)], "x": [("a", 60), ("y", 120)], "y": [("x", 120)]}
+    planner = JourneyPlanner(Timetable.from_routes(routes), footpaths)
+    when = datetime(2025, 1, 15, 10, 1)  # Wednesday
+    # Squires -> Hethwood at 02:00 is a walk via Lavery, not a four-hour wait for the first bus
+    bus_night = plan_local_journey("squires", "hethwood", datetime(2025, 1, 15, 2, 0))
+    same_stop = asyncio.run(get_bus_schedule_for_route("Squires", "Squires Student Center"))
+
+    checks = [
+        ("Direct ride", describe(planner.plan({"a": 0}, {"c": 0}, when)),
+         [("TRANSIT", "RED", "a", "c")]),
+        ("Transfer at c", describe(planner.plan({"a": 0}, {"e": 0}, when)),
+         [("TRANSIT", "RED", "a", "c"), ("TRANSIT", "BLU", "c", "e")]),
+        ("Walking transfer", describe(planner.plan({"a": 0}, {"g": 0}, when)),
+         [("TRANSIT", "RED", "a", "c"), ("TRANSIT", "BLU", "c", "e"), ("WALKING", None, "e", "f"),
+          ("TRANSIT", "GRN", "f", "g")]),
+        ("Walk beats the bus", describe(planner.plan({"x": 0}, {"a": 0}, when)),
+         [("WALKING", None, "x", "a")]),
+        ("Chained walks at night", describe(planner.plan({"a": 0}, {"y": 0}, datetime(2025, 1, 15, 2, 0))),
+         [("WALKING", None, "a", "y")]),
+        ("Chained walk time", planner.arrivals({"a": 0}, datetime(2025, 1, 15, 2, 0)).get("y"), 180),
+        ("Night walk on the BT network", describe(bus_night), [("WALKING", None, "squires", "hethwood")]),
+        ("Already at the destination stop", same_stop, "📍 You're already at Squires Student Center; no bus needed."),
+        ("Round limit", describe(planner.plan({"a": 0}, {"g": 0}, when, max_rounds=2)), None),
+        ("After service ends", describe(planner.plan({"a": 0}, {"c": 0}, datetime(2025, 1, 15, 23, 0))), None),
+    ]
+
+    for i, (name, got, expected) in enumerate(checks, 1):
+        status = "✅" if got == expected else "❌"
+        print(f"{i}. {status} {name}: {got}")
+
+    assert all(got == expected for _, got, expected in checks)
+
+    start = time.perf_counter()
+    for _ in range(100):
+        planner.plan({"a": 0}, {"g": 0}, when)
+    print(f"\n⏱️ {(time.perf_counter() - start) * 10:.2f} ms per plan")
+
+if __name__ == "__main__":
+    test_journey_planner()
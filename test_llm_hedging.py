@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import os
+
+import httpx
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+import nlu
+from services import http_client
+
+def fake_nim(request):
+    """NVIDIA NIM chat endpoint answering with a fixed parse"""
+    content = json.dumps({"intent": "transit_route", "origin": "squires", "destination": "goodwin hall"})
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+async def model_answer(query):
+    return {"intent": "transit_route", "origin": None, "destination": "Model Place", "bus_route": None}
+
+async def slow_model(query):
+    await asyncio.sleep(0.2)
+    return await model_answer(query)
+
+async def broken_model(query):
+    raise RuntimeError("model unavailable")
+
+async def slow_broken_model(query):
+    await asyncio.sleep(0.2)
+    await broken_model(query)
+
+def reset_parse_state():
+    """Start from an empty parse cache and zeroed tier counters, whatever ran before"""
+    nlu._parse_cache.clear()
+    for tier in nlu._tier_counts:
+        nlu._tier_counts[tier] = 0
+
+async def run_hedging():
+    nlu.NLU_LLM_PARSER = "test"
+    nlu.LLM_LATENCY_BUDGET_SECONDS = 0.05
+    reset_parse_state()
+    results = {}
+
+    nlu._LLM_REQUESTS["test"] = broken_model
+    results["confident"] = await nlu.parse_transit_query_async("fastest route from Squires to Goodwin Hall")
+    results["failed"] = await nlu.parse_transit_query_async("when is next CAS bus")
+
+    nlu._LLM_REQUESTS["test"] = model_answer
+    results["model"] = await nlu.parse_transit_query_async("how do I get to the duck pond")
+
+    nlu._LLM_REQUESTS["test"] = slow_model
+    results["late"] = await nlu.parse_transit_query_async("where does the bus go")
+    await asyncio.sleep(0.3)
+    results["late_answer_cached"] = await nlu.parse_transit_query_async("Where does the bus go?")
+
+    # A model call that fails after the deadline is counted once, as late
+    nlu._LLM_REQUESTS["test"] = slow_broken_model
+    results["late_failure"] = await nlu.parse_transit_query_async("which bus goes downtown")
+    await asyncio.sleep(0.3)
+    results["late_failure_counts"] = nlu.parse_tier_stats()
+
+    # A cancelled query leaves its model call running, and the answer still lands in the cache
+    nlu._LLM_REQUESTS["test"] = slow_model
+    query = asyncio.ensure_future(nlu.parse_transit_query_async("where is the bus going"))
+    await asyncio.sleep(0.01)
+    query.cancel()
+    results["in_flight_after_cancel"] = nlu.parse_tier_stats()["llm_in_flight"]
+    await asyncio.sleep(0.3)
+    results["cancelled_answer_cached"] = await nlu.parse_transit_query_async("where is the bus going")
+
+    # The async NIM parser goes through the shared pool
+    os.environ["NVIDIA_NIM_ENDPOINT"] = "http://nim.test"
+    os.environ["NVIDIA_NIM_API_KEY"] = "test"
+    http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(fake_nim))
+    http_client._client_loop = asyncio.get_running_loop()
+    results["nim"] = await nlu.nvidia_nim_parse_async("from squires to goodwin hall")
+    del os.environ["NVIDIA_NIM_ENDPOINT"], os.environ["NVIDIA_NIM_API_KEY"]
+    results["nim_unconfigured"] = await nlu.nvidia_nim_parse_async("next bus to squires")
+    await http_client.aclose()
+
+    # The sync parser doesn't need an event loop of its own, so it works inside one
+    results["sync_in_loop"] = nlu.parse_transit_query("when is the next CAS bus coming")
+    return results
+
+def test_llm_hedging():
+    """Test async LLM parsing hedged by the rule parser"""
+
+    print("🧪 Testing LLM Hedging\n")
+    print("=" * 60)
+
+    results = asyncio.run(run_hedging())
+    stats = nlu.parse_tier_stats()
+
+    checks = [
+        ("Confident rules skip the model", results["confident"]["destination"] == nlu.CAMPUS_PLACES["goodwin hall"],
+         results["confident"]),
+        ("Model failure returns rules", results["failed"]["intent"] == "generic", results["failed"]),
+        ("Model answers in time", results["model"]["destination"] == "Model Place" and results["model"]["tier"] == "llm",
+         results["model"]),
+        ("Deadline returns rules", results["late"]["tier"] == "rules" and "llm_late" in results["late"]["evidence"]["flags"], results["late"]),
+        ("Late answer serves the next query", results["late_answer_cached"]["destination"] == "Model Place",
+         results["late_answer_cached"]),
+        ("Async NIM parse", results["nim"]["destination"] == nlu.CAMPUS_PLACES["goodwin hall"], results["nim"]),
+        ("Unconfigured NIM falls back", results["nim_unconfigured"]["intent"] == "next_bus", results["nim_unconfigured"]),
+        ("Late failure counted once", (results["late_failure_counts"]["llm_late"], results["late_failure_counts"]["llm_failed"])
+         == (2, 1), results["late_failure_counts"]),
+        ("Cancelled query keeps its model call", results["in_flight_after_cancel"] == 1, results["in_flight_after_cancel"]),
+        ("Cancelled query's answer is cached", results["cancelled_answer_cached"]["destination"] == "Model Place",
+         results["cancelled_answer_cached"]),
+        ("Sync parse inside an event loop", results["sync_in_loop"]["bus_route"] == "CAS", results["sync_in_loop"]),
+        ("Counters", (stats["rules"], stats["llm"], stats["llm_late"], stats["llm_failed"], stats["llm_in_flight"])
+         == (2, 1, 2, 1, 0), stats),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_llm_hedging()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+# Keep the test cache out of the working tree
+os.environ["GEOCODE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "geocode.sqlite3")
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from googlemaps.exceptions import ApiError, TransportError
+from services import google_maps
+from services.circuit_breaker import CircuitBreaker
+from scrapers import bus
+
+class WeekdayMorning(datetime):
+    """Pins "now" to a time when buses run"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 1, 15, 10, 1)
+
+class DownClient:
+    """googlemaps.Client during an outage"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def geocode(self, name, region=None):
+        self.calls += 1
+        raise TransportError("connection reset")
+
+    def directions(self, **kwargs):
+        self.calls += 1
+        raise TransportError("connection reset")
+
+class BadRequestClient:
+    """googlemaps.Client answering a malformed request (Google itself is fine)"""
+
+    def geocode(self, name, region=None):
+        raise ApiError("INVALID_REQUEST")
+
+def test_offline():
+    """Test the circuit breaker and local planning when Google Maps is down"""
+
+    print("🧪 Testing Offline Planning\n")
+    print("=" * 60)
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    still_closed = breaker.allow()
+    breaker.record_failure()
+    opened = breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+    time.sleep(0.06)
+    trial, second_trial = breaker.allow(), breaker.allow()
+    breaker.record_success()
+    reclosed = breaker.state == CircuitBreaker.CLOSED
+
+    bus.datetime = WeekdayMorning
+    client = DownClient()
+    google_maps._client = client
+    google_maps._breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+
+    during_outage = asyncio.run(bus.plan_quickest_route("Squires", "Goodwin Hall"))
+    calls_when_opened = client.calls
+    circuit_open = asyncio.run(bus.next_bus_to("Lavery Hall", "Torgersen Hall"))
+
+    # A place geocoded before the outage is answered from the cache
+    google_maps._geocode_memory.set(google_maps.normalize_place("Drillfield"), {"name": "Drillfield", "lat": 37.2270, "lng": -80.4220})
+    cached_place = asyncio.run(bus.plan_quickest_route("Drillfield", "Lavery Hall"))
+    nearest = bus.find_nearest_stop("Drillfield")
+    unknown = asyncio.run(bus.plan_quickest_route("Roanoke Airport", "Goodwin Hall"))
+
+    google_maps._client = None
+    no_key = asyncio.run(bus.enhanced_plan_quickest_route("Squires", "Goodwin Hall"))
+
+    quota = CircuitBreaker(failure_threshold=1)
+    google_maps._breaker = quota
+    google_maps._client = BadRequestClient()
+    try:
+        google_maps.geocode_place("Bad Request Place")
+    except ApiError:
+        pass
+    bad_request_keeps_circuit = quota.state == CircuitBreaker.CLOSED
+
+    checks = [
+        ("Breaker stays closed below threshold", still_closed, still_closed),
+        ("Breaker opens at threshold", opened, opened),
+        ("One half-open trial", trial and not second_trial, (trial, second_trial)),
+        ("Success closes", reclosed, breaker.state),
+        ("Failed Google call falls back locally", during_outage["engine"] == "local" and "Fastest route" in during_outage["answer"],
+         during_outage),
+        ("Open circuit skips Google", circuit_open["engine"] == "local" and client.calls == calls_when_opened, client.calls),
+        ("Cached coordinates plan offline", cached_place["engine"] == "local" and "Walk" in cached_place["answer"], cached_place),
+        ("Nearest stop from cached coordinates", nearest != bus.DEFAULT_STOP, nearest),
+        ("Unknown place is reported", unknown["engine"] == "local" and "Roanoke Airport" in unknown["answer"], unknown),
+        ("No API key plans locally", no_key["engine"] == "local", no_key),
+        ("Bad requests don't trip the circuit", bad_request_keeps_circuit, quota.stats()),
+        ("Metrics", google_maps.google_maps_stats()["configured"], google_maps.google_maps_stats()),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_offline()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import os
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+import nlu
+from nlu import normalize_query, parse_cache_stats, parse_transit_query
+
+def test_parse_cache():
+    """Test the normalized parse-result cache in front of parse_transit_query"""
+
+    print("🧪 Testing Parse Cache\n")
+    print("=" * 60)
+
+    nlu._parse_cache.clear()
+    first = parse_transit_query("When is the next CAS bus coming?")
+    variant = parse_transit_query("  when is the   next cas bus coming ?! ")
+    after_variant = parse_transit_query("when is the next cas bus coming")
+    stats = parse_cache_stats()
+
+    # Callers get a copy, so changing a result can't corrupt the cache
+    first["destination"] = "Somewhere Else"
+    untouched = parse_transit_query("when is the next CAS bus coming")["destination"]
+
+    # A parse that fell back from an erroring LLM isn't cached
+    os.environ["NVIDIA_NIM_ENDPOINT"] = "http://127.0.0.1:9"
+    os.environ["NVIDIA_NIM_API_KEY"] = "test"
+    nlu.NLU_LLM_PARSER = "nim"
+    try:
+        size_before = parse_cache_stats()["size"]
+        fallback = parse_transit_query("when is next CAS bus")
+        fallback_cached = parse_cache_stats()["size"] > size_before
+    finally:
+        nlu.NLU_LLM_PARSER = ""
+        del os.environ["NVIDIA_NIM_ENDPOINT"], os.environ["NVIDIA_NIM_API_KEY"]
+
+    checks = [
+        ("Normalization", normalize_query("  Fastest route to  D2!!  ") == "fastest route to d2",
+         normalize_query("  Fastest route to  D2!!  ")),
+        ("Inner punctuation kept", normalize_query("I am at Squires, when is the bus?") == "i am at squires, when is the bus",
+         normalize_query("I am at Squires, when is the bus?")),
+        ("Variants share an entry", stats["size"] == 1 and stats["hits"] == 2, stats),
+        ("Same answer for variants", variant == after_variant and variant["bus_route"] == "CAS", variant),
+        ("Cached results are copies", untouched is None, untouched),
+        ("Fallback answers", fallback["tier"] == "rules" and "llm_failed" in fallback["evidence"]["flags"], fallback),
+        ("Fallback not cached", not fallback_cached, parse_cache_stats()),
+        ("Hit ratio", 0 < parse_cache_stats()["hit_ratio"] < 1, parse_cache_stats()["hit_ratio"]),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_parse_cache()
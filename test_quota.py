@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+
+# Keep the test cache out of the working tree
+os.environ["GEOCODE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "geocode.sqlite3")
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services import google_maps
+from services.circuit_breaker import CircuitBreaker
+from services.quota import BACKGROUND, INTERACTIVE, QuotaManager, QuotaStore, TokenBucket
+from scrapers import bus
+
+class Clock:
+    """Manually advanced time source"""
+
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+class BrokenClient:
+    """googlemaps.Client failing in a way that isn't an upstream error"""
+
+    def geocode(self, name, region=None):
+        raise ValueError("bad parameter")
+
+class CountingClient:
+    """googlemaps.Client that always finds the place"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def geocode(self, name, region=None):
+        self.calls += 1
+        return [{"geometry": {"location": {"lat": 37.2296, "lng": -80.4236}}, "formatted_address": name}]
+
+def test_quota():
+    """Test token buckets, budgets and priorities for Google API calls"""
+
+    print("🧪 Testing Google API Quotas\n")
+    print("=" * 60)
+
+    clock = Clock(datetime(2025, 1, 31, 23, 59).timestamp())
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    burst = [bucket.take() for _ in range(4)]
+    clock.now += 1
+    refilled = [bucket.take() for _ in range(3)]
+
+    quota = QuotaManager("geocode", rate=100, burst=100, daily_limit=10, monthly_limit=15, reserve=0.2, clock=clock)
+    background = [quota.acquire(BACKGROUND) for _ in range(9)]
+    interactive = [quota.acquire(INTERACTIVE) for _ in range(3)]
+    clock.now += 120  # next day, next month
+    after_rollover = quota.acquire(BACKGROUND), quota.stats()
+
+    monthly = QuotaManager("directions", rate=100, burst=100, daily_limit=None, monthly_limit=5, reserve=0.2, clock=clock)
+    monthly_used = sum(monthly.acquire(INTERACTIVE) for _ in range(7))
+
+    # Two workers on one SQLite file draw on the same budget, and a restart keeps the counts
+    store_path = os.path.join(tempfile.mkdtemp(), "quota.sqlite3")
+    worker_a = QuotaManager("geocode", rate=100, burst=100, daily_limit=3, clock=clock, store=QuotaStore(store_path))
+    worker_b = QuotaManager("geocode", rate=100, burst=100, daily_limit=3, clock=clock, store=QuotaStore(store_path))
+    shared = [worker_a.acquire(), worker_b.acquire(), worker_a.acquire(), worker_b.acquire()]
+    seen_by_a = worker_a.stats()["used_today"]
+    restarted = QuotaManager("geocode", rate=100, burst=100, daily_limit=3, clock=clock, store=QuotaStore(store_path))
+    after_restart = restarted.acquire(), restarted.stats()["used_today"]
+
+    client = CountingClient()
+    google_maps._client = client
+
+    # A circuit that won't let the call through turns it away before it spends budget
+    # (here half-open, with its one trial call already out)
+    google_maps._breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    google_maps._breaker.record_failure()
+    google_maps._breaker.allow()
+    try:
+        google_maps.geocode_place("Place Zero")
+    except google_maps.GoogleUnavailable:
+        pass
+    spent_while_open = google_maps.GOOGLE_QUOTAS["geocode"].stats()["granted"]["interactive"], client.calls
+
+    # An unexpected error during the half-open trial gives the trial back
+    google_maps._breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    google_maps._breaker.record_failure()
+    google_maps._client = BrokenClient()
+    try:
+        google_maps.geocode_place("Place Broken")
+    except ValueError:
+        pass
+    google_maps._client = client
+    trial_returned = google_maps._breaker.allow()
+    google_maps._breaker = CircuitBreaker()
+    google_maps.GOOGLE_QUOTAS["geocode"] = QuotaManager("geocode", rate=100, burst=100, daily_limit=2, reserve=0.5)
+    first = google_maps.geocode_place("Place One")
+    first_calls = client.calls
+    with google_maps.google_priority(BACKGROUND):
+        background_blocked = not google_maps.google_available("geocode")
+    google_maps.geocode_place("Place Two")
+    try:
+        google_maps.geocode_place("Place Three")
+        exceeded = False
+    except google_maps.QuotaExceeded:
+        exceeded = True
+    cached = google_maps.geocode_place("place one")
+    routed = asyncio.run(bus.plan_quickest_route("Squires", "Goodwin Hall"))
+
+    checks = [
+        ("Bucket allows a burst", burst == [True, True, True, False], burst),
+        ("Bucket refills at its rate", refilled == [True, True, False], refilled),
+        ("Background stops at the reserve", background == [True] * 8 + [False], background),
+        ("Interactive uses the reserve", interactive == [True, True, False], interactive),
+        ("Budgets reset with the day and month", after_rollover[0] and after_rollover[1]["used_this_month"] == 1, after_rollover[1]),
+        ("Monthly budget", monthly_used == 5, monthly_used),
+        ("Workers share the budget", shared == [True, True, True, False] and seen_by_a == 3, (shared, seen_by_a)),
+        ("Counts survive a restart", after_restart == (False, 3), after_restart),
+        ("Rejected calls spend no budget", spent_while_open == (0, 0), spent_while_open),
+        ("Unexpected errors settle the half-open trial", trial_returned, trial_returned),
+        ("Interactive call goes through", first is not None and first_calls == 1, first_calls),
+        ("Low budget blocks background", background_blocked, google_maps.google_maps_stats()["quota"]["geocode"]),
+        ("Spent budget raises QuotaExceeded", exceeded and client.calls == 2, client.calls),
+        ("Cached answers still served", cached == first and client.calls == 2, cached),
+        ("Routing degrades to local", routed["engine"] == "local", routed),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_quota()
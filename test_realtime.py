@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import os
+import tempfile
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.gtfs import compile_feed, load_network
+from services.realtime import RealtimeState, gtfs_realtime_pb2, poll_feed, REALTIME
+from test_gtfs import write_feed
+
+NOW = 1736953260  # 2025-01-15 10:01 local
+
+def feed(entities, timestamp, incrementality="FULL_DATASET"):
+    return json.dumps({"header": {"gtfsRealtimeVersion": "2.0", "incrementality": incrementality,
+                                  "timestamp": str(timestamp)}, "entity": entities}).encode()
+
+def vehicle(vehicle_id, route_id, lat, timestamp):
+    return {"id": vehicle_id, "vehicle": {"vehicle": {"id": vehicle_id}, "trip": {"tripId": f"t-{vehicle_id}", "routeId": route_id},
+                                          "position": {"latitude": lat, "longitude": -80.42}, "timestamp": str(timestamp)}}
+
+def trip_update(trip_id, route_id, stop_delays, timestamp=NOW):
+    return {"id": trip_id, "tripUpdate": {"trip": {"tripId": trip_id, "routeId": route_id}, "timestamp": str(timestamp),
+                                          "stopTimeUpdate": [{"stopId": s, "departure": {"delay": d}} for s, d in stop_delays]}}
+
+def test_realtime():
+    """Test incremental GTFS-realtime state"""
+
+    print("🧪 Testing GTFS-realtime State\n")
+    print("=" * 60)
+
+    state = RealtimeState()
+    first = state.apply("vehicles", feed([vehicle("v1", "CAS", 37.20, NOW), vehicle("v2", "HDG", 37.21, NOW)], NOW))
+    second = state.apply("vehicles", feed([vehicle("v1", "CAS", 37.22, NOW + 15), vehicle("v2", "HDG", 37.21, NOW)], NOW + 15))
+    repeat = state.apply("vehicles", feed([], NOW + 15))
+    after_repeat = sorted(state.vehicles)
+    third = state.apply("vehicles", feed([vehicle("v1", "CAS", 37.23, NOW + 30)], NOW + 30))
+    after_third = sorted(state.vehicles)
+    deleted = state.apply("vehicles", feed([{"id": "v1", "isDeleted": True}], NOW + 45, "DIFFERENTIAL"))
+
+    state.apply("trip_updates", feed([trip_update("a", "CAS", [("squires", 120), ("goodwin_hall", 180)]),
+                                      trip_update("b", "CAS", [("squires", 300)]),
+                                      trip_update("c", "CAS", [("squires", 600)], timestamp=NOW - 3600)], NOW))
+    at_stop = state.predicted_delay("CAS", "squires", NOW)
+    on_route = state.predicted_delay("CAS", "torgersen", NOW)
+    state.apply("trip_updates", feed([trip_update("b", "CAS", [("squires", 300)])], NOW + 30))
+    after_diff = state.predicted_delay("CAS", "squires", NOW + 30)
+
+    state.apply("alerts", feed([{"id": "x", "alert": {"informedEntity": [{"routeId": "HDG"}], "cause": "CONSTRUCTION",
+                                                       "headerText": {"translation": [{"text": "HDG detour"}]}}}], NOW))
+
+    # Against a compiled feed: routes are keyed "RED"/"BLU" while the live feed says "r1", or only names the trip
+    workdir = tempfile.mkdtemp()
+    write_feed(os.path.join(workdir, "feed.zip"))
+    compile_feed(os.path.join(workdir, "feed.zip"), os.path.join(workdir, "network.bin"))
+    network = load_network(os.path.join(workdir, "network.bin"))
+    compiled = RealtimeState()
+    compiled.use_network(network.route_keys, network.trip_routes)
+    compiled.apply("trip_updates", feed([trip_update("red16", "r1", [("a", 300)]), trip_update("blu12", "", [("c", 120)])], NOW))
+    compiled.apply("vehicles", feed([vehicle("v3", "r2", 37.23, NOW)], NOW))
+    compiled_delays = compiled.predicted_delay("RED", "a", NOW), compiled.predicted_delay("BLU", "c", NOW)
+
+    checks = [
+        ("First poll adds", first == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0}, first),
+        ("Only changed vehicles are updated", second == {"added": 0, "updated": 1, "removed": 0, "unchanged": 1}, second),
+        ("Same feed timestamp is skipped", after_repeat == ["v1", "v2"], repeat),
+        ("Full dataset drops missing vehicles", third["removed"] == 1 and after_third == ["v1"], third),
+        ("Differential delete", deleted["removed"] == 1 and not state.vehicles, deleted),
+        ("Delay at stop ignores stale reports", at_stop == 210, at_stop),
+        ("Route-level delay", on_route == 210, on_route),
+        ("Diff removes dropped trips", after_diff == 300, after_diff),
+        ("Alerts", state.alert_list()[0]["routes_affected"] == ["HDG"], state.alert_list()),
+        ("Feed route ids map to network routes", compiled_delays == (300, 120), compiled_delays),
+        ("Vehicles map to network routes", len(compiled.route_vehicles("BLU")) == 1, compiled.route_vehicles("BLU")),
+    ]
+
+    if gtfs_realtime_pb2:
+        message = gtfs_realtime_pb2.FeedMessage()
+        message.header.gtfs_realtime_version = "2.0"
+        message.header.timestamp = NOW
+        entity = message.entity.add(id="v9")
+        entity.vehicle.vehicle.id = "v9"
+        entity.vehicle.trip.route_id = "TTT"
+        entity.vehicle.position.latitude = 37.229
+        entity.vehicle.position.longitude = -80.413
+        path = os.path.join(tempfile.mkdtemp(), "vehicles.pb")
+        with open(path, "wb") as f:
+            f.write(message.SerializeToString())
+        counts = asyncio.run(poll_feed("vehicles", path))
+        checks.append(("Protobuf file feed", counts["added"] == 1 and REALTIME.route_vehicles("TTT"), REALTIME.route_vehicles("TTT")))
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_realtime()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.refresher import BackgroundRefresher
+
+async def run_refresher():
+    results = {}
+    refresher = BackgroundRefresher()
+    upstream = {"menu": 0, "flaky": 0}
+    flaky_fails = {"now": False}
+
+    async def menu():
+        upstream["menu"] += 1
+        await asyncio.sleep(0.01)
+        return [f"menu v{upstream['menu']}"]
+
+    async def flaky():
+        upstream["flaky"] += 1
+        if flaky_fails["now"]:
+            raise RuntimeError("scraper blocked")
+        return {"events": upstream["flaky"]}
+
+    async def empty():
+        return []
+
+    refresher.register("menu", menu, interval=0.05, jitter=0)
+    refresher.register("flaky", flaky, interval=60)
+    refresher.register("empty", empty, interval=60, failed=lambda value: not value)
+
+    # First requests wait on the upstream together, later ones are served from the snapshot
+    first = await asyncio.gather(*(refresher.get("menu") for _ in range(4)))
+    results["first"] = (upstream["menu"], {snapshot.value[0] for snapshot in first})
+    results["cached"] = ((await refresher.get("menu")).value, upstream["menu"])
+
+    # A stale snapshot is served while a background refresh replaces it
+    await asyncio.sleep(0.1)
+    stale = await refresher.get("menu")
+    await asyncio.sleep(0.03)
+    results["stale"] = (stale.value, (await refresher.get("menu")).value)
+
+    # A failed refresh keeps the previous snapshot
+    before = await refresher.get("flaky")
+    flaky_fails["now"] = True
+    after = await refresher.refresh("flaky")
+    results["failed_refresh"] = (before.value, after.value, refresher.stats()["flaky"]["failures"])
+
+    # No snapshot and a failing first fetch is an error; a rejected first value is still kept
+    try:
+        await refresher.get("empty")
+        results["empty_first"] = "kept"
+    except RuntimeError as e:
+        results["empty_first"] = str(e)
+
+    # Pollers refresh on their interval until stopped
+    count = upstream["menu"]
+    refresher.start()
+    await asyncio.sleep(0.02)
+    await refresher.stop()
+    results["polled"] = upstream["menu"] > count
+    stopped_at = upstream["menu"]
+    await asyncio.sleep(0.1)
+    results["stopped"] = upstream["menu"] == stopped_at
+    return results
+
+def test_refresher():
+    """Test background-refreshed snapshots"""
+
+    print("🧪 Testing Background Refresher\n")
+    print("=" * 60)
+
+    results = asyncio.run(run_refresher())
+
+    checks = [
+        ("First requests share one fetch", results["first"] == (1, {"menu v1"}), results["first"]),
+        ("Later requests use the snapshot", results["cached"] == (["menu v1"], 1), results["cached"]),
+        ("Stale snapshot served, then replaced", results["stale"] == (["menu v1"], ["menu v2"]), results["stale"]),
+        ("Failed refresh keeps the snapshot", results["failed_refresh"] == ({"events": 1}, {"events": 1}, 1),
+         results["failed_refresh"]),
+        ("First value is kept even if flagged", results["empty_first"] == "kept", results["empty_first"]),
+        ("Pollers run", results["polled"], results["polled"]),
+        ("stop() ends the pollers", results["stopped"], results["stopped"]),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_refresher()
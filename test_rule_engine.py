@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import time
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.rule_engine import RuleSet, cue
+from nlu import simple_parse
+
+def test_rule_engine():
+    """Test the compiled cue-rule matcher and the rule parser built on it"""
+
+    print("🧪 Testing Rule Engine\n")
+    print("=" * 60)
+
+    rules = RuleSet([
+        [cue("from", "orig"), cue("to", "dest", adjacent=True)],
+        [cue("when"), cue("bus"), cue("from", "orig")],
+        [cue("next"), cue("bus", "dest", loose=True)],
+    ])
+    adjacent = rules.match("from lee hall to goodwin hall. thanks")
+    ordered = rules.match("when is the bus from squires")
+    loose = rules.match("next bus torgersen")
+    whole_words = rules.match("whenever a busy day comes from here")
+
+    forecast = simple_parse("forecast for the bus schedule")
+    cas = simple_parse("when does the CAS bus come")
+    route = simple_parse("how to get from Goodwin Hall to Lavery Hall")
+
+    start = time.perf_counter()
+    simple_parse("from " * 2000)
+    simple_parse("when next bus to from " * 400)
+    long_input_seconds = time.perf_counter() - start
+
+    checks = [
+        ("From X to Y", adjacent == (0, {"orig": "lee hall", "dest": "goodwin hall"}), adjacent),
+        ("Cues in order", ordered == (1, {"orig": "squires"}), ordered),
+        ("Loose trailing capture", loose == (2, {"dest": "torgersen"}), loose),
+        ("Cues match whole words only", whole_words is None, whole_words),
+        ("No route code inside words", forecast["bus_route"] is None, forecast),
+        ("Route code detected", cas["intent"] == "next_bus" and cas["bus_route"] == "CAS", cas),
+        ("Same schema", route["intent"] == "transit_route" and route["origin"] and route["destination"], route),
+        ("Long inputs stay fast", long_input_seconds < 0.5, f"{long_input_seconds:.3f}s"),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_rule_engine()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.singleflight import SingleFlight, coalesce
+
+calls = {"lookup": 0}
+
+@coalesce
+async def lookup(name):
+    calls["lookup"] += 1
+    await asyncio.sleep(0.02)
+    return name.upper()
+
+async def run_singleflight():
+    results = {}
+    flights = SingleFlight()
+    upstream = {"ok": 0, "error": 0, "slow": 0}
+
+    async def ok():
+        upstream["ok"] += 1
+        await asyncio.sleep(0.02)
+        return {"value": 42}
+
+    async def error():
+        upstream["error"] += 1
+        await asyncio.sleep(0.02)
+        raise ValueError("upstream down")
+
+    async def slow():
+        upstream["slow"] += 1
+        await asyncio.sleep(0.05)
+        return "done"
+
+    shared = await asyncio.gather(*(flights.do("ok", ok) for _ in range(5)))
+    results["shared"] = (upstream["ok"], shared)
+
+    errors = await asyncio.gather(*(flights.do("error", error) for _ in range(3)), return_exceptions=True)
+    results["errors"] = (upstream["error"], [type(e).__name__ for e in errors])
+
+    # One waiter is cancelled mid-flight; the others still get the result
+    waiters = [asyncio.ensure_future(flights.do("slow", slow)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    waiters[0].cancel()
+    settled = await asyncio.gather(*waiters, return_exceptions=True)
+    results["cancelled"] = (upstream["slow"], [type(r).__name__ if isinstance(r, BaseException) else r for r in settled])
+
+    # The last waiter leaving cancels the upstream call
+    lone = asyncio.ensure_future(flights.do("lone", slow))
+    await asyncio.sleep(0.01)
+    lone.cancel()
+    # A caller arriving while the abandoned call is still being torn down gets a fresh call
+    late = asyncio.ensure_future(flights.do("lone", slow))
+    await asyncio.gather(lone, return_exceptions=True)
+    results["after_abandon"] = (await asyncio.gather(late, return_exceptions=True), upstream["slow"])
+    await asyncio.sleep(0)
+    results["abandoned"] = flights.in_flight()
+
+    results["next_call"] = (await flights.do("ok", ok), upstream["ok"])
+    results["coalesce"] = (await asyncio.gather(lookup("cas"), lookup("cas"), lookup("hdg")), calls["lookup"])
+    return results
+
+def test_singleflight():
+    """Test coalescing of identical in-flight calls"""
+
+    print("🧪 Testing Single Flight\n")
+    print("=" * 60)
+
+    results = asyncio.run(run_singleflight())
+
+    checks = [
+        ("Concurrent calls share one upstream call", results["shared"][0] == 1 and all(r == {"value": 42} for r in results["shared"][1]),
+         results["shared"]),
+        ("Errors reach every waiter", results["errors"] == (1, ["ValueError"] * 3), results["errors"]),
+        ("Cancelled waiter detaches only", results["cancelled"] == (1, ["CancelledError", "done", "done"]), results["cancelled"]),
+        ("Last waiter leaving frees the key", results["abandoned"] == 0, results["abandoned"]),
+        ("Caller after a cancellation is not cancelled", results["after_abandon"] == (["done"], 3), results["after_abandon"]),
+        ("Finished key runs again", results["next_call"] == ({"value": 42}, 2), results["next_call"]),
+        ("coalesce keys on arguments", results["coalesce"] == (["CAS", "CAS", "HDG"], 2), results["coalesce"]),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_singleflight()
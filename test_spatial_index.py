@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import random
+import time
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.geo import SpatialIndex, haversine_m
+from scrapers.bus import RIDEBT_STOPS, STOP_INDEX
+
+def brute_force(points, lat, lng, k):
+    found = sorted((haversine_m(lat, lng, p_lat, p_lng), point_id) for point_id, (p_lat, p_lng) in points.items())
+    return [point_id for _, point_id in found[:k]]
+
+def test_spatial_index():
+    """Test grid nearest/within queries against a brute-force scan"""
+
+    print("🧪 Testing Spatial Index\n")
+    print("=" * 60)
+
+    rng = random.Random(7)
+    points = {f"p{i}": (37.22 + rng.uniform(-0.02, 0.02), -80.42 + rng.uniform(-0.02, 0.02)) for i in range(300)}
+    index = SpatialIndex(points)
+
+    queries = [(37.22 + rng.uniform(-0.03, 0.03), -80.42 + rng.uniform(-0.03, 0.03)) for _ in range(50)]
+    nearest_ok = all([point_id for point_id, _ in index.nearest(lat, lng, 3)] == brute_force(points, lat, lng, 3)
+                     for lat, lng in queries)
+    lat, lng = queries[0]
+    within = {point_id for point_id, _ in index.within(lat, lng, 500)}
+    expected_within = {point_id for point_id, (p_lat, p_lng) in points.items() if haversine_m(lat, lng, p_lat, p_lng) <= 500}
+
+    # Off-campus geocodes: Richmond, Washington DC, Paris TX
+    far_queries = [(37.5407, -77.4360), (38.9072, -77.0369), (33.6609, -95.5555)]
+    stops = {stop_id: (info["lat"], info["lng"]) for stop_id, info in RIDEBT_STOPS.items()}
+    start = time.perf_counter()
+    far_results = [STOP_INDEX.nearest(lat, lng, 2) for lat, lng in far_queries]
+    far_seconds = time.perf_counter() - start
+    far_ok = all([point_id for point_id, _ in result] == brute_force(stops, lat, lng, 2)
+                 for result, (lat, lng) in zip(far_results, far_queries))
+
+    checks = [
+        ("Nearest matches brute force", nearest_ok, len(queries)),
+        ("Within radius", within == expected_within, len(within)),
+        ("Empty index", SpatialIndex({}).nearest(37.2, -80.4) == [], SpatialIndex({}).nearest(37.2, -80.4)),
+        ("Far-away queries are exact", far_ok, [result[0][0] for result in far_results]),
+        ("Far-away queries are fast", far_seconds < 0.05, f"{far_seconds * 1000:.2f} ms"),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_spatial_index()
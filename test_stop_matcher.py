@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import os
+from dotenv import load_dotenv
+load_dotenv()
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from scrapers.bus import resolve_stop, STOP_MATCH_STATS
+
+def test_stop_matcher():
+    """Test compiled stop-name matching and its rule reporting"""
+
+    print("🧪 Testing Stop Name Matching\n")
+    print("=" * 60)
+
+    test_cases = [
+        ("Goodwin Hall", "goodwin_hall", "exact"),
+        ("Norris Hall", "norris", "exact"),
+        ("Lavery Hall, Blacksburg, VA 24060", "lavery_hall", "name_in_query"),
+        ("Goodwin Hall Parking", "goodwin_lot", "exact"),
+        ("the hokie grill please", "hokie_grill", "name_in_query"),
+        ("McComas", "mccomas_hall", "query_in_name"),
+        ("Lane", "lane_stadium", "query_in_name"),
+        ("460 Old Turner St, Blacksburg, VA 24060", "lavery_hall", "alias"),
+        ("Virginia Tech, Blacksburg, VA", "squires", "alias"),
+        ("Perry Street, Blacksburg, VA 24061", "perry_st", "token_overlap"),
+    ]
+
+    passed = []
+    for i, (location, expected_stop, expected_rule) in enumerate(test_cases, 1):
+        stop_id, rule = resolve_stop(location)
+        passed.append((stop_id, rule) == (expected_stop, expected_rule))
+        status = "✅" if passed[-1] else "❌"
+        print(f"{i}. {status} '{location}' → {stop_id} ({rule})")
+
+    print(f"\n📊 Rule counts: {dict(STOP_MATCH_STATS)}")
+
+    assert all(passed)
+
+if __name__ == "__main__":
+    test_stop_matcher()
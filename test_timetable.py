@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+from datetime import datetime
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.timetable import Timetable, format_clock
+
+def test_timetable():
+    """Test compiled timetable lookups"""
+
+    print("🧪 Testing Compiled Timetable\n")
+    print("=" * 60)
+
+    routes = {
+        "AAA": {
+            "stops": ["a", "b", "c"],
+            "frequency": 15,
+            "operating_hours": {"start": "6:30", "end": 22},
+            "service": {"weekend": {"start": 9, "end": 17, "frequency": 30}},
+        },
+        "BBB": {
+            "stops": ["c", "d"],
+            "frequency": 20,
+            "operating_hours": {"start": 7, "end": "25:00"},
+            "service": {"weekend": None},
+        },
+    }
+    timetable = Timetable.from_routes(routes)
+
+    weekday = datetime(2025, 1, 15, 10, 7, 30)  # Wednesday
+    saturday = datetime(2025, 1, 18, 10, 7, 30)
+    sunday_night = datetime(2025, 1, 19, 0, 30)
+    thursday_night = datetime(2025, 1, 16, 0, 30)
+
+    checks = [
+        ("Next weekday departures from a",
+         [d.strftime('%H:%M') for d in timetable.next_departures("a", "AAA", weekday, count=2)], ["10:15", "10:30"]),
+        ("Hop offset at c",
+         [d.strftime('%H:%M') for d in timetable.next_departures("c", "AAA", weekday)], ["10:19"]),
+        ("Weekend headway",
+         [d.strftime('%H:%M') for d in timetable.next_departures("a", "AAA", saturday, count=2)], ["10:30", "11:00"]),
+        ("No weekend service",
+         timetable.next_departures("c", "BBB", saturday), []),
+        ("Service past midnight",
+         [d.strftime('%H:%M') for d in timetable.next_departures("c", "BBB", thursday_night)], ["00:40"]),
+        ("No overflow after a day without service",
+         timetable.next_departures("c", "BBB", sunday_night), []),
+        ("Minute-level start",
+         format_clock(timetable.service_span("AAA", weekday.date())[0]), "6:30 AM"),
+        ("Operating check",
+         (timetable.is_operating("AAA", weekday), timetable.is_operating("BBB", saturday)), (True, False)),
+    ]
+
+    for i, (name, got, expected) in enumerate(checks, 1):
+        status = "✅" if got == expected else "❌"
+        print(f"{i}. {status} {name}: {got} (expected {expected})")
+
+    assert all(got == expected for _, got, expected in checks)
+
+if __name__ == "__main__":
+    test_timetable()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.transit_network import TransitNetwork
+
+STOPS = {stop_id: {"name": stop_id.title()} for stop_id in ("a", "b", "c", "d", "e")}
+ROUTES = {
+    "LOOP": {"name": "Loop", "stops": ["a", "b", "c", "d"]},
+    "SHORT": {"name": "Short", "stops": ["b", "e", "b"]},
+}
+
+def test_transit_network():
+    """Test the precomputed stop/route lookups"""
+
+    print("🧪 Testing Transit Network Index\n")
+    print("=" * 60)
+
+    network = TransitNetwork(STOPS, ROUTES)
+
+    checks = [
+        ("Routes serving a stop", network.routes_serving("b") == ("LOOP", "SHORT"), network.routes_serving("b")),
+        ("Stop no route serves", network.routes_serving("nowhere") == (), network.routes_serving("nowhere")),
+        ("Routes serving both stops", network.routes_serving_both("c", "a") == ("LOOP",), network.routes_serving_both("c", "a")),
+        ("No route serves both", network.routes_serving_both("c", "e") == (), network.routes_serving_both("c", "e")),
+        ("Stop position is the first visit", network.stop_index("SHORT", "b") == 0 and network.stop_index("LOOP", "e") is None,
+         (network.stop_index("SHORT", "b"), network.stop_index("LOOP", "e"))),
+        ("Stops ridden forward", network.stops_between("LOOP", "a", "c") == 2, network.stops_between("LOOP", "a", "c")),
+        ("Stops ridden around the loop", network.stops_between("LOOP", "d", "b") == 2, network.stops_between("LOOP", "d", "b")),
+        ("Stop the route skips", network.stops_between("LOOP", "a", "e") is None, network.stops_between("LOOP", "a", "e")),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_transit_network()
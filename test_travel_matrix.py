@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import asyncio
+from datetime import datetime
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from scrapers.bus import JOURNEY_PLANNER, travel_time_matrix
+
+def test_travel_matrix():
+    """Test the many-to-many travel time matrix"""
+
+    print("🧪 Testing Travel Time Matrix\n")
+    print("=" * 60)
+
+    when = datetime(2025, 1, 15, 10, 1)
+    origins = ["squires", "goodwin_hall", "Lavery Hall", "squires"]
+    destinations = ["torgersen", "cassell", "squires", "Roanoke Airport"]
+    result = asyncio.run(travel_time_matrix(origins, destinations, when))
+    matrix = result["minutes"]
+
+    # Every stop-to-stop cell agrees with a single-pair plan
+    expected = {}
+    for origin in ("squires", "goodwin_hall", "lavery_hall"):
+        for destination in ("torgersen", "cassell", "squires"):
+            itinerary = JOURNEY_PLANNER.plan({origin: 0}, {destination: 0}, when)
+            expected[(origin, destination)] = itinerary["duration_minutes"] if itinerary else None
+    actual = {(origin, destination): matrix[i][j]
+              for i, origin in enumerate(["squires", "goodwin_hall", "lavery_hall"])
+              for j, destination in enumerate(["torgersen", "cassell", "squires"])}
+    mismatched = {pair: (actual[pair], expected[pair]) for pair in expected
+                  if pair[0] != pair[1] and actual[pair] != expected[pair]}
+
+    night = asyncio.run(travel_time_matrix(["goodwin_hall"], ["cassell"], datetime(2025, 1, 15, 3, 0)))
+
+    checks = [
+        ("Shape follows the request", len(matrix) == 4 and all(len(row) == 4 for row in matrix), matrix),
+        ("Matches single-pair planning", not mismatched, mismatched),
+        ("Same place is zero", matrix[0][2] == 0, matrix[0][2]),
+        ("Repeated origin gives the same row", matrix[3] == matrix[0], matrix[3]),
+        ("Unknown places are reported", result["unresolved"] == ["Roanoke Airport"] and all(row[3] is None for row in matrix),
+         result["unresolved"]),
+        ("Departure echoed", result["departure"] == "2025-01-15T10:01", result["departure"]),
+        ("No faster without buses", night["minutes"][0][0] is None or night["minutes"][0][0] >= matrix[1][1],
+         (night["minutes"][0][0], matrix[1][1])),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_travel_matrix()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+
+# Keep the test cache out of the working tree
+os.environ["GEOCODE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "geocode.sqlite3")
+
+# Add current directory to path so we can import our modules
+import sys
+sys.path.append('.')
+
+from services.geo import haversine_m, walk_seconds
+from services import google_maps
+from services.walk_matrix import WalkMatrix, build_campus_matrix, place_id
+from nlu import CAMPUS_PLACES, simple_parse
+from scrapers import bus
+from scrapers.bus import RIDEBT_STOPS, WALK_MATRIX, walk_minutes
+
+def test_walk_matrix():
+    """Test the precomputed walking-time matrix"""
+
+    print("🧪 Testing Walking Matrix\n")
+    print("=" * 60)
+
+    points = {
+        "squires": (37.2291, -80.4190),
+        "goodwin_hall": (37.2266, -80.4234),
+        place_id("Drillfield"): (37.2270, -80.4220),
+    }
+    matrix = WalkMatrix.from_points(points)
+    expected = walk_seconds(haversine_m(*points["squires"], *points["goodwin_hall"]))
+    path = os.path.join(tempfile.mkdtemp(), "walk.npz")
+    matrix.save(path)
+    loaded = WalkMatrix.load(path)
+
+    squires, goodwin = RIDEBT_STOPS["squires"], RIDEBT_STOPS["goodwin_hall"]
+    stop_walk = walk_seconds(haversine_m(squires["lat"], squires["lng"], goodwin["lat"], goodwin["lng"]))
+
+    # A built matrix answers for the places a parsed query names (resolved to addresses);
+    # Google is off, so only the two places seeded into the geocode cache are built in
+    google_maps._client = None
+    for name, lat, lng in (("goodwin hall", 37.2266, -80.4234), ("lavery hall", 37.2318, -80.4253)):
+        address = CAMPUS_PLACES[name]
+        google_maps._geocode_memory.set(google_maps.normalize_place(address), {"name": address, "lat": lat, "lng": lng})
+    campus, _ = build_campus_matrix()
+    parsed = simple_parse("fastest route from Goodwin Hall to Lavery Hall")
+    bus.WALK_MATRIX = campus
+    try:
+        parsed_walk = walk_minutes(parsed["origin"], parsed["destination"])
+        named_walk = walk_minutes("goodwin hall", "Lavery Hall")
+    finally:
+        bus.WALK_MATRIX = WALK_MATRIX
+    campus_walk = campus.walk_minutes(place_id(CAMPUS_PLACES["goodwin hall"]), place_id(CAMPUS_PLACES["lavery hall"]))
+
+    checks = [
+        ("Matches per-pair haversine", abs(matrix.walk_seconds("squires", "goodwin_hall") - expected) <= 1,
+         (matrix.walk_seconds("squires", "goodwin_hall"), expected)),
+        ("Symmetric with zero diagonal", (matrix.seconds == matrix.seconds.T).all() and not matrix.seconds.diagonal().any(),
+         matrix.seconds.tolist()),
+        ("Place ids are normalized", matrix.walk_minutes(place_id("  drillfield "), "squires") is not None,
+         matrix.ids),
+        ("Unknown id", matrix.walk_seconds("squires", "nowhere") is None, None),
+        ("Within is nearest first", [i for i, _ in matrix.within("goodwin_hall", 10_000)] == [place_id("drillfield"), "squires"],
+         matrix.within("goodwin_hall", 10_000)),
+        ("Save/load round trip", loaded.ids == matrix.ids and (loaded.seconds == matrix.seconds).all(), loaded.ids),
+        ("Bus stops are in the default matrix", "squires" in WALK_MATRIX and len(WALK_MATRIX.ids) == len(RIDEBT_STOPS),
+         len(WALK_MATRIX.ids)),
+        ("Walk estimate by place name", walk_minutes("Squires", "Goodwin Hall") == -(-stop_walk // 60),
+         walk_minutes("Squires", "Goodwin Hall")),
+        ("Unknown place has no estimate", walk_minutes("Squires", "Roanoke airport") is None, None),
+        ("Walk estimate from a parsed query", parsed_walk == campus_walk and parsed_walk is not None,
+         (parsed["origin"], parsed["destination"], parsed_walk)),
+        ("Name and address share a row", named_walk == parsed_walk, named_walk),
+    ]
+
+    for i, (name, ok, detail) in enumerate(checks, 1):
+        status = "✅" if ok else "❌"
+        print(f"{i}. {status} {name}: {detail}")
+
+    assert all(ok for _, ok, _ in checks)
+
+if __name__ == "__main__":
+    test_walk_matrix()
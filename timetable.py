@@ -0,0 +1,198 @@
+import bisect
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Hand-typed routes carry no stop-to-stop run times, so each hop is assumed to take this long
+DEFAULT_HOP_MINUTES = 2
+
+SECONDS_PER_DAY = 24 * 3600
+
+
+class ServicePeriod(NamedTuple):
+    """Days a service runs. days is Monday..Sunday; start/end optionally bound the period."""
+    days: Tuple[bool, ...]
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+    def active_on(self, day: date) -> bool:
+        if self.start and day < self.start:
+            return False
+        if self.end and day > self.end:
+            return False
+        return self.days[day.weekday()]
+
+
+# Calendar used for the hand-typed BUS_ROUTES table
+DEFAULT_CALENDAR: Dict[str, ServicePeriod] = {
+    "weekday": ServicePeriod(days=(True, True, True, True, True, False, False)),
+    "weekend": ServicePeriod(days=(False, False, False, False, False, True, True)),
+}
+
+
+class Pattern(NamedTuple):
+    """
+    One stop sequence of a route with its trips.
+    Trip rows live in Timetable.stop_times starting at base, as (arrival, departure) pairs per stop.
+    trips maps service_id -> (first_row, end_row); rows of a service are sorted by departure.
+    """
+    route_id: str
+    stops: Tuple[str, ...]
+    trips: Dict[str, Tuple[int, int]]
+    base: int
+
+
+def clock_seconds(value: Any) -> int:
+    """Convert an operating-hours value (hour int or "HH:MM" string) to seconds since midnight."""
+    if isinstance(value, str):
+        hours, _, minutes = value.partition(":")
+        return int(hours) * 3600 + int(minutes or 0) * 60
+    return int(value * 3600)
+
+
+def format_clock(seconds: int) -> str:
+    """Format seconds since midnight as e.g. "6:05 AM"."""
+    minutes = (seconds // 60) % (24 * 60)
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour % 12) or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+class Timetable:
+    """
+    Compiled timetable: per-stop sorted departure arrays for every route and service day.
+    Departure times are seconds since midnight of the service day and may run past 24:00.
+    """
+
+    def __init__(self, calendar: Dict[str, ServicePeriod], patterns: List[Pattern],
+                 stop_times: Sequence[int], boards: Dict[Tuple[str, str, str], Tuple[int, int]],
+                 board_times: Sequence[int]):
+        self.calendar = calendar
+        self.patterns = patterns
+        self.stop_times = stop_times
+        # (stop_id, route_id, service_id) -> (lo, hi) slice of board_times, sorted ascending
+        self.boards = boards
+        self.board_times = board_times
+
+        # (route_id, service_id) -> first and last departure anywhere on the route
+        spans: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        for (stop_id, route_id, service_id), (lo, hi) in boards.items():
+            if lo == hi:
+                continue
+            first, last = board_times[lo], board_times[hi - 1]
+            key = (route_id, service_id)
+            if key in spans:
+                first = min(first, spans[key][0])
+                last = max(last, spans[key][1])
+            spans[key] = (first, last)
+        self._spans = spans
+
+    @classmethod
+    def from_routes(cls, routes: Dict[str, Dict[str, Any]],
+                    calendar: Optional[Dict[str, ServicePeriod]] = None) -> "Timetable":
+        """
+        Compile a BUS_ROUTES-style table.
+        Each route runs a loop over its stops, leaving the first stop every `frequency` minutes
+        within `operating_hours`. A route may override either per service day with
+        route["service"][service_id] = {"start", "end", "frequency"} or None for no service.
+        """
+        calendar = calendar or DEFAULT_CALENDAR
+        patterns: List[Pattern] = []
+        stop_times = array("i")
+        board_lists: Dict[Tuple[str, str, str], List[int]] = {}
+
+        for route_id, route_info in routes.items():
+            stops = tuple(route_info["stops"]) + (route_info["stops"][0],)
+            hop = int(route_info.get("hop_minutes", DEFAULT_HOP_MINUTES) * 60)
+            default_hours = {
+                "start": route_info["operating_hours"]["start"],
+                "end": route_info["operating_hours"]["end"],
+                "frequency": route_info["frequency"],
+            }
+            base = len(stop_times)
+            trips: Dict[str, Tuple[int, int]] = {}
+            row = 0
+
+            for service_id in calendar:
+                hours = route_info.get("service", {}).get(service_id, default_hours)
+                if not hours:
+                    continue
+                start = clock_seconds(hours["start"])
+                end = clock_seconds(hours["end"])
+                headway = int(hours["frequency"] * 60)
+                first_row = row
+                for trip_start in range(start, end, headway):
+                    for i, stop_id in enumerate(stops):
+                        t = trip_start + i * hop
+                        stop_times.extend((t, t))
+                        # The closing stop of the loop is arrival-only
+                        if i < len(stops) - 1:
+                            board_lists.setdefault((stop_id, route_id, service_id), []).append(t)
+                    row += 1
+                trips[service_id] = (first_row, row)
+
+            patterns.append(Pattern(route_id=route_id, stops=stops, trips=trips, base=base))
+
+        boards, board_times = cls.pack_boards(board_lists)
+        return cls(calendar, patterns, stop_times, boards, board_times)
+
+    @staticmethod
+    def pack_boards(board_lists: Dict[Tuple[str, str, str], List[int]]
+                    ) -> Tuple[Dict[Tuple[str, str, str], Tuple[int, int]], array]:
+        """Sort each board and pack them into one flat array."""
+        boards: Dict[Tuple[str, str, str], Tuple[int, int]] = {}
+        board_times = array("i")
+        for key, times in board_lists.items():
+            lo = len(board_times)
+            board_times.extend(sorted(times))
+            boards[key] = (lo, len(board_times))
+        return boards, board_times
+
+    def services_on(self, day: date) -> List[str]:
+        """Service ids running on the given date."""
+        return [service_id for service_id, period in self.calendar.items() if period.active_on(day)]
+
+    def _service_days(self, when: datetime):
+        """(service date, seconds since that date's midnight) pairs covering `when`, latest first."""
+        today = when.date()
+        seconds = when.hour * 3600 + when.minute * 60 + when.second
+        # Trips of yesterday's service may still be running past midnight
+        return ((today, seconds), (today - timedelta(days=1), seconds + SECONDS_PER_DAY))
+
+    def next_departures(self, stop_id: str, route_id: str, when: datetime, count: int = 1) -> List[datetime]:
+        """Next `count` departures of route_id from stop_id strictly after `when`."""
+        found: List[datetime] = []
+        for day, seconds in self._service_days(when):
+            midnight = datetime.combine(day, datetime.min.time())
+            for service_id in self.services_on(day):
+                bounds = self.boards.get((stop_id, route_id, service_id))
+                if not bounds:
+                    continue
+                lo, hi = bounds
+                i = bisect.bisect_right(self.board_times, seconds, lo, hi)
+                for t in self.board_times[i:min(i + count, hi)]:
+                    found.append(midnight + timedelta(seconds=t))
+        found.sort()
+        return found[:count]
+
+    def service_span(self, route_id: str, day: date) -> Optional[Tuple[int, int]]:
+        """First and last departure (seconds since midnight) of the route on the given day."""
+        spans = [self._spans[(route_id, service_id)] for service_id in self.services_on(day)
+                 if (route_id, service_id) in self._spans]
+        if not spans:
+            return None
+        return min(s[0] for s in spans), max(s[1] for s in spans)
+
+    def service_hours_text(self, route_id: str, day: date) -> str:
+        """Human-readable service hours of the route on the given day."""
+        span = self.service_span(route_id, day)
+        if not span:
+            return "no service today"
+        return f"{format_clock(span[0])} - {format_clock(span[1])}"
+
+    def is_operating(self, route_id: str, when: datetime) -> bool:
+        """Whether the route has service running at `when`."""
+        for day, seconds in self._service_days(when):
+            span = self.service_span(route_id, day)
+            if span and span[0] <= seconds <= span[1]:
+                return True
+        return False
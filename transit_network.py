@@ -0,0 +1,74 @@
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+
+class TransitNetwork:
+    """
+    Precomputed lookups over the stop/route tables.
+    Built once from RIDEBT_STOPS and BUS_ROUTES so request handlers never scan route stop lists.
+    """
+
+    def __init__(self, stops: Dict[str, Dict[str, Any]], routes: Dict[str, Dict[str, Any]]):
+        self.stops = stops
+        self.routes = routes
+
+        # stop_id -> route ids serving it, in BUS_ROUTES order
+        routes_at: Dict[str, list] = {}
+        # (route_id, stop_id) -> position of the stop on the route (first occurrence)
+        stop_order: Dict[Tuple[str, str], int] = {}
+        # frozenset({stop_a, stop_b}) -> route ids serving both stops
+        pair_routes: Dict[FrozenSet[str], list] = {}
+        route_length: Dict[str, int] = {}
+        # route_id -> stop sequences of its trip patterns, for routes compiled from GTFS
+        route_patterns: Dict[str, Tuple[Tuple[str, ...], ...]] = {}
+
+        for route_id, route_info in routes.items():
+            route_stops = list(dict.fromkeys(route_info["stops"]))
+            route_length[route_id] = len(route_stops)
+            if route_info.get("patterns"):
+                route_patterns[route_id] = tuple(tuple(pattern) for pattern in route_info["patterns"])
+            for i, stop_id in enumerate(route_stops):
+                routes_at.setdefault(stop_id, []).append(route_id)
+                stop_order[(route_id, stop_id)] = i
+            for i, stop_a in enumerate(route_stops):
+                pair_routes.setdefault(frozenset((stop_a,)), []).append(route_id)
+                for stop_b in route_stops[i + 1:]:
+                    pair_routes.setdefault(frozenset((stop_a, stop_b)), []).append(route_id)
+
+        self._routes_at = {stop_id: tuple(r) for stop_id, r in routes_at.items()}
+        self._stop_order = stop_order
+        self._pair_routes = {pair: tuple(r) for pair, r in pair_routes.items()}
+        self._route_length = route_length
+        self._route_patterns = route_patterns
+
+    def routes_serving(self, stop_id: str) -> Tuple[str, ...]:
+        """Route ids that stop at stop_id."""
+        return self._routes_at.get(stop_id, ())
+
+    def routes_serving_both(self, stop_a: str, stop_b: str) -> Tuple[str, ...]:
+        """Route ids that stop at both stop_a and stop_b."""
+        return self._pair_routes.get(frozenset((stop_a, stop_b)), ())
+
+    def stop_index(self, route_id: str, stop_id: str) -> Optional[int]:
+        """Position of stop_id in the route's stop list, or None if the route skips it."""
+        return self._stop_order.get((route_id, stop_id))
+
+    def stops_between(self, route_id: str, origin_stop: str, dest_stop: str) -> Optional[int]:
+        """
+        Number of stops ridden from origin_stop to dest_stop.
+        Routes with trip patterns are counted along the shortest pattern that reaches dest_stop after
+        origin_stop, or None if none does. Hand-written routes are loops that return to their first
+        stop, so the count wraps around.
+        """
+        if route_id in self._route_patterns:
+            counts = []
+            for pattern in self._route_patterns[route_id]:
+                if origin_stop in pattern:
+                    i = pattern.index(origin_stop)
+                    if dest_stop in pattern[i + 1:]:
+                        counts.append(pattern.index(dest_stop, i + 1) - i)
+            return min(counts, default=None)
+        i = self.stop_index(route_id, origin_stop)
+        j = self.stop_index(route_id, dest_stop)
+        if i is None or j is None:
+            return None
+        return (j - i) % self._route_length[route_id]
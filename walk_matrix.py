@@ -0,0 +1,120 @@
+"""
+Precomputed all-pairs walking times between bus stops and campus places.
+
+Build the matrix once (geocoding the campus place addresses through the usual cache):
+
+    python walk_matrix.py walk_matrix.npz
+
+then point WALK_MATRIX_PATH at the output. Times are great-circle distance stretched by
+WALK_DETOUR_FACTOR at WALK_SPEED_MPS, so a walk estimate is a single array lookup.
+"""
+
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.geo import EARTH_RADIUS_M, WALK_DETOUR_FACTOR, WALK_SPEED_MPS
+
+# Prefix for campus place ids, so they can't collide with stop ids
+PLACE_PREFIX = "place:"
+
+
+def place_id(address: str) -> str:
+    """
+    Matrix id for a campus place, keyed by its address (a CAMPUS_PLACES value): that is what the
+    NLU resolves place names to, and names sharing a building share its row.
+    """
+    return PLACE_PREFIX + " ".join(address.lower().split())
+
+
+class WalkMatrix:
+    """
+    Dense walking-time matrix in seconds (int32) with an id -> row/column mapping.
+    """
+
+    def __init__(self, ids: List[str], seconds: np.ndarray):
+        self.ids = list(ids)
+        self.index: Dict[str, int] = {point_id: i for i, point_id in enumerate(self.ids)}
+        self.seconds = seconds
+
+    @classmethod
+    def from_points(cls, points: Dict[str, Tuple[float, float]]) -> "WalkMatrix":
+        """Haversine distance with a detour factor between every pair of (lat, lng) points."""
+        ids = list(points)
+        coords = np.radians(np.array([points[point_id] for point_id in ids], dtype=np.float64).reshape(-1, 2))
+        lat = coords[:, 0][:, None]
+        lng = coords[:, 1][:, None]
+        a = np.sin((lat.T - lat) / 2) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin((lng.T - lng) / 2) ** 2
+        meters = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+        return cls(ids, np.rint(meters * WALK_DETOUR_FACTOR / WALK_SPEED_MPS).astype(np.int32))
+
+    @classmethod
+    def load(cls, path: str) -> "WalkMatrix":
+        """Read a matrix written by save."""
+        with np.load(path) as data:
+            return cls([str(point_id) for point_id in data["ids"]], data["seconds"])
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, ids=np.array(self.ids), seconds=self.seconds)
+
+    def __contains__(self, point_id: str) -> bool:
+        return point_id in self.index
+
+    def walk_seconds(self, origin: str, destination: str) -> Optional[int]:
+        """Walking time between two ids, or None if either isn't in the matrix."""
+        i = self.index.get(origin)
+        j = self.index.get(destination)
+        if i is None or j is None:
+            return None
+        return int(self.seconds[i, j])
+
+    def walk_minutes(self, origin: str, destination: str) -> Optional[int]:
+        """Walking time in whole minutes, rounded up."""
+        seconds = self.walk_seconds(origin, destination)
+        return None if seconds is None else -(-seconds // 60)
+
+    def within(self, origin: str, max_seconds: int) -> List[Tuple[str, int]]:
+        """Every other id reachable on foot within max_seconds, as (id, seconds), nearest first."""
+        i = self.index[origin]
+        row = self.seconds[i]
+        reachable = np.flatnonzero(row <= max_seconds)
+        reachable = reachable[np.argsort(row[reachable], kind="stable")]
+        return [(self.ids[j], int(row[j])) for j in reachable if j != i]
+
+
+def build_campus_matrix() -> Tuple[WalkMatrix, List[str]]:
+    """
+    Matrix over the loaded bus stops and every geocodable campus place address.
+    Returns the matrix and the addresses that couldn't be geocoded.
+    """
+    from nlu import CAMPUS_PLACES
+    from scrapers.bus import RIDEBT_STOPS
+    from services.google_maps import geocode_place, google_priority
+    from services.quota import BACKGROUND
+
+    points = {stop_id: (info["lat"], info["lng"]) for stop_id, info in RIDEBT_STOPS.items()}
+    missing = []
+    for address in dict.fromkeys(CAMPUS_PLACES.values()):
+        try:
+            # Offline builds must not eat into the budget kept for user requests
+            with google_priority(BACKGROUND):
+                place = geocode_place(address)
+        except Exception:
+            place = None
+        if place:
+            points[place_id(address)] = (place["lat"], place["lng"])
+        else:
+            missing.append(address)
+    return WalkMatrix.from_points(points), missing
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python walk_matrix.py <walk_matrix.npz>")
+        sys.exit(1)
+    matrix, missing = build_campus_matrix()
+    matrix.save(sys.argv[1])
+    print(f"✅ Wrote {len(matrix.ids)}×{len(matrix.ids)} walking matrix → {sys.argv[1]}")
+    if missing:
+        print(f"⚠️ Not geocoded (left out): {', '.join(missing)}")